@@ -27,10 +27,11 @@ export class ToolhubAudioTranscriptLocal implements INodeType {
 		outputs: ['main'],
 		credentials: [{ name: 'toolhubApi', required: true }],
 		properties: [
-			{ displayName: 'Input', name: 'input', type: 'string', default: '', required: true, description: 'Audio input path or filename' },
+			{ displayName: 'Input', name: 'input', type: 'string', default: '', description: 'Audio input path or filename (leave empty when Job ID is set)' },
+			{ displayName: 'Job ID', name: 'jobId', type: 'string', default: '', description: 'Split job ID; transcribes all chunks and returns one merged transcript' },
 			{ displayName: 'Output', name: 'output', type: 'string', default: '' },
 			{ displayName: 'Format', name: 'format', type: 'options', options: [{ name: 'JSON', value: 'json' }, { name: 'Text', value: 'txt' }, { name: 'SRT', value: 'srt' }], default: 'json' },
-			{ displayName: 'Backend', name: 'backend', type: 'options', options: [{ name: 'Auto', value: 'auto' }, { name: 'Whisper CLI', value: 'whisper-cli' }], default: 'auto' },
+			{ displayName: 'Backend', name: 'backend', type: 'options', options: [{ name: 'Auto', value: 'auto' }, { name: 'Resident Worker', value: 'worker' }, { name: 'Whisper CLI', value: 'whisper-cli' }], default: 'auto' },
 			{ displayName: 'Language', name: 'language', type: 'string', default: 'de' },
 			{ displayName: 'Model', name: 'model', type: 'string', default: '' },
 		],
@@ -46,12 +47,15 @@ export class ToolhubAudioTranscriptLocal implements INodeType {
 		for (let i = 0; i < items.length; i++) {
 			// Build /run payload with the required n8n_audio_* alias name.
 			const payload: IDataObject = {
-				input: this.getNodeParameter('input', i) as string,
 				format: this.getNodeParameter('format', i) as string,
 				backend: this.getNodeParameter('backend', i) as string,
 				language: this.getNodeParameter('language', i) as string,
 			};
 
+			const jobId = this.getNodeParameter('jobId', i) as string;
+			if (jobId.trim() !== '') payload.job_id = jobId;
+			else payload.input = this.getNodeParameter('input', i) as string;
+
 			const outputPath = this.getNodeParameter('output', i) as string;
 			const modelName = this.getNodeParameter('model', i) as string;
 			if (outputPath.trim() !== '') payload.output = outputPath;
@@ -0,0 +1,292 @@
+"""Bulk mail-merge rendering: one template, many data rows."""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import re
+import string
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence
+
+from . import renderer
+from .renderer import TemplateValidationError
+from .validators import validate_output_subdir
+
+LOGGER = logging.getLogger("docx_template_fill")
+
+# Worker processes are forked from the webhook worker, so keep the default small; requests cannot exceed it.
+BATCH_MAX_WORKERS = int(os.getenv("DOCX_TEMPLATE_BATCH_WORKERS", "0")) or max(1, min(4, (os.cpu_count() or 2) // 2))
+ROWS_ROOT = Path(os.getenv("DOCX_ROWS_ROOT", "/shared/artifacts"))
+ROWS_FILE_SUFFIXES = {".csv", ".ndjson", ".jsonl", ".json", ".xlsx"}
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+_ZIP_FILENAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.zip$", re.IGNORECASE)
+
+
+def _read_csv_rows(path: Path) -> Iterator[Dict[str, object]]:
+    with path.open("r", encoding="utf-8-sig", newline="") as handle:
+        reader = csv.DictReader(handle)
+        for index, row in enumerate(reader, start=1):
+            # DictReader collects surplus fields under the key None.
+            if None in row:
+                raise TemplateValidationError(
+                    f"rows_file row {index} (line {reader.line_num}) has extra columns beyond the header."
+                )
+            # ...and fills fields missing from short rows with None.
+            if any(value is None for value in row.values()):
+                raise TemplateValidationError(
+                    f"rows_file row {index} (line {reader.line_num}) has fewer fields than the header."
+                )
+            yield row
+
+
+def _read_ndjson_rows(path: Path) -> Iterator[Dict[str, object]]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise TemplateValidationError(f"Invalid JSON on line {line_number} of {path.name}: {exc}") from exc
+
+
+def _read_json_rows(path: Path) -> List[Dict[str, object]]:
+    try:
+        rows = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise TemplateValidationError(f"Invalid JSON in {path.name}: {exc}") from exc
+    if not isinstance(rows, list):
+        raise TemplateValidationError("rows_file JSON must contain an array of objects.")
+    return rows
+
+
+def _read_xlsx_rows(path: Path) -> Iterator[Dict[str, object]]:
+    try:
+        from openpyxl import load_workbook  # type: ignore
+    except ImportError as exc:  # pragma: no cover - dependency missing in environment
+        raise TemplateValidationError("openpyxl is required to read XLSX rows files.") from exc
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        values = workbook.active.iter_rows(values_only=True)
+        header = next(values, None)
+        if header is None:
+            return
+        keys = ["" if cell is None else str(cell).strip() for cell in header]
+        for row in values:
+            if row is None or all(cell is None for cell in row):
+                continue
+            yield {key: ("" if cell is None else cell) for key, cell in zip(keys, row) if key}
+    finally:
+        workbook.close()
+
+
+def resolve_rows_file(rows_file: str) -> Path:
+    """Resolve ``rows_file`` (absolute or relative to ``DOCX_ROWS_ROOT``) and keep it inside that root."""
+    if not isinstance(rows_file, str) or not rows_file.strip():
+        raise TemplateValidationError("rows_file must be a non-empty string.")
+    root = ROWS_ROOT.resolve()
+    path = (root / rows_file).resolve()
+    try:
+        path.relative_to(root)
+    except ValueError as exc:
+        raise TemplateValidationError(f"rows_file must be located inside {root}.") from exc
+    return path
+
+
+def load_rows_file(rows_file: str) -> List[Dict[str, object]]:
+    """Load data rows from a CSV, NDJSON/JSONL, JSON array or XLSX (first sheet, header row) file."""
+    path = resolve_rows_file(rows_file)
+    if not path.is_file():
+        raise TemplateValidationError(f"rows_file not found: {rows_file}")
+
+    suffix = path.suffix.lower()
+    if suffix not in ROWS_FILE_SUFFIXES:
+        raise TemplateValidationError(f"rows_file must be one of: {', '.join(sorted(ROWS_FILE_SUFFIXES))}.")
+    if suffix == ".csv":
+        return list(_read_csv_rows(path))
+    if suffix in {".ndjson", ".jsonl"}:
+        return list(_read_ndjson_rows(path))
+    if suffix == ".json":
+        return _read_json_rows(path)
+    return list(_read_xlsx_rows(path))
+
+
+def format_output_filename(pattern: str, row: Dict[str, object], index: int) -> str:
+    """Expand ``filename_pattern`` for one row.
+
+    Fields refer to row keys plus ``index`` (1-based row number), e.g.
+    ``letter_{index:04d}_{NAME}.docx``. Row values are reduced to letters,
+    digits, ``_`` and ``-`` so they always form a valid output filename.
+    """
+    fields: Dict[str, object] = {
+        key: _UNSAFE_FILENAME_CHARS.sub("_", str(value)).strip("_")
+        for key, value in row.items()
+        if isinstance(key, str)
+    }
+    fields["index"] = index
+    try:
+        filename = string.Formatter().vformat(pattern, (), fields)
+    except (KeyError, IndexError) as exc:
+        raise ValueError(f"filename_pattern references unknown field {exc}.") from exc
+    except ValueError as exc:
+        raise ValueError(f"Invalid filename_pattern: {exc}") from exc
+    if not filename.lower().endswith(".docx"):
+        filename += ".docx"
+    return filename
+
+
+def _validate_pattern(pattern: object) -> str:
+    if not isinstance(pattern, str) or not pattern.strip():
+        raise TemplateValidationError("filename_pattern is required in batch mode.")
+    try:
+        list(string.Formatter().parse(pattern))
+    except ValueError as exc:
+        raise TemplateValidationError(f"Invalid filename_pattern: {exc}") from exc
+    return pattern
+
+
+def _check_unique_filenames(rows: Sequence[Dict[str, object]], filename_pattern: str) -> None:
+    """Reject patterns that map two rows to the same file before any worker starts.
+
+    Rows whose filename cannot be formatted are skipped here and reported per row.
+    """
+    seen: Dict[str, int] = {}
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            continue
+        try:
+            filename = format_output_filename(filename_pattern, row, index)
+        except ValueError:
+            continue
+        if filename in seen:
+            raise TemplateValidationError(
+                f"filename_pattern yields {filename} for rows {seen[filename]} and {index}; "
+                "add {index} or another unique field."
+            )
+        seen[filename] = index
+
+
+def _init_worker(template_path: str) -> None:
+    # Parse the template once per worker; every row afterwards is a cache hit.
+    renderer.TEMPLATE_CACHE.get(Path(template_path))
+
+
+def _render_row(job: tuple) -> Dict[str, Any]:
+    index, template, row, output_subdir, filename_pattern = job
+    entry: Dict[str, Any] = {"index": index}
+    try:
+        if not isinstance(row, dict):
+            raise ValueError("row must be an object with string key/value pairs.")
+        entry["output_filename"] = format_output_filename(filename_pattern, row, index)
+        result = renderer.render_template(
+            template=template,
+            data=row,
+            output_subdir=output_subdir,
+            output_filename=entry["output_filename"],
+        )
+    except Exception as exc:  # noqa: BLE001 - reported per row in the manifest
+        LOGGER.warning("Row %s failed: %s", index, exc)
+        entry.update(status="error", error=str(exc))
+        return entry
+
+    entry.update(
+        status="ok",
+        output_file=result["output_file"],
+        placeholders_missing=result["placeholders_missing"],
+        unused_data_keys=result["unused_data_keys"],
+    )
+    return entry
+
+
+def _iter_results(jobs: Sequence[tuple], template_path: Path, workers: int) -> Iterator[Dict[str, Any]]:
+    if workers <= 1:
+        for job in jobs:
+            yield _render_row(job)
+        return
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(template_path),)) as pool:
+        yield from pool.map(_render_row, jobs, chunksize=chunksize)
+
+
+def render_batch(
+    *,
+    template: str,
+    rows: Sequence[Dict[str, object]],
+    filename_pattern: str,
+    output_subdir: str | None = None,
+    workers: int | None = None,
+    zip_filename: str | None = None,
+) -> Dict[str, object]:
+    """Render one output DOCX per row and return a manifest with per-row status.
+
+    Rows are spread over a process pool; each worker parses the template once.
+    With ``zip_filename`` the outputs are also appended to a ZIP archive next to
+    the documents as they complete; the archive is written to disk, not streamed.
+    """
+    if not isinstance(rows, (list, tuple)):
+        raise TemplateValidationError("rows must be an array of objects.")
+    if not rows:
+        raise TemplateValidationError("rows must contain at least one entry.")
+    filename_pattern = _validate_pattern(filename_pattern)
+
+    try:
+        template_path = renderer._build_template_path(template)
+        validated_subdir = validate_output_subdir(output_subdir)
+    except FileNotFoundError as exc:
+        raise TemplateValidationError(str(exc)) from exc
+    except ValueError as exc:
+        raise TemplateValidationError(str(exc)) from exc
+
+    output_dir = renderer._ensure_within_root(
+        renderer.OUTPUT_ROOT / validated_subdir if validated_subdir else renderer.OUTPUT_ROOT,
+        renderer.OUTPUT_ROOT,
+    )
+    zip_path = None
+    if zip_filename is not None:
+        if not isinstance(zip_filename, str) or not _ZIP_FILENAME_PATTERN.match(zip_filename):
+            raise TemplateValidationError("zip_filename may only contain letters, digits, '_', '-' and end with .zip.")
+        zip_path = output_dir / zip_filename
+        if zip_path.exists():
+            raise TemplateValidationError(f"Output file already exists: {zip_path}")
+
+    _check_unique_filenames(rows, filename_pattern)
+
+    worker_count = max(1, min(int(workers or BATCH_MAX_WORKERS), BATCH_MAX_WORKERS, len(rows)))
+    jobs = [(index, template, row, validated_subdir, filename_pattern) for index, row in enumerate(rows, start=1)]
+    LOGGER.info("Rendering batch of %s rows from %s with %s workers", len(jobs), template, worker_count)
+
+    manifest: List[Dict[str, Any]] = []
+    archive = None
+    if zip_path is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        archive = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED)
+    try:
+        for entry in _iter_results(jobs, template_path, worker_count):
+            if archive is not None and entry["status"] == "ok":
+                archive.write(entry["output_file"], arcname=Path(entry["output_file"]).name)
+            manifest.append(entry)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    rendered = sum(1 for entry in manifest if entry["status"] == "ok")
+    result: Dict[str, object] = {
+        "template": template,
+        "output_dir": str(output_dir),
+        "rows": len(manifest),
+        "rendered": rendered,
+        "failed": len(manifest) - rendered,
+        "workers": worker_count,
+        "manifest": manifest,
+    }
+    if zip_path is not None:
+        result["zip_file"] = str(zip_path)
+    return result
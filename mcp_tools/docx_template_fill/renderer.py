@@ -3,10 +3,14 @@
 from __future__ import annotations
 
 # Keep import declarations single to avoid syntax errors with future imports.
+import base64
+import io
 import logging
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Set, Tuple, Type
+from typing import Dict, FrozenSet, Set, Tuple, Type
 
 from .validators import (
     validate_data_mapping,
@@ -19,6 +23,10 @@ LOGGER = logging.getLogger("docx_template_fill")
 
 TEMPLATE_ROOT = Path(os.getenv("DOCX_TEMPLATE_ROOT", "/templates"))
 OUTPUT_ROOT = Path(os.getenv("DOCX_OUTPUT_ROOT", "/output"))
+TEMPLATE_CACHE_SIZE = int(os.getenv("DOCX_TEMPLATE_CACHE_SIZE", "16"))
+INLINE_MAX_BYTES = int(os.getenv("DOCX_INLINE_MAX_BYTES", str(8 * 1024 * 1024)))
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+RETURN_MODES = ("file", "inline", "stream")
 
 
 class TemplateValidationError(ValueError):
@@ -89,15 +97,129 @@ def _collect_placeholders(doc: object) -> Set[str]:
     return {str(item) for item in variables} if variables else set()
 
 
+def _compiled_template_environment(env_cls: Type[object], undefined_cls: Type[object]) -> object:
+    """Build a Jinja environment that reuses compiled templates for identical XML sources.
+
+    docxtpl compiles the patched document XML with ``from_string`` on every
+    render; for a cached template the source is the same each time.
+    """
+
+    class CompiledTemplateEnvironment(env_cls):  # type: ignore[misc, valid-type]
+        def __init__(self) -> None:
+            super().__init__(undefined=undefined_cls, autoescape=False)
+            self._compiled: Dict[str, object] = {}
+
+        def from_string(self, source, globals=None, template_class=None):  # noqa: A002
+            if globals or template_class:
+                return super().from_string(source, globals, template_class)
+            compiled = self._compiled.get(source)
+            if compiled is None:
+                compiled = super().from_string(source)
+                self._compiled[source] = compiled
+            return compiled
+
+    return CompiledTemplateEnvironment()
+
+
+class CachedTemplate:
+    """Parsed template state shared by all renders of one template version."""
+
+    def __init__(self, *, raw: bytes, placeholders: FrozenSet[str], jinja_env: object, mtime_ns: int, size: int):
+        self.raw = raw
+        self.placeholders = placeholders
+        self.jinja_env = jinja_env
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+    def clone(self, template_cls: Type[object]) -> object:
+        """Open a fresh, renderable template from the cached package bytes."""
+        return template_cls(io.BytesIO(self.raw))  # type: ignore[call-arg]
+
+
+class TemplateCache:
+    """LRU cache of parsed templates keyed by path and modification time."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(0, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CachedTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_path: Path) -> CachedTemplate:
+        stat = template_path.stat()
+        key = str(template_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = _load_template(template_path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            self.misses += 1
+            if self.max_entries:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _load_template(template_path: Path, mtime_ns: int, size: int) -> CachedTemplate:
+    DocxTemplateCls, JinjaEnv, JinjaUndefined = _load_dependencies()
+    try:
+        raw = template_path.read_bytes()
+        doc = DocxTemplateCls(io.BytesIO(raw))  # type: ignore[call-arg]
+    except Exception as exc:  # pragma: no cover - dependency error is environmental
+        LOGGER.error("Failed to load template: %s", exc)
+        raise RenderingError(f"Unable to open template: {exc}") from exc
+
+    return CachedTemplate(
+        raw=raw,
+        placeholders=frozenset(_collect_placeholders(doc)),
+        jinja_env=_compiled_template_environment(JinjaEnv, JinjaUndefined),
+        mtime_ns=mtime_ns,
+        size=size,
+    )
+
+
+TEMPLATE_CACHE = TemplateCache(TEMPLATE_CACHE_SIZE)
+
+
+def _build_return_payload(buffer: io.BytesIO, filename: str, return_mode: str) -> Dict[str, object]:
+    size = buffer.getbuffer().nbytes
+    payload: Dict[str, object] = {"filename": filename, "mime_type": DOCX_MIME_TYPE, "size_bytes": size}
+    if return_mode == "stream":
+        buffer.seek(0)
+        payload["content_stream"] = buffer
+        return payload
+    if size > INLINE_MAX_BYTES:
+        raise TemplateValidationError(
+            f"Rendered document is {size} bytes; use return=stream above {INLINE_MAX_BYTES} bytes."
+        )
+    payload["content_base64"] = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return payload
+
+
 def render_template(
     *,
     template: str,
     data: Dict[str, object],
     output_subdir: str | None,
     output_filename: str,
+    return_mode: str = "file",
 ) -> Dict[str, object]:
     """Render a DOCX template to the output path.
 
+    With ``return_mode`` ``inline`` (base64) or ``stream`` (``content_stream``
+    buffer) the document is rendered in memory and nothing is written to disk.
+
     Returns metadata about the rendering process.
     """
 
@@ -107,9 +229,15 @@ def render_template(
     )
 
     try:
+        if return_mode not in RETURN_MODES:
+            raise TemplateValidationError(f"return must be one of: {', '.join(RETURN_MODES)}.")
         validated_data = validate_data_mapping(data)
         template_path = _build_template_path(template)
-        output_path = _build_output_path(output_subdir, output_filename)
+        if return_mode == "file":
+            output_path = _build_output_path(output_subdir, output_filename)
+        else:
+            output_path = None
+            output_filename = validate_output_filename(output_filename)
     except TemplateValidationError:
         raise
     except FileNotFoundError:
@@ -117,27 +245,37 @@ def render_template(
     except ValueError as exc:
         raise TemplateValidationError(str(exc)) from exc
 
-    DocxTemplateCls, JinjaEnv, JinjaUndefined = _load_dependencies()
+    DocxTemplateCls, _, _ = _load_dependencies()
 
+    cached = TEMPLATE_CACHE.get(template_path)
     try:
-        doc = DocxTemplateCls(str(template_path))  # type: ignore[call-arg]
+        doc = cached.clone(DocxTemplateCls)
     except Exception as exc:  # pragma: no cover - dependency error is environmental
         LOGGER.error("Failed to load template: %s", exc)
         raise RenderingError(f"Unable to open template: {exc}") from exc
 
-    placeholders = _collect_placeholders(doc)
+    placeholders = cached.placeholders
     missing_in_data = sorted([name for name in placeholders if name not in validated_data])
     unused_data_keys = sorted([key for key in validated_data if key not in placeholders])
 
-    env = JinjaEnv(undefined=JinjaUndefined, autoescape=False)
-
+    buffer = io.BytesIO() if output_path is None else None
     try:
-        doc.render(validated_data, jinja_env=env)
-        doc.save(str(output_path))
+        doc.render(validated_data, jinja_env=cached.jinja_env)
+        doc.save(buffer if buffer is not None else str(output_path))
     except Exception as exc:  # pragma: no cover - docxtpl internal error
         LOGGER.error("Rendering failed: %s", exc)
         raise RenderingError(f"Rendering failed: {exc}") from exc
 
+    summary = {
+        "template": template,
+        "placeholders_in_template": sorted(placeholders),
+        "placeholders_missing": missing_in_data,
+        "unused_data_keys": unused_data_keys,
+    }
+    if buffer is not None:
+        LOGGER.info("Rendered output returned %s", return_mode, extra={"output_filename": output_filename})
+        return {**summary, **_build_return_payload(buffer, output_filename, return_mode)}
+
     LOGGER.info(
         "Rendered output created",
         extra={
@@ -147,10 +285,4 @@ def render_template(
         },
     )
 
-    return {
-        "output_file": str(output_path),
-        "template": template,
-        "placeholders_in_template": sorted(placeholders),
-        "placeholders_missing": missing_in_data,
-        "unused_data_keys": unused_data_keys,
-    }
+    return {"output_file": str(output_path), **summary}
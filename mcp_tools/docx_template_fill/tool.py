@@ -10,7 +10,9 @@ import sys
 from pathlib import Path
 from typing import Any, Dict
 
+from .batch import load_rows_file, render_batch
 from .renderer import RenderingError, TemplateValidationError, render_template
+from .validators import default_output_filename
 
 LOGGER = logging.getLogger("docx_template_fill")
 DEFAULT_LOG_PATH = os.getenv("DOCX_TEMPLATE_FILL_LOG_PATH", "/logs/docx-template-fill.log")
@@ -79,23 +81,79 @@ def fill_docx_template(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     if "template" not in payload:
         raise TemplateValidationError("template is required.")
-    if "output_filename" not in payload:
+    if "rows" in payload or "rows_file" in payload:
+        return _fill_docx_template_batch(payload)
+    return_mode = str(payload.get("return") or "file").strip().lower()
+    if "output_filename" not in payload and return_mode == "file":
         raise TemplateValidationError("output_filename is required.")
     if "data" not in payload:
         raise TemplateValidationError("data is required.")
 
+    if payload.get("also_pdf") and return_mode != "file":
+        raise TemplateValidationError("also_pdf requires return=file.")
+
     try:
-        return render_template(
+        result = render_template(
             template=payload["template"],
             data=payload["data"],
             output_subdir=payload.get("output_subdir"),
-            output_filename=payload["output_filename"],
+            output_filename=payload.get("output_filename") or default_output_filename(payload["template"]),
+            return_mode=return_mode,
         )
     except FileNotFoundError as exc:
         raise TemplateValidationError(str(exc)) from exc
     except ValueError as exc:
         raise TemplateValidationError(str(exc)) from exc
 
+    if payload.get("also_pdf"):
+        pdf = _convert_to_pdf([result["output_file"]])[0]
+        if pdf["status"] != "ok":
+            raise RenderingError(f"PDF conversion failed: {pdf['error']}")
+        result["pdf_file"] = pdf["output_file"]
+    return result
+
+
+def _convert_to_pdf(paths: list[str]) -> list[Dict[str, Any]]:
+    try:
+        from tools.docx_to_pdf import convert_to_pdf
+    except ImportError as exc:  # pragma: no cover - toolhub tools not on sys.path
+        raise RenderingError("also_pdf requires the Toolhub docx-to-pdf converter (tools.docx_to_pdf).") from exc
+    return convert_to_pdf(paths)
+
+
+def _fill_docx_template_batch(payload: Dict[str, Any]) -> Dict[str, Any]:
+    rows = payload.get("rows")
+    if rows is None:
+        rows = load_rows_file(payload["rows_file"])
+
+    workers = payload.get("workers")
+    if workers is not None:
+        try:
+            workers = int(workers)
+        except (TypeError, ValueError) as exc:
+            raise TemplateValidationError("workers must be an integer.") from exc
+
+    result = render_batch(
+        template=payload["template"],
+        rows=rows,
+        filename_pattern=payload.get("filename_pattern"),
+        output_subdir=payload.get("output_subdir"),
+        workers=workers,
+        zip_filename=payload.get("zip_filename"),
+    )
+
+    if payload.get("also_pdf"):
+        rendered = [entry for entry in result["manifest"] if entry["status"] == "ok"]
+        # One pool call for the whole batch so conversions spread over all converter slots.
+        pdfs = _convert_to_pdf([entry["output_file"] for entry in rendered]) if rendered else []
+        for entry, pdf in zip(rendered, pdfs):
+            if pdf["status"] == "ok":
+                entry["pdf_file"] = pdf["output_file"]
+            else:
+                entry["pdf_error"] = pdf["error"]
+        result["pdf_converted"] = sum(1 for entry in rendered if "pdf_file" in entry)
+    return result
+
 
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Fill a DOCX template with data.")
@@ -107,6 +165,9 @@ def main(argv: list[str] | None = None) -> int:
 
     try:
         payload = _load_payload(args)
+        if isinstance(payload, dict) and str(payload.get("return") or "").strip().lower() == "stream":
+            # stdout carries the JSON result here; raw DOCX bytes need scripts/docx-template-fill.py.
+            raise CliError("return=stream is not supported by this CLI; use return=inline or scripts/docx-template-fill.py --return stream.")
         result = fill_docx_template(payload)
         print(json.dumps(result, ensure_ascii=False))
         return 0
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import re
+from pathlib import PurePosixPath
 from typing import Dict
 
 TEMPLATE_EXTENSION = ".docx"
@@ -11,6 +12,7 @@ OUTPUT_EXTENSION = ".docx"
 _TEMPLATE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
 _OUTPUT_FILENAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.docx$", re.IGNORECASE)
 _OUTPUT_SUBDIR_PATTERN = re.compile(r"^[A-Za-z0-9_\-/]*$")
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
 
 
 def _ensure_docx(name: str, field: str) -> None:
@@ -57,6 +59,12 @@ def validate_output_filename(filename: str) -> str:
     return filename
 
 
+def default_output_filename(template: object) -> str:
+    """Derive a valid output filename from a template name (``offer.v2.docx`` -> ``offer_v2.docx``)."""
+    stem = PurePosixPath(str(template).replace("\\", "/")).stem
+    return (_UNSAFE_FILENAME_CHARS.sub("_", stem).strip("_") or "document") + OUTPUT_EXTENSION
+
+
 def validate_output_subdir(subdir: str | None) -> str | None:
     """Validate an optional output subdirectory string."""
     if subdir is None:
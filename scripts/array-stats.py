@@ -1,82 +1,413 @@
 #!/usr/bin/env python3
 #==MCP==
 # {
-#   "description": "Calculate descriptive statistics from numeric arrays.",
+#   "description": "Calculate descriptive statistics from numeric arrays (JSON, CSV, NDJSON, .npy or raw binary), streaming large inputs.",
 #   "schema": {
 #     "type": "object",
 #     "properties": {
 #       "numbers_json": { "type": "string" },
 #       "input_path": { "type": "string" },
+#       "input_format": { "type": "string", "enum": ["auto", "json", "csv", "ndjson", "npy", "raw"] },
+#       "column": { "type": "string", "description": "CSV column (header name or 0-based index) or NDJSON key." },
+#       "dtype": { "type": "string", "description": "Element type of raw binary input, e.g. float32 or <i4 (default float64)." },
+#       "no_median": { "type": "boolean", "description": "Skip the exact median (saves extra passes over large inputs)." },
 #       "output_dir": { "type": "string" },
 #       "output_filename": { "type": "string" }
 #     }
 #   }
 # }
 #==/MCP==
-"""Array statistics helper backed by numpy."""
+"""Array statistics helper backed by numpy.
+
+Large inputs are never loaded as a whole: ``.npy`` and raw binary files are
+memory-mapped, CSV and NDJSON are parsed in batches into a temporary float64
+file. Count, sum, mean, variance, min and max come from a single pass that
+merges per-chunk moments; the exact median is found by histogram refinement
+over the same chunks.
+"""
 
 import argparse
+import csv
 import json
+import math
+import os
+import tempfile
+from array import array
 from pathlib import Path
+from typing import Iterator, Optional
 
 import numpy as np
 
+INPUT_FORMATS = ("auto", "json", "csv", "ndjson", "npy", "raw")
+SUFFIX_FORMATS = {
+    ".json": "json",
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".npy": "npy",
+    ".bin": "raw",
+    ".raw": "raw",
+    ".f32": "raw",
+    ".f64": "raw",
+}
+CHUNK_SIZE = max(1, int(os.getenv("ARRAY_STATS_CHUNK_SIZE", str(1 << 20))))
+# Median search: bins per histogram pass, and the largest bin that is selected in memory.
+MEDIAN_BINS = 1 << 16
+MEDIAN_SELECT_MAX = 1 << 20
+CSV_DELIMITERS = ",;\t"
+
+
+class RunningStats:
+    """Streaming count/sum/mean/variance/min/max.
+
+    Every chunk is reduced with vectorised numpy calls and merged into the
+    running totals with the pairwise update of Chan et al., the chunked form of
+    Welford's algorithm. NaN values are skipped and counted separately.
+
+    Mean and m2 are kept in units of a power-of-two ``scale`` that covers the
+    largest magnitude seen so far, so values near the float64 limits do not
+    overflow the squared deviations; rescaling by a power of two is exact.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.nan_count = 0
+        self.total = 0.0
+        self.scale = 1.0
+        self.scaled_mean = 0.0
+        self.scaled_m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    @property
+    def mean(self) -> float:
+        return self.scaled_mean * self.scale
+
+    @property
+    def m2(self) -> float:
+        return self.scaled_m2 * self.scale * self.scale
+
+    @property
+    def variance(self) -> float:
+        return self.scaled_m2 / self.count * self.scale * self.scale
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.scaled_m2 / self.count) * self.scale
+
+    def update(self, chunk: np.ndarray) -> None:
+        values = chunk[~np.isnan(chunk)]
+        self.nan_count += chunk.size - values.size
+        if not values.size:
+            return
+        chunk_min, chunk_max = float(values.min()), float(values.max())
+        magnitude = max(abs(chunk_min), abs(chunk_max))
+        if math.isfinite(magnitude) and magnitude > self.scale:
+            # 2**(exponent - 1) <= magnitude, so scaled values stay below 2 without overflowing the scale itself.
+            scale = math.ldexp(1.0, math.frexp(magnitude)[1] - 1)
+            ratio = self.scale / scale
+            self.scaled_mean *= ratio
+            self.scaled_m2 *= ratio * ratio
+            self.scale = scale
+        scaled = values / self.scale
+        count = values.size
+        chunk_mean = float(scaled.mean())
+        chunk_m2 = float(np.square(scaled - chunk_mean).sum())
+        merged = self.count + count
+        delta = chunk_mean - self.scaled_mean
+        self.scaled_mean += delta * count / merged
+        self.scaled_m2 += chunk_m2 + delta * delta * self.count * count / merged
+        self.count = merged
+        self.total += float(values.sum())
+        self.minimum = min(self.minimum, chunk_min)
+        self.maximum = max(self.maximum, chunk_max)
+
+
+def iter_chunks(values: np.ndarray, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Yield float64 chunks of a 1-D, possibly memory-mapped array."""
+    for start in range(0, values.shape[0], chunk_size):
+        yield np.asarray(values[start : start + chunk_size], dtype=np.float64)
+
+
+def value_at_rank(values: np.ndarray, rank: int, low: float, high: float) -> float:
+    """Return the ``rank``-th smallest non-NaN value (0-based) within ``[low, high]``.
+
+    Each pass histograms the window and keeps only the bin holding the rank;
+    once that bin is small enough, its values are selected in memory. While
+    ``high - low`` overflows float64, the window is first halved by midpoint
+    bisection so the histogram edges stay finite.
+    """
+    while not math.isfinite(high - low):
+        middle = low / 2 + high / 2
+        at_or_below = sum(int(np.count_nonzero(chunk <= middle)) for chunk in iter_chunks(values))
+        if rank < at_or_below:
+            high = middle
+        else:
+            low = float(np.nextafter(middle, math.inf))
+    while low < high:
+        edges = np.linspace(low, high, MEDIAN_BINS + 1)
+        counts = np.zeros(MEDIAN_BINS, dtype=np.int64)
+        below = 0
+        for chunk in iter_chunks(values):
+            below += int(np.count_nonzero(chunk < low))
+            counts += np.histogram(chunk[(chunk >= low) & (chunk <= high)], bins=edges)[0]
+        cumulative = np.cumsum(counts)
+        index = int(np.searchsorted(cumulative, rank - below, side="right"))
+        bin_low, bin_high = edges[index], edges[index + 1]
+        closed = index == MEDIAN_BINS - 1  # numpy's last bin includes its right edge
+
+        def in_bin(chunk: np.ndarray) -> np.ndarray:
+            upper = chunk <= bin_high if closed else chunk < bin_high
+            return chunk[(chunk >= bin_low) & upper]
+
+        if counts[index] <= MEDIAN_SELECT_MAX:
+            offset = rank - below - (int(cumulative[index - 1]) if index else 0)
+            selected = np.concatenate([in_bin(chunk) for chunk in iter_chunks(values)])
+            return float(np.partition(selected, offset)[offset])
+        # Too many values (heavy ties): shrink the window to the bin's actual range.
+        low, high = math.inf, -math.inf
+        for chunk in iter_chunks(values):
+            members = in_bin(chunk)
+            if members.size:
+                low, high = min(low, float(members.min())), max(high, float(members.max()))
+    return float(low)
+
+
+def exact_median(values: np.ndarray, stats: RunningStats) -> Optional[float]:
+    if not (math.isfinite(stats.minimum) and math.isfinite(stats.maximum)):
+        return None  # histogram bins need a finite range
+    lower_rank, upper_rank = (stats.count - 1) // 2, stats.count // 2
+    lower = value_at_rank(values, lower_rank, stats.minimum, stats.maximum)
+    if upper_rank == lower_rank:
+        return lower
+    upper = value_at_rank(values, upper_rank, lower, stats.maximum)
+    middle = (lower + upper) / 2
+    return middle if math.isfinite(middle) else lower / 2 + upper / 2
+
+
+def detect_format(path: Path, requested: str) -> str:
+    if requested != "auto":
+        return requested
+    return SUFFIX_FORMATS.get(path.suffix.lower(), "json")
+
+
+def load_json_values(raw: str) -> np.ndarray:
+    try:
+        values = json.loads(raw)
+    except Exception as exc:  # noqa: BLE001
+        raise ValueError(f"Invalid JSON input: {exc}") from exc
+    if not isinstance(values, list) or not values:
+        raise ValueError("Input array must contain at least one number.")
+    # Convert values to numpy array for stable numeric calculations.
+    try:
+        return np.array(values, dtype=float).reshape(-1)
+    except Exception as exc:  # noqa: BLE001
+        raise ValueError(f"Non-numeric values in input: {exc}") from exc
+
+
+def is_real_dtype(dtype: np.dtype) -> bool:
+    return dtype == np.bool_ or (np.issubdtype(dtype, np.number) and not np.issubdtype(dtype, np.complexfloating))
+
+
+def open_npy(path: Path) -> np.ndarray:
+    values = np.load(path, mmap_mode="r", allow_pickle=False)
+    if not is_real_dtype(values.dtype):
+        raise ValueError(f"Unsupported .npy dtype: {values.dtype}")
+    # order="K" keeps Fortran-ordered arrays a view instead of copying them.
+    return values.ravel(order="K")
+
+
+def open_raw(path: Path, dtype_name: str) -> np.ndarray:
+    try:
+        dtype = np.dtype(dtype_name)
+    except TypeError as exc:
+        raise ValueError(f"Unknown dtype: {dtype_name}") from exc
+    if not is_real_dtype(dtype):
+        raise ValueError(f"Unsupported raw dtype: {dtype}")
+    size = path.stat().st_size
+    if size % dtype.itemsize:
+        raise ValueError(f"File size {size} is not a multiple of the {dtype} item size ({dtype.itemsize}).")
+    if not size:
+        raise ValueError("Input array must contain at least one number.")
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def parse_number(value: object, location: str) -> float:
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, bool):
+        raise ValueError(f"Non-numeric value at {location}: {value!r}")
+    try:
+        return float(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Non-numeric value at {location}: {value!r}") from exc
+
+
+class SingleColumnDialect(csv.excel):
+    """One value per line; a comma can only be a decimal comma."""
+
+    delimiter = ";"
+
+
+def sniff_csv_dialect(sample: str) -> type[csv.Dialect]:
+    first_line = sample.split("\n", 1)[0]
+    if not any(delimiter in first_line for delimiter in CSV_DELIMITERS):
+        # A header without delimiters means one column; "1,5" below it is 1.5, not two fields.
+        return SingleColumnDialect
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS)
+    except csv.Error:
+        return csv.excel
+
+
+def iter_csv_values(path: Path, column: Optional[str]) -> Iterator[float]:
+    with path.open("r", encoding="utf-8-sig", newline="") as handle:
+        sample = handle.read(65536)
+        handle.seek(0)
+        dialect = sniff_csv_dialect(sample)
+        # Semicolon/tab exports (German Excel) write decimal commas.
+        decimal_comma = dialect.delimiter != ","
+        reader = csv.reader(handle, dialect)
+        first = next(reader, None)
+        if first is None:
+            return
+        if column is not None and not column.isdigit():
+            if column not in first:
+                raise ValueError(f"CSV column not found: {column}")
+            index = first.index(column)
+            rows = reader
+        else:
+            index = int(column) if column is not None else 0
+            try:
+                cell = first[index] if index < len(first) else ""
+                parse_number(cell.replace(",", ".") if decimal_comma else cell, "line 1")
+                rows = _chain_row(first, reader)
+            except ValueError:
+                rows = reader  # first row is a header
+        width = len(first)
+        for row in rows:
+            if not row:
+                continue
+            if len(row) > width:
+                raise ValueError(
+                    f"CSV line {reader.line_num} has {len(row)} fields but line 1 has {width}; "
+                    "check the delimiter and decimal separator."
+                )
+            cell = row[index] if index < len(row) else ""
+            yield parse_number(cell.replace(",", ".") if decimal_comma else cell, f"line {reader.line_num}")
+
+
+def _chain_row(first: list, reader: Iterator[list]) -> Iterator[list]:
+    yield first
+    yield from reader
+
+
+def iter_ndjson_values(path: Path, key: Optional[str]) -> Iterator[float]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Invalid JSON on line {line_number}: {exc}") from exc
+            if key is not None:
+                record = record.get(key) if isinstance(record, dict) else None
+            yield parse_number(record, f"line {line_number}")
+
+
+def spool_values(values: Iterator[float], workdir: Path) -> np.ndarray:
+    """Write parsed text values to a float64 file in batches and memory-map it."""
+    spool_path = workdir / "values.f64"
+    batch = array("d")
+    with spool_path.open("wb") as handle:
+        for value in values:
+            batch.append(value)
+            if len(batch) >= CHUNK_SIZE:
+                batch.tofile(handle)
+                batch = array("d")
+        batch.tofile(handle)
+    if not spool_path.stat().st_size:
+        raise ValueError("Input array must contain at least one number.")
+    return np.memmap(spool_path, dtype=np.float64, mode="r")
+
+
+def compute_stats(values: np.ndarray, with_median: bool) -> dict:
+    stats = RunningStats()
+    for chunk in iter_chunks(values):
+        stats.update(chunk)
+    if not stats.count:
+        raise ValueError("Input array must contain at least one number.")
+    return {
+        "count": stats.count,
+        "min": stats.minimum,
+        "max": stats.maximum,
+        "sum": stats.total,
+        "mean": stats.mean,
+        "median": exact_median(values, stats) if with_median else None,
+        "std": stats.std,
+        "variance": stats.variance,
+        "nan_count": stats.nan_count,
+    }
+
 
 def main() -> int:
     """Read numeric values and write summary statistics."""
     parser = argparse.ArgumentParser(description="Calculate array statistics.")
     parser.add_argument("--numbers-json", help="Inline JSON array of numbers.")
-    parser.add_argument("--input-path", help="Path to a JSON file containing an array.")
+    parser.add_argument("--input-path", help="Path to a JSON, CSV, NDJSON, .npy or raw binary file.")
+    parser.add_argument(
+        "--input-format",
+        choices=INPUT_FORMATS,
+        default="auto",
+        help="Input format; auto detects it from the file suffix (default: auto).",
+    )
+    parser.add_argument("--column", help="CSV column (header name or 0-based index) or NDJSON key.")
+    parser.add_argument("--dtype", default="float64", help="Element type of raw binary input (default: float64).")
+    parser.add_argument("--no-median", action="store_true", help="Skip the exact median (extra passes over the data).")
     parser.add_argument("--output-dir", default="/shared/artifacts", help="Artifact output directory.")
     parser.add_argument("--output-filename", help="Optional output JSON filename.")
     args = parser.parse_args()
 
-    raw = args.numbers_json
-    if not raw and args.input_path:
-        source_path = Path(args.input_path)
-        if not source_path.is_file():
-            print(json.dumps({"status": "error", "error": f"Input JSON not found: {source_path}"}))
-            return 1
-        raw = source_path.read_text(encoding="utf-8")
-
-    if not raw:
+    if not args.numbers_json and not args.input_path:
         print(json.dumps({"status": "error", "error": "Either --numbers-json or --input-path is required."}))
         return 1
 
-    try:
-        values = json.loads(raw)
-    except Exception as exc:  # noqa: BLE001
-        print(json.dumps({"status": "error", "error": f"Invalid JSON input: {exc}"}))
-        return 1
-
-    if not isinstance(values, list) or not values:
-        print(json.dumps({"status": "error", "error": "Input array must contain at least one number."}))
-        return 1
+    input_format = "json"
+    if not args.numbers_json:
+        source_path = Path(args.input_path)
+        input_format = detect_format(source_path, args.input_format)
+        if not source_path.is_file():
+            print(json.dumps({"status": "error", "error": f"Input file not found: {source_path}"}))
+            return 1
 
-    # Convert values to numpy array for stable numeric calculations.
     try:
-        arr = np.array(values, dtype=float)
-    except Exception as exc:  # noqa: BLE001
-        print(json.dumps({"status": "error", "error": f"Non-numeric values in input: {exc}"}))
+        with tempfile.TemporaryDirectory(prefix="array-stats-") as workdir:
+            if args.numbers_json:
+                values = load_json_values(args.numbers_json)
+            elif input_format == "json":
+                values = load_json_values(source_path.read_text(encoding="utf-8"))
+            elif input_format == "npy":
+                values = open_npy(source_path)
+            elif input_format == "raw":
+                values = open_raw(source_path, args.dtype)
+            elif input_format == "csv":
+                values = spool_values(iter_csv_values(source_path, args.column), Path(workdir))
+            else:
+                values = spool_values(iter_ndjson_values(source_path, args.column), Path(workdir))
+            stats = compute_stats(values, with_median=not args.no_median)
+            del values  # release the memory map before the spool directory is removed
+    except (OSError, ValueError) as exc:
+        print(json.dumps({"status": "error", "error": str(exc)}))
         return 1
 
-    stats = {
-        "count": int(arr.size),
-        "min": float(np.min(arr)),
-        "max": float(np.max(arr)),
-        "sum": float(np.sum(arr)),
-        "mean": float(np.mean(arr)),
-        "median": float(np.median(arr)),
-        "std": float(np.std(arr)),
-    }
-
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     output_name = args.output_filename or "array_stats.json"
     output_path = output_dir / output_name
     output_path.write_text(json.dumps(stats, ensure_ascii=False, indent=2), encoding="utf-8")
 
-    print(json.dumps({"status": "ok", "output_file": str(output_path), "stats": stats}))
+    print(json.dumps({"status": "ok", "output_file": str(output_path), "input_format": input_format, "stats": stats}))
     return 0
 
 
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+#==MCP==
+# {
+#   "description": "Incrementally split all new or changed recordings in a directory with a bounded worker pool.",
+#   "schema": {
+#     "type": "object",
+#     "properties": {
+#       "input_dir": { "type": "string", "description": "Directory with source recordings." },
+#       "pattern": { "type": "string", "description": "Glob pattern for input files (default *.m4a)." },
+#       "output_root": { "type": "string", "description": "Root directory for per-recording output folders." },
+#       "mode": { "type": "string", "enum": ["fixed", "silence"] },
+#       "chunk_length": { "type": "number", "description": "Target chunk length in seconds." },
+#       "silence_seek": { "type": "number" },
+#       "silence_duration": { "type": "number" },
+#       "silence_threshold": { "type": "number" },
+#       "padding": { "type": "number" },
+#       "enhance": { "type": "boolean" },
+#       "enhance_speech": { "type": "boolean" },
+#       "workers": { "type": "number", "description": "Maximum parallel split jobs." },
+#       "force": { "type": "boolean", "description": "Re-split every input regardless of state." },
+#       "dry_run": { "type": "boolean", "description": "Only report which inputs would be split." }
+#     }
+#   }
+# }
+#==/MCP==
+"""Incremental batch splitting for the nightly audio cron job.
+
+Each input is split into ``<output_root>/<stem>`` via ``audio-split.sh``. A
+processed-state index (content hash + mtime + split options) lets unchanged
+inputs be skipped, new inputs are processed by a bounded process pool, and
+every finished job gets an atomically written completion marker.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+LOG_PATH = os.getenv("AUDIO_BATCH_SPLIT_LOG_PATH", "/logs/audio-batch-split.log")
+LOG_LEVEL = os.getenv("AUDIO_BATCH_SPLIT_LOG_LEVEL", "INFO").upper()
+DEFAULT_WORKERS = int(os.getenv("AUDIO_BATCH_SPLIT_WORKERS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+STATE_FILENAME = ".batch-split-state.json"
+COMPLETION_MARKER = ".complete.json"
+CHUNK_INDEX_FILENAME = "chunks.ndjson"
+SPLIT_TIMEOUT_SECONDS = 3600
+HASH_BLOCK_SIZE = 1024 * 1024
+
+LOGGER = logging.getLogger("audio-batch-split")
+
+
+def configure_logging() -> None:
+    """Configure file logging with a safe fallback to stderr."""
+    level = getattr(logging, LOG_LEVEL, logging.INFO)
+    LOGGER.setLevel(level)
+
+    formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if LOGGER.handlers:
+        return
+
+    try:
+        log_path = Path(LOG_PATH)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_path, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        file_handler.setLevel(level)
+        LOGGER.addHandler(file_handler)
+    except Exception:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        stream_handler.setLevel(level)
+        LOGGER.addHandler(stream_handler)
+
+
+def resolve_split_script(value: str | None) -> Path:
+    """Resolve audio-split.sh for container and local-dev layouts."""
+    if value:
+        return Path(value)
+    preferred = Path("/scripts/audio-split.sh")
+    if preferred.is_file():
+        return preferred
+    return Path(__file__).resolve().parent / "audio-split.sh"
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in fixed-size blocks to keep memory flat for long recordings."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: Path, payload: dict) -> None:
+    """Write JSON through a temp file and rename so readers never see partial content."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        json.dump(payload, fh, ensure_ascii=False, indent=2)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_state(state_path: Path) -> dict:
+    """Load the processed-state index, starting fresh when it is missing or corrupt."""
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.warning("Ignoring unreadable state file %s: %s", state_path, exc)
+        return {}
+    entries = state.get("entries") if isinstance(state, dict) else None
+    return entries if isinstance(entries, dict) else {}
+
+
+def build_split_options(args: argparse.Namespace) -> dict:
+    """Collect the split options that influence output, used for state comparison."""
+    options = {
+        "mode": args.mode,
+        "chunk_length": args.chunk_length,
+        "enhance": bool(args.enhance),
+        "enhance_speech": bool(args.enhance_speech),
+    }
+    if args.mode == "silence":
+        options.update(
+            {
+                "silence_seek": args.silence_seek,
+                "silence_duration": args.silence_duration,
+                "silence_threshold": args.silence_threshold,
+                "padding": args.padding,
+            }
+        )
+    return options
+
+
+def build_split_command(split_script: Path, input_path: Path, output_dir: Path, options: dict, sha256: str) -> list[str]:
+    """Build audio-split.sh arguments; the known hash lets the script reuse its analysis cache."""
+    cmd = [
+        "bash",
+        str(split_script),
+        "--mode",
+        options["mode"],
+        "--chunk-length",
+        str(options["chunk_length"]),
+        "--input",
+        str(input_path),
+        "--output",
+        str(output_dir),
+        "--input-sha256",
+        sha256,
+    ]
+    if options["mode"] == "silence":
+        cmd += [
+            "--silence-seek",
+            str(options["silence_seek"]),
+            "--silence-duration",
+            str(options["silence_duration"]),
+            "--silence-threshold",
+            str(options["silence_threshold"]),
+            "--padding",
+            str(options["padding"]),
+        ]
+    if options["enhance_speech"]:
+        cmd.append("--enhance-speech")
+    elif options["enhance"]:
+        cmd.append("--enhance")
+    return cmd
+
+
+def is_unchanged(entry: dict | None, stat: os.stat_result, options: dict, output_dir: Path) -> bool:
+    """Check the cheap mtime/size fingerprint before paying for a content hash."""
+    if not isinstance(entry, dict):
+        return False
+    return (
+        entry.get("mtime_ns") == stat.st_mtime_ns
+        and entry.get("size") == stat.st_size
+        and entry.get("options") == options
+        and (output_dir / COMPLETION_MARKER).is_file()
+    )
+
+
+def clear_previous_output(output_dir: Path) -> None:
+    """Drop stale chunks so a re-split never mixes old and new parts."""
+    if not output_dir.is_dir():
+        return
+    for entry in output_dir.iterdir():
+        if entry.name.startswith("part_") or entry.name in {CHUNK_INDEX_FILENAME, COMPLETION_MARKER}:
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink(missing_ok=True)
+
+
+def process_input(
+    input_path: str,
+    output_dir: str,
+    options: dict,
+    previous_sha256: str | None,
+    split_script: str,
+    dry_run: bool,
+) -> dict:
+    """Hash one input and split it unless its content is already processed (pool worker)."""
+    source = Path(input_path)
+    target = Path(output_dir)
+    started = time.time()
+    sha256 = file_sha256(source)
+    stat = source.stat()
+    result = {
+        "input": input_path,
+        "output_dir": output_dir,
+        "sha256": sha256,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "options": options,
+    }
+
+    # Touched but identical files only need their fingerprint refreshed.
+    if previous_sha256 == sha256 and (target / COMPLETION_MARKER).is_file():
+        result["status"] = "unchanged"
+        return result
+
+    if dry_run:
+        result["status"] = "pending"
+        return result
+
+    clear_previous_output(target)
+    target.mkdir(parents=True, exist_ok=True)
+    cmd = build_split_command(Path(split_script), source, target, options, sha256)
+    completed = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=SPLIT_TIMEOUT_SECONDS)
+    if completed.returncode != 0:
+        result["status"] = "failed"
+        result["error"] = completed.stderr.strip() or completed.stdout.strip() or f"exit code {completed.returncode}"
+        return result
+
+    chunk_count = sum(1 for entry in target.iterdir() if entry.name.startswith("part_"))
+    result.update(
+        {
+            "status": "split",
+            "chunk_count": chunk_count,
+            "duration_seconds": round(time.time() - started, 3),
+            "completed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+    )
+    write_json_atomic(target / COMPLETION_MARKER, result)
+    return result
+
+
+def main() -> int:
+    """CLI entrypoint for incremental batch splitting."""
+    parser = argparse.ArgumentParser(description="Incrementally split new recordings in parallel.")
+    parser.add_argument("--input-dir", default="/shared/audio/in", help="Directory with source recordings.")
+    parser.add_argument("--pattern", default="*.m4a", help="Glob pattern for input files.")
+    parser.add_argument("--output-root", default="/shared/audio/out", help="Root for per-recording output folders.")
+    parser.add_argument("--mode", choices=["fixed", "silence"], default="fixed", help="Split mode.")
+    parser.add_argument("--chunk-length", type=int, default=600, help="Target chunk length in seconds.")
+    parser.add_argument("--silence-seek", type=int, default=60, help="Silence search window in seconds.")
+    parser.add_argument("--silence-duration", type=float, default=0.5, help="Minimum silence duration in seconds.")
+    parser.add_argument("--silence-threshold", type=float, default=-30.0, help="Silence threshold in dB.")
+    parser.add_argument("--padding", type=float, default=0.0, help="Padding before silence cut points.")
+    parser.add_argument("--enhance", action="store_true", help="Enable generic enhancement filter chain.")
+    parser.add_argument("--enhance-speech", action="store_true", help="Enable speech-focused enhancement filter chain.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Maximum parallel split jobs.")
+    parser.add_argument("--state-file", help=f"Processed-state index (default <output-root>/{STATE_FILENAME}).")
+    parser.add_argument("--split-script", help="Override the audio-split.sh path.")
+    parser.add_argument("--force", action="store_true", help="Re-split every input regardless of state.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which inputs would be split.")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    if args.enhance and args.enhance_speech:
+        print(json.dumps({"status": "error", "error": "Cannot use both enhance and enhance_speech simultaneously"}))
+        return 1
+
+    # audio-split.sh resolves relative paths against its own base dirs, so pass absolute ones.
+    input_dir = Path(args.input_dir).resolve()
+    output_root = Path(args.output_root).resolve()
+    state_path = Path(args.state_file).resolve() if args.state_file else output_root / STATE_FILENAME
+    split_script = resolve_split_script(args.split_script)
+    options = build_split_options(args)
+
+    try:
+        if not input_dir.is_dir():
+            raise FileNotFoundError(f"Input directory not found: {input_dir}")
+        output_root.mkdir(parents=True, exist_ok=True)
+
+        entries = {} if args.force else load_state(state_path)
+        inputs = sorted(path for path in input_dir.glob(args.pattern) if path.is_file())
+        skipped = []
+        candidates = []
+        for input_path in inputs:
+            key = str(input_path.resolve())
+            output_dir = output_root / input_path.stem
+            if is_unchanged(entries.get(key), input_path.stat(), options, output_dir):
+                skipped.append(str(input_path))
+                continue
+            entry = entries.get(key) if isinstance(entries.get(key), dict) else {}
+            previous_sha256 = entry.get("sha256") if entry.get("options") == options else None
+            candidates.append((key, str(input_path), str(output_dir), previous_sha256))
+
+        LOGGER.info(
+            "Batch split: %d input(s), %d skipped by fingerprint, %d candidate(s), workers=%d",
+            len(inputs),
+            len(skipped),
+            len(candidates),
+            args.workers,
+        )
+
+        split, failed, pending = [], [], []
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {
+                pool.submit(process_input, path, output_dir, options, previous_sha256, str(split_script), args.dry_run): key
+                for key, path, output_dir, previous_sha256 in candidates
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    LOGGER.exception("Batch split worker failed for %s", key)
+                    failed.append({"input": key, "error": str(exc)})
+                    continue
+
+                status = result["status"]
+                LOGGER.info("Batch split %s: %s", status, result["input"])
+                if status == "failed":
+                    failed.append({"input": result["input"], "error": result.get("error")})
+                    continue
+                if status == "pending":
+                    pending.append(result["input"])
+                    continue
+                if status == "unchanged":
+                    skipped.append(result["input"])
+                else:
+                    split.append(result)
+                previous_entry = entries.get(key) if isinstance(entries.get(key), dict) else {}
+                entries[key] = {
+                    field: result[field]
+                    for field in ("sha256", "mtime_ns", "size", "options", "output_dir")
+                }
+                entries[key]["completed_at"] = result.get("completed_at") or previous_entry.get("completed_at")
+
+                # Persist after every job so an interrupted night keeps its progress.
+                if not args.dry_run:
+                    write_json_atomic(state_path, {"version": 1, "entries": entries})
+
+        response = {
+            "status": "ok" if not failed else "error",
+            "dry_run": args.dry_run,
+            "input_count": len(inputs),
+            "split": [
+                {"input": item["input"], "output_dir": item["output_dir"], "chunk_count": item["chunk_count"]}
+                for item in split
+            ],
+            "skipped": len(skipped),
+            "pending": pending,
+            "failed": failed,
+            "state_file": str(state_path),
+        }
+        print(json.dumps(response, ensure_ascii=False))
+        return 0 if not failed else 1
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.exception("Batch split failed: %s", exc)
+        print(json.dumps({"status": "error", "error": str(exc)}))
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
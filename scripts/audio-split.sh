@@ -14,14 +14,16 @@
 #       "silence_threshold": { "type": "number", "description": "Silence threshold in dB." },
 #       "padding": { "type": "number", "description": "Padding in seconds before selected split point." },
 #       "enhance": { "type": "boolean", "description": "Enable generic enhancement filter chain." },
-#       "enhance_speech": { "type": "boolean", "description": "Enable speech-focused enhancement filter chain." }
+#       "enhance_speech": { "type": "boolean", "description": "Enable speech-focused enhancement filter chain." },
+#       "input_sha256": { "type": "string", "description": "Optional precomputed SHA-256 of the input file (skips hashing)." },
+#       "no_analysis_cache": { "type": "boolean", "description": "Bypass the cached ffprobe/silencedetect analysis." }
 #     },
 #     "required": ["mode", "chunk_length", "input"]
 #   }
 # }
 #==/MCP==
 set -euo pipefail
-LOGFILE="/logs/audio-split.log"
+LOGFILE="${TOOLHUB_LOG_DIR:-/logs}/audio-split.log"
 # Ensure log directories exist
 mkdir -p "$(dirname "$LOGFILE")"
 # Initialize log files
@@ -43,15 +45,19 @@ done
 echo "Verified required commands: ffmpeg, ffprobe, bc"
 # audio-split.sh - Split audio files in fixed or silence-based chunks
 # Usage:
-#   ./audio-split.sh --mode fixed|silence --chunk-length <seconds> --input <file> [--output <dir>] [--silence-seek <seconds>] [--silence-duration <seconds>] [--silence-threshold <dB>] [--padding <seconds>] [--enhance] [--enhance-speech]
+#   ./audio-split.sh --mode fixed|silence --chunk-length <seconds> --input <file> [--output <dir>] [--silence-seek <seconds>] [--silence-duration <seconds>] [--silence-threshold <dB>] [--padding <seconds>] [--enhance] [--enhance-speech] [--input-sha256 <hex>] [--no-analysis-cache]
 
 
 # Default directories
-BASE_DIR="/shared/audio"
+BASE_DIR="${AUDIO_SPLIT_BASE_DIR:-/shared/audio}"
 BASE_IN_DIR="$BASE_DIR/in"
 BASE_OUT_DIR="$BASE_DIR/out"
 mkdir -p "$BASE_DIR"
 
+# Analysis cache: one compact JSON sidecar per input content hash and enhancement profile.
+ANALYSIS_CACHE_DIR="${AUDIO_ANALYSIS_CACHE_DIR:-$BASE_DIR/cache/analysis}"
+ANALYSIS_CACHE="${AUDIO_ANALYSIS_CACHE:-1}"
+
 # Parse arguments
 while [[ $# -gt 0 ]]; do
   case "$1" in
@@ -65,6 +71,8 @@ while [[ $# -gt 0 ]]; do
     --padding) PADDING="$2"; shift 2;;
     --enhance) ENHANCE=1; shift ;;
     --enhance-speech) ENHANCE_SPEECH=1; shift ;;
+    --input-sha256) INPUT_SHA256="$2"; shift 2;;
+    --no-analysis-cache) ANALYSIS_CACHE=0; shift ;;
     *) echo "Unknown parameter: $1"; exit 1;;
   esac
 done
@@ -78,7 +86,7 @@ fi
 
 # Validate required parameters
 if [[ -z "${MODE-}" || -z "${CHUNK_LENGTH-}" || -z "${INPUT_PATH-}" ]]; then
-  echo "Usage: $0 --mode fixed|silence --chunk-length <seconds> --input <file> [--output <dir>] [--silence-seek <seconds>] [--silence-duration <seconds>] [--silence-threshold <dB>] [--padding <seconds>] [--enhance] [--enhance-speech]"
+  echo "Usage: $0 --mode fixed|silence --chunk-length <seconds> --input <file> [--output <dir>] [--silence-seek <seconds>] [--silence-duration <seconds>] [--silence-threshold <dB>] [--padding <seconds>] [--enhance] [--enhance-speech] [--input-sha256 <hex>] [--no-analysis-cache]"
   exit 1
 fi
 
@@ -99,12 +107,16 @@ else
   INPUT_FILE="$INPUT_PATH"
 fi
 echo "Resolved input file path: $INPUT_FILE"
+SOURCE_FILE="$INPUT_FILE"
 
 # Preprocess audio with optional filters
+ANALYSIS_PROFILE="raw"
 if [[ "${ENHANCE_SPEECH-}" == "1" ]]; then
   FILTERS="highpass=f=80, lowpass=f=4000, equalizer=f=1000:width_type=o:width=2:g=6, afftdn"
+  ANALYSIS_PROFILE="enhance-speech"
 elif [[ "${ENHANCE-}" == "1" ]]; then
   FILTERS="highpass=f=100, lowpass=f=3000, afftdn"
+  ANALYSIS_PROFILE="enhance"
 fi
 
 if [[ -n "${FILTERS-}" ]]; then
@@ -136,55 +148,186 @@ if [[ ! -f "$INPUT_FILE" ]]; then
   exit 1
 fi
 
-# Get total duration
-DURATION=$(ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$INPUT_FILE")
+# Resolve the analysis sidecar; analysis runs on the (enhanced) file, so the profile is part of the key.
+if [[ "$ANALYSIS_CACHE" == "1" ]] && ! command -v jq >/dev/null 2>&1; then
+  echo "Analysis cache disabled: jq not found"
+  ANALYSIS_CACHE=0
+fi
+if [[ "$ANALYSIS_CACHE" == "1" ]] && ! command -v flock >/dev/null 2>&1; then
+  echo "Analysis cache disabled: flock not found"
+  ANALYSIS_CACHE=0
+fi
+if [[ "$ANALYSIS_CACHE" == "1" ]]; then
+  mkdir -p "$ANALYSIS_CACHE_DIR"
+  if [[ -z "${INPUT_SHA256-}" ]]; then
+    INPUT_SHA256=$(sha256sum "$SOURCE_FILE" | cut -d' ' -f1)
+  fi
+  ANALYSIS_SIDECAR="$ANALYSIS_CACHE_DIR/${INPUT_SHA256}.${ANALYSIS_PROFILE}.json"
+  echo "Analysis sidecar: $ANALYSIS_SIDECAR"
+fi
+
+# Run a sidecar update under an exclusive lock so concurrent splits of the same
+# input never lose each other's read-modify-write changes.
+with_sidecar_lock() {
+  (
+    flock -w 60 9 || { echo "Analysis sidecar lock timeout: $ANALYSIS_SIDECAR" >&2; exit 1; }
+    "$@"
+  ) 9>"$ANALYSIS_SIDECAR.lock"
+}
+
+# Atomically replace the sidecar so concurrent splits never read a partial file.
+# Empty or invalid JSON (e.g. a failed jq run) leaves the current sidecar untouched.
+write_sidecar() {
+  local tmp_file
+  tmp_file=$(mktemp "$ANALYSIS_CACHE_DIR/.sidecar.XXXXXX")
+  cat > "$tmp_file"
+  if [[ -s "$tmp_file" ]] && jq -e 'type == "object"' "$tmp_file" >/dev/null 2>&1; then
+    mv -f "$tmp_file" "$ANALYSIS_SIDECAR"
+  else
+    rm -f "$tmp_file"
+    echo "Analysis sidecar not updated: invalid JSON" >&2
+    return 1
+  fi
+}
+
+# Store the probe result, keeping silence intervals a concurrent split may have added.
+store_probe_sidecar() {
+  local silences='{}'
+  if [[ -f "$ANALYSIS_SIDECAR" ]]; then
+    silences=$(jq -c '.silences // {}' "$ANALYSIS_SIDECAR" 2>/dev/null || echo '{}')
+  fi
+  echo "$PROBE_JSON" | jq -c --arg sha "$INPUT_SHA256" --arg profile "$ANALYSIS_PROFILE" --argjson silences "$silences" '{
+    version: 1,
+    sha256: $sha,
+    profile: $profile,
+    duration: (.format.duration | tonumber),
+    format: .format.format_name,
+    bit_rate: (.format.bit_rate // null | if . == null then null else tonumber end),
+    streams: [.streams[] | {index, codec_type, codec_name, sample_rate, channels, bit_rate}],
+    silences: $silences
+  }' | write_sidecar
+}
+
+# Add one set of silence intervals; re-reads the sidecar under the lock.
+store_silence_sidecar() {
+  [[ -f "$ANALYSIS_SIDECAR" ]] || return 0
+  jq -c --arg key "$SILENCE_KEY" --argjson intervals "$SILENCE_INTERVALS" '.silences[$key] = $intervals' "$ANALYSIS_SIDECAR" \
+    | write_sidecar
+}
+
+# Get total duration and stream info, reusing the cached probe when available
+DURATION=""
+if [[ -n "${ANALYSIS_SIDECAR-}" && -f "$ANALYSIS_SIDECAR" ]]; then
+  DURATION=$(jq -r '.duration // empty' "$ANALYSIS_SIDECAR" 2>/dev/null || true)
+  if [[ -n "$DURATION" ]]; then
+    echo "Analysis cache hit (probe): $ANALYSIS_SIDECAR"
+  fi
+fi
+if [[ -z "$DURATION" ]]; then
+  PROBE_JSON=$(ffprobe -v error \
+    -show_entries format=duration,bit_rate,format_name:stream=index,codec_type,codec_name,sample_rate,channels,bit_rate \
+    -of json "$INPUT_FILE")
+  DURATION=$(echo "$PROBE_JSON" | grep -oP '"duration": "\K[0-9.]+' | head -n 1)
+  if [[ -n "${ANALYSIS_SIDECAR-}" ]]; then
+    if with_sidecar_lock store_probe_sidecar; then
+      echo "Analysis cache stored (probe): $ANALYSIS_SIDECAR"
+    fi
+  fi
+fi
 echo "Total input duration: $DURATION seconds"
 START=0
 INDEX=1
 
+# Chunk index: one JSON line per finished chunk so callers can stream progress.
+CHUNK_INDEX="$OUTPUT_DIR/chunks.ndjson"
+: > "$CHUNK_INDEX"
+CHUNK_CODEC="aac"
+
+# Export one chunk, flush it to disk, then announce it with its timing metadata.
+# bitrate is the audio stream's codec bitrate as reported by ffprobe (null if unknown).
+# Cut reasons: fixed (hard interval), silence (snapped to a silence end),
+# boundary (no silence inside the seek window), end (end of input).
+export_chunk() {
+  local chunk_start="$1"
+  local chunk_duration="$2"
+  local cut_reason="$3"
+  local size_bytes bitrate
+  OUTFILE=$(printf "%s/part_%02d.m4a" "$OUTPUT_DIR" "$INDEX")
+  echo "Exporting $OUTFILE (start=$chunk_start, duration=$chunk_duration, cut=$cut_reason)"
+  echo "Running: ffmpeg -y -i \"$INPUT_FILE\" -ss \"$chunk_start\" -t \"$chunk_duration\" -c:a $CHUNK_CODEC \"$OUTFILE\""
+  ffmpeg -y -i "$INPUT_FILE" -ss "$chunk_start" -t "$chunk_duration" -c:a "$CHUNK_CODEC" "$OUTFILE" || { echo "Error splitting $OUTFILE" >&2; exit 1; }
+  sync "$OUTFILE"
+  size_bytes=$(stat -c %s "$OUTFILE")
+  bitrate=$(ffprobe -v error -select_streams a:0 -show_entries stream=bit_rate -of default=noprint_wrappers=1:nokey=1 "$OUTFILE" || true)
+  [[ "$bitrate" =~ ^[0-9]+$ ]] || bitrate=null
+  printf '{"index":%d,"filename":"%s","start":%.3f,"duration":%.3f,"end":%.3f,"size":%d,"codec":"%s","bitrate":%s,"cut_reason":"%s"}\n' \
+    "$INDEX" "$(basename "$OUTFILE")" "$chunk_start" "$chunk_duration" "$(echo "$chunk_start + $chunk_duration" | bc)" \
+    "$size_bytes" "$CHUNK_CODEC" "$bitrate" "$cut_reason" >> "$CHUNK_INDEX"
+  echo "Created chunk file: $OUTFILE"
+}
+
 if [[ "$MODE" == "fixed" ]]; then
   # Fixed interval splitting
   while (( $(echo "$START < $DURATION" | bc -l) )); do
     END=$(echo "$START + $CHUNK_LENGTH" | bc)
-    if (( $(echo "$END > $DURATION" | bc -l) )); then
+    CUT_REASON="fixed"
+    if (( $(echo "$END >= $DURATION" | bc -l) )); then
       END="$DURATION"
+      CUT_REASON="end"
     fi
     DURATION_PART=$(echo "$END - $START" | bc)
-    OUTFILE=$(printf "%s/part_%02d.m4a" "$OUTPUT_DIR" "$INDEX")
-    echo "Exporting $OUTFILE (start=$START, duration=$DURATION_PART)"
-    echo "Running: ffmpeg -y -i \"$INPUT_FILE\" -ss \"$START\" -t \"$DURATION_PART\" \"$OUTFILE\""
-    ffmpeg -y -i "$INPUT_FILE" -ss "$START" -t "$DURATION_PART" "$OUTFILE" || { echo "Error splitting $OUTFILE" >&2; exit 1; }
-    echo "Created chunk file: $OUTFILE"
+    export_chunk "$START" "$DURATION_PART" "$CUT_REASON"
     START="$END"
     INDEX=$((INDEX + 1))
   done
 else
   # Silence-based splitting
-  TMP_SILENCE=$(mktemp)
-  echo "Detecting silence (threshold=${SILENCE_THRESHOLD}dB, min_duration=${SILENCE_DURATION}s) up to ${CHUNK_LENGTH}s with seek window ${SILENCE_SEEK}s"
-  echo "Running: ffmpeg -i \"$INPUT_FILE\" -af silencedetect=noise=${SILENCE_THRESHOLD}dB:d=${SILENCE_DURATION} -f null -"
-  ffmpeg -i "$INPUT_FILE" -af silencedetect=noise=${SILENCE_THRESHOLD}dB:d=${SILENCE_DURATION} -f null - 2> "$TMP_SILENCE" || { echo "Error during silence detection" >&2; rm "$TMP_SILENCE"; exit 1; }
-  echo "Silence detection log:"
-  cat "$TMP_SILENCE"
+  # Silence intervals are cached per detection parameters inside the input sidecar.
+  SILENCE_KEY="${SILENCE_THRESHOLD}dB:${SILENCE_DURATION}s"
+  SILENCE_INTERVALS=""
+  if [[ -n "${ANALYSIS_SIDECAR-}" && -f "$ANALYSIS_SIDECAR" ]] \
+    && jq -e --arg key "$SILENCE_KEY" '.silences | has($key)' "$ANALYSIS_SIDECAR" >/dev/null 2>&1; then
+    SILENCE_INTERVALS=$(jq -c --arg key "$SILENCE_KEY" '.silences[$key]' "$ANALYSIS_SIDECAR")
+    echo "Analysis cache hit (silence $SILENCE_KEY): $ANALYSIS_SIDECAR"
+  else
+    TMP_SILENCE=$(mktemp)
+    echo "Detecting silence (threshold=${SILENCE_THRESHOLD}dB, min_duration=${SILENCE_DURATION}s) up to ${CHUNK_LENGTH}s with seek window ${SILENCE_SEEK}s"
+    echo "Running: ffmpeg -i \"$INPUT_FILE\" -af silencedetect=noise=${SILENCE_THRESHOLD}dB:d=${SILENCE_DURATION} -f null -"
+    ffmpeg -i "$INPUT_FILE" -af silencedetect=noise=${SILENCE_THRESHOLD}dB:d=${SILENCE_DURATION} -f null - 2> "$TMP_SILENCE" || { echo "Error during silence detection" >&2; rm "$TMP_SILENCE"; exit 1; }
+    echo "Silence detection log:"
+    cat "$TMP_SILENCE"
+
+    # Pair silence_start/silence_end lines into [start, end] intervals.
+    SILENCE_INTERVALS=$( { grep -oP 'silence_(start|end): -?[0-9.]+' "$TMP_SILENCE" || true; } \
+      | awk '$1 == "silence_start:" { s = $2 } $1 == "silence_end:" { print (s == "" ? $2 : s), $2; s = "" }' \
+      | awk 'BEGIN { printf "[" } { printf "%s[%s,%s]", (NR > 1 ? "," : ""), $1, $2 } END { print "]" }')
+    rm "$TMP_SILENCE"
+
+    if [[ -n "${ANALYSIS_SIDECAR-}" && -f "$ANALYSIS_SIDECAR" ]]; then
+      if with_sidecar_lock store_silence_sidecar; then
+        echo "Analysis cache stored (silence $SILENCE_KEY): $ANALYSIS_SIDECAR"
+      fi
+    fi
+  fi
 
   # Collect all silence_end timestamps
   SILENCE_TIMES=()
-  while read -r LINE; do
-    if [[ "$LINE" =~ silence_end: ]]; then
-      TIME=$(echo "$LINE" | grep -oP 'silence_end: \K[0-9\.]+')
+  while read -r TIME; do
+    if [[ -n "$TIME" ]]; then
       SILENCE_TIMES+=("$TIME")
     fi
-  done < "$TMP_SILENCE"
-  rm "$TMP_SILENCE"
+  done < <(echo "$SILENCE_INTERVALS" | tr -d '[]' | tr ',' '\n' | awk 'NR % 2 == 0')
   echo "Collected silence end times: ${SILENCE_TIMES[*]}"
 
   # Determine split points at each chunk boundary or nearest silence
   SPLIT_POINTS=()
+  SPLIT_REASONS=()
   CURRENT=0
   while (( $(echo "$CURRENT + $CHUNK_LENGTH < $DURATION" | bc -l) )); do
     BOUNDARY=$(echo "$CURRENT + $CHUNK_LENGTH" | bc)
     LOWER=$(echo "$BOUNDARY - $SILENCE_SEEK" | bc)
     SELECTED="$BOUNDARY"
+    REASON="boundary"
     # Select the nearest silence before the hard boundary inside the search window.
     BEST_MATCH=""
     for T in "${SILENCE_TIMES[@]}"; do
@@ -195,23 +338,23 @@ else
     done
     if [[ -n "$BEST_MATCH" ]]; then
       SELECTED="$BEST_MATCH"
+      REASON="silence"
     fi
     CUT_POINT=$(echo "$SELECTED - $PADDING" | bc)
     if (( $(echo "$CUT_POINT < 0" | bc -l) )); then CUT_POINT=0; fi
     SPLIT_POINTS+=("$CUT_POINT")
+    SPLIT_REASONS+=("$REASON")
     CURRENT="$BOUNDARY"
   done
   # Always include end of file
   SPLIT_POINTS+=("$DURATION")
-  echo "Calculated split points: ${SPLIT_POINTS[*]}"
+  SPLIT_REASONS+=("end")
+  echo "Calculated split points: ${SPLIT_POINTS[*]} (${SPLIT_REASONS[*]})"
 
-  for END in "${SPLIT_POINTS[@]}"; do
+  for POINT_INDEX in "${!SPLIT_POINTS[@]}"; do
+    END="${SPLIT_POINTS[$POINT_INDEX]}"
     DURATION_PART=$(echo "$END - $START" | bc)
-    OUTFILE=$(printf "%s/part_%02d.m4a" "$OUTPUT_DIR" "$INDEX")
-    echo "Exporting $OUTFILE (start=$START, duration=$DURATION_PART)"
-    echo "Running: ffmpeg -y -i \"$INPUT_FILE\" -ss \"$START\" -t \"$DURATION_PART\" \"$OUTFILE\""
-    ffmpeg -y -i "$INPUT_FILE" -ss "$START" -t "$DURATION_PART" "$OUTFILE" || { echo "Error splitting $OUTFILE" >&2; exit 1; }
-    echo "Created chunk file: $OUTFILE"
+    export_chunk "$START" "$DURATION_PART" "${SPLIT_REASONS[$POINT_INDEX]}"
     START="$END"
     INDEX=$((INDEX + 1))
   done
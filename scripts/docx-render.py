@@ -13,6 +13,12 @@
 #         "description": "Placeholder values as a key/value mapping.",
 #         "additionalProperties": { "type": "string" }
 #       },
+#       "also_pdf": { "type": "boolean", "description": "Also convert the rendered DOCX to PDF (docx-to-pdf converter pool)." },
+#       "return": {
+#         "type": "string",
+#         "enum": ["file", "inline", "stream"],
+#         "description": "file writes to the output directory; inline returns base64 in JSON; stream returns the DOCX bytes."
+#       },
 #       "payload": { "type": "string", "description": "Raw JSON payload as alternative input." },
 #       "payload_file": { "type": "string", "description": "Path to a JSON payload file as alternative input." }
 #     }
@@ -74,11 +80,28 @@ def main() -> int:
     parser.add_argument("--output-name", help="Optional output filename.")
     parser.add_argument("--data", help="Inline JSON object with placeholder values.")
     parser.add_argument("--data-file", help="Path to JSON file with placeholder values.")
+    parser.add_argument("--also-pdf", action="store_true", help="Also convert the rendered DOCX to PDF.")
+    parser.add_argument(
+        "--return",
+        dest="return_mode",
+        choices=["file", "inline", "stream"],
+        help="file (default), inline (base64 JSON) or stream (raw DOCX bytes on stdout).",
+    )
     args = parser.parse_args()
 
     try:
         payload = load_payload(args)
+        if args.return_mode:
+            payload["return"] = args.return_mode
+        if args.also_pdf:
+            payload["also_pdf"] = True
         result = handler(payload)
+        content_stream = result.pop("content_stream", None) if isinstance(result, dict) else None
+        if content_stream is not None:
+            # Raw DOCX bytes go to stdout; the status summary moves to stderr.
+            sys.stdout.buffer.write(content_stream.getvalue())
+            print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+            return 0
         print(json.dumps(result, ensure_ascii=False))
         return 0 if isinstance(result, dict) and result.get("status") == "ok" else 1
     except Exception as exc:  # noqa: BLE001
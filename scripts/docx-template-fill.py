@@ -2,7 +2,7 @@
 """CLI wrapper for mcp_tools.docx_template_fill.fill_docx_template."""
 #==MCP==
 # {
-#   "description": "Fill a DOCX template with placeholder values and write the output file.",
+#   "description": "Fill a DOCX template with placeholder values and write the output file, or render one file per row in batch mode.",
 #   "schema": {
 #     "type": "object",
 #     "properties": {
@@ -14,6 +14,21 @@
 #         "description": "Key/value placeholders for template rendering.",
 #         "additionalProperties": { "type": "string" }
 #       },
+#       "rows": {
+#         "type": "array",
+#         "description": "Batch mode: one placeholder object per output document.",
+#         "items": { "type": "object", "additionalProperties": { "type": "string" } }
+#       },
+#       "rows_file": { "type": "string", "description": "Batch mode: CSV, NDJSON/JSONL, JSON array or XLSX file with one row per document." },
+#       "filename_pattern": { "type": "string", "description": "Batch mode output filename pattern using row keys and index, e.g. letter_{index:04d}_{NAME}.docx." },
+#       "workers": { "type": "integer", "description": "Batch mode render processes (default: CPU count)." },
+#       "zip_filename": { "type": "string", "description": "Batch mode: also bundle all outputs into this ZIP in the output directory." },
+#       "also_pdf": { "type": "boolean", "description": "Also convert the rendered DOCX to PDF (docx-to-pdf converter pool)." },
+#       "return": {
+#         "type": "string",
+#         "enum": ["file", "inline", "stream"],
+#         "description": "file writes to the output directory; inline returns base64 in JSON; stream returns the DOCX bytes."
+#       },
 #       "payload": { "type": "string", "description": "Raw JSON payload as alternative input." },
 #       "payload_file": { "type": "string", "description": "Path to a JSON payload file as alternative input." }
 #     }
@@ -49,7 +64,9 @@ def load_payload(args: argparse.Namespace) -> dict:
 
     if not args.template:
         raise ValueError("Either --payload/--payload-file or --template is required.")
-    if not args.output_filename:
+    if args.rows or args.rows_file:
+        return build_batch_payload(args)
+    if not args.output_filename and args.return_mode in (None, "file"):
         raise ValueError("--output-filename is required when using explicit CLI fields.")
 
     # Accept placeholder data from inline JSON or a JSON file path.
@@ -68,6 +85,25 @@ def load_payload(args: argparse.Namespace) -> dict:
     }
 
 
+def build_batch_payload(args: argparse.Namespace) -> dict:
+    """Build a batch payload from --rows/--rows-file and the filename pattern."""
+    if not args.filename_pattern:
+        raise ValueError("--filename-pattern is required in batch mode.")
+
+    payload = {
+        "template": args.template,
+        "filename_pattern": args.filename_pattern,
+        "output_subdir": args.output_subdir,
+        "workers": args.workers,
+        "zip_filename": args.zip_filename,
+    }
+    if args.rows:
+        payload["rows"] = json.loads(args.rows)
+    else:
+        payload["rows_file"] = args.rows_file
+    return {key: value for key, value in payload.items() if value is not None}
+
+
 def main() -> int:
     """Run docx template fill and emit structured JSON."""
     parser = argparse.ArgumentParser(description="Render DOCX template via mcp_tools.docx_template_fill.")
@@ -78,11 +114,33 @@ def main() -> int:
     parser.add_argument("--output-subdir", help="Optional relative output subdirectory.")
     parser.add_argument("--data", help="Inline JSON object with placeholder values.")
     parser.add_argument("--data-file", help="Path to JSON file with placeholder values.")
+    parser.add_argument("--also-pdf", action="store_true", help="Also convert the rendered DOCX to PDF.")
+    parser.add_argument(
+        "--return",
+        dest="return_mode",
+        choices=["file", "inline", "stream"],
+        help="file (default), inline (base64 JSON) or stream (raw DOCX bytes on stdout).",
+    )
+    parser.add_argument("--rows", help="Batch mode: inline JSON array of placeholder objects.")
+    parser.add_argument("--rows-file", help="Batch mode: CSV, NDJSON/JSONL, JSON or XLSX rows file.")
+    parser.add_argument("--filename-pattern", help="Batch mode output filename pattern, e.g. letter_{index:04d}_{NAME}.docx.")
+    parser.add_argument("--workers", type=int, help="Batch mode render processes.")
+    parser.add_argument("--zip-filename", help="Batch mode: ZIP archive bundling all outputs.")
     args = parser.parse_args()
 
     try:
         payload = load_payload(args)
+        if args.return_mode:
+            payload["return"] = args.return_mode
+        if args.also_pdf:
+            payload["also_pdf"] = True
         result = fill_docx_template(payload)
+        content_stream = result.pop("content_stream", None)
+        if content_stream is not None:
+            # Raw DOCX bytes go to stdout; the status summary moves to stderr.
+            sys.stdout.buffer.write(content_stream.getvalue())
+            print(json.dumps({"status": "ok", **result}, ensure_ascii=False), file=sys.stderr)
+            return 0
         print(json.dumps({"status": "ok", **result}, ensure_ascii=False))
         return 0
     except Exception as exc:  # noqa: BLE001
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""CLI wrapper for the Toolhub docx-to-pdf converter pool."""
+#==MCP==
+# {
+#   "description": "Convert one or more DOCX files to PDF with resident LibreOffice converters.",
+#   "schema": {
+#     "type": "object",
+#     "properties": {
+#       "input": { "type": "string", "description": "DOCX file to convert." },
+#       "inputs": { "type": "array", "items": { "type": "string" }, "description": "Batch of DOCX files to convert." },
+#       "output_dir": { "type": "string", "description": "Optional PDF output directory; defaults to each input's directory." }
+#     }
+#   }
+# }
+#==/MCP==
+
+import argparse
+import json
+import os
+import sys
+
+
+# Ensure project modules can be imported in container and local-dev modes.
+TOOLS_ROOT = os.getenv("TOOLHUB_PYTHON_ROOT", "/opt/toolhub")
+if not os.path.isdir(TOOLS_ROOT) and os.path.isdir("/workspace"):
+    TOOLS_ROOT = "/workspace"
+if not os.path.isdir(TOOLS_ROOT):
+    TOOLS_ROOT = os.getcwd()
+if TOOLS_ROOT not in sys.path:
+    sys.path.append(TOOLS_ROOT)
+
+from tools.docx_to_pdf import handler  # noqa: E402
+
+
+def main() -> int:
+    """Convert DOCX inputs to PDF and print a JSON result."""
+    parser = argparse.ArgumentParser(description="Convert DOCX files to PDF.")
+    parser.add_argument("--input", action="append", default=[], help="DOCX file to convert (repeatable).")
+    parser.add_argument("--inputs", action="append", default=[], help="Alias of --input for batch payloads.")
+    parser.add_argument("--output-dir", help="Optional PDF output directory.")
+    args = parser.parse_args()
+
+    result = handler({"inputs": [*args.input, *args.inputs], "output_dir": args.output_dir})
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result.get("status") == "ok" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,25 +1,441 @@
 #!/usr/bin/env python3
 #==MCP==
 # {
-#   "description": "Extract text from a PDF file via pdfminer.six.",
+#   "description": "Extract text from a PDF file via poppler pdftotext or pdfminer.six, sharding page ranges across processes.",
 #   "schema": {
 #     "type": "object",
 #     "properties": {
 #       "input_path": { "type": "string" },
 #       "output_dir": { "type": "string" },
-#       "output_filename": { "type": "string" }
+#       "output_filename": { "type": "string" },
+#       "pages": { "type": "string", "description": "Optional 1-based page selection, e.g. 1-5,8,10-." },
+#       "workers": { "type": "integer", "description": "Extraction processes (default: CPU count)." },
+#       "page_format": { "type": "string", "enum": ["none", "json", "ndjson"], "description": "Also write per-page text as a JSON array or NDJSON." },
+#       "stream": { "type": "boolean", "description": "Emit NDJSON page events on stdout while extracting." },
+#       "backend": { "type": "string", "enum": ["auto", "pdftotext", "pdfminer"], "description": "auto uses poppler pdftotext and falls back to pdfminer when it yields no text." },
+#       "layout": { "type": "boolean", "description": "Force pdfminer layout analysis." },
+#       "ocr": { "type": "string", "enum": ["auto", "on", "off"], "description": "OCR pages without a text layer via pdftoppm and tesseract." },
+#       "ocr_lang": { "type": "string", "description": "Optional tesseract language code, for example deu or eng." },
+#       "ocr_dpi": { "type": "integer", "description": "Rasterization resolution for OCR pages (default 300)." }
 #     },
 #     "required": ["input_path"]
 #   }
 # }
 #==/MCP==
-"""Extract text from PDF documents."""
+"""Extract text from PDF documents.
+
+The ``auto`` backend uses poppler's ``pdftotext`` when it is installed and
+falls back to pdfminer.six for shards where it finds no text; ``--layout``
+always selects pdfminer's layout analysis. Pages that still have no text layer
+are rasterized with ``pdftoppm`` and OCR'd with tesseract in parallel, then
+merged back in page order.
+
+Pages are written to the output file as soon as they are extracted, so memory
+stays flat in the page count. With ``--stream`` (or ``TOOLHUB_STREAM=1`` from
+the webhook's streaming run mode) every page is also emitted on stdout as an
+NDJSON ``{"type": "page", ...}`` event, followed by a final ``done`` event.
+"""
 
 import argparse
+import io
 import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+DEFAULT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+# Below this many pages per process the pool start-up outweighs the parallel gain.
+MIN_PAGES_PER_WORKER = 4
+# Upper bound on pages per shard, which bounds memory held by completed shards.
+MAX_PAGES_PER_SHARD = 32
+PAGE_FORMATS = ("none", "json", "ndjson")
+STREAM_ENABLED = os.getenv("TOOLHUB_STREAM", "0") == "1"
+BACKENDS = ("auto", "pdftotext", "pdfminer")
+DEFAULT_BACKEND = os.getenv("PDF_EXTRACT_BACKEND", "auto")
+PDFTOTEXT_BINARY = os.getenv("PDFTOTEXT_BINARY", "pdftotext")
+PDFTOTEXT_TIMEOUT_SECONDS = int(os.getenv("PDFTOTEXT_TIMEOUT", "120"))
+OCR_MODES = ("auto", "on", "off")
+DEFAULT_OCR = os.getenv("PDF_EXTRACT_OCR", "auto")
+DEFAULT_OCR_LANG = os.getenv("PDF_OCR_LANG", "")
+DEFAULT_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
+PDFTOPPM_BINARY = os.getenv("PDFTOPPM_BINARY", "pdftoppm")
+TESSERACT_BINARY = os.getenv("TESSERACT_BINARY", "tesseract")
+
+
+def count_pages(input_path: Path) -> int:
+    """Count pages from the page tree without running layout analysis."""
+    with input_path.open("rb") as handle:
+        document = PDFDocument(PDFParser(handle))
+        return sum(1 for _ in PDFPage.create_pages(document))
+
+
+def parse_page_selection(selection: Optional[str], page_count: int) -> List[int]:
+    """Turn a 1-based selection like ``1-5,8,10-`` into sorted 0-based page indices."""
+    if not selection or not selection.strip():
+        return list(range(page_count))
+
+    indices = set()
+    for part in selection.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_text, separator, end_text = part.partition("-")
+        try:
+            start = int(start_text) if start_text.strip() else 1
+            end = (int(end_text) if end_text.strip() else page_count) if separator else start
+        except ValueError as exc:
+            raise ValueError(f"Invalid page selection: {part!r}") from exc
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: {part!r}")
+        indices.update(range(start - 1, min(end, page_count)))
+    return sorted(indices)
+
+
+def iter_page_range(input_path: str, page_indices: List[int]) -> Iterator[Tuple[int, str]]:
+    """Yield ``(index, text)`` for the given 0-based pages as each one is laid out.
+
+    Each page's text ends with a form feed, exactly as ``extract_text`` joins pages.
+    """
+    wanted = set(page_indices)
+    remaining = len(wanted)
+    resource_manager = PDFResourceManager()
+    buffer = io.StringIO()
+    converter = TextConverter(resource_manager, buffer, laparams=LAParams())
+    interpreter = PDFPageInterpreter(resource_manager, converter)
+    try:
+        with open(input_path, "rb") as handle:
+            document = PDFDocument(PDFParser(handle))
+            for index, page in enumerate(PDFPage.create_pages(document)):
+                if not remaining:
+                    break
+                if index not in wanted:
+                    continue
+                interpreter.process_page(page)
+                text = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                remaining -= 1
+                yield index, text
+    finally:
+        converter.close()
+
+
+def contiguous_runs(page_indices: List[int]) -> List[List[int]]:
+    """Split sorted page indices into runs of consecutive pages."""
+    runs: List[List[int]] = []
+    for index in page_indices:
+        if runs and index == runs[-1][-1] + 1:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+    return runs
+
+
+def run_pdftotext(input_path: str, page_indices: List[int]) -> List[Tuple[int, str]]:
+    """Extract pages with poppler's ``pdftotext``, one call per contiguous run of the shard.
+
+    Pages that ``pdftotext`` does not return (fewer form feeds than requested,
+    e.g. for a truncated file) are left out for the caller to fill in.
+    """
+    pages = []
+    for run in contiguous_runs(page_indices):
+        first, last = run[0], run[-1]
+        command = [PDFTOTEXT_BINARY, "-f", str(first + 1), "-l", str(last + 1), "-enc", "UTF-8", input_path, "-"]
+        try:
+            completed = subprocess.run(command, capture_output=True, check=False, timeout=PDFTOTEXT_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired as exc:
+            raise RuntimeError(f"pdftotext timed out after {PDFTOTEXT_TIMEOUT_SECONDS}s on pages {first + 1}-{last + 1}") from exc
+        if completed.returncode != 0:
+            stderr = completed.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(f"pdftotext failed ({completed.returncode}): {stderr}")
+        # pdftotext ends every page with a form feed, like pdfminer; text after the last one is incomplete.
+        texts = completed.stdout.decode("utf-8", "replace").split("\f")[:-1]
+        pages.extend((index, texts[index - first] + "\f") for index in run if index - first < len(texts))
+    return pages
+
+
+def _record_timing(timings: Dict[str, Dict[str, float]], backend: str, pages: int, seconds: float) -> None:
+    entry = timings.setdefault(backend, {"pages": 0, "seconds": 0.0})
+    entry["pages"] += pages
+    entry["seconds"] += seconds
+
+
+def _timed_pages(
+    pages: Iterator[Tuple[int, str]], timings: Dict[str, Dict[str, float]], backend: str
+) -> Iterator[Tuple[int, str]]:
+    while True:
+        started = time.perf_counter()
+        try:
+            page = next(pages)
+        except StopIteration:
+            return
+        _record_timing(timings, backend, 1, time.perf_counter() - started)
+        yield page
+
+
+def iter_shard(
+    input_path: str, page_indices: List[int], backend: str, timings: Dict[str, Dict[str, float]]
+) -> Iterator[Tuple[int, str]]:
+    """Yield one shard's pages with the chosen backend, recording per-backend timings.
+
+    ``auto`` runs ``pdftotext`` and re-extracts the shard with pdfminer only
+    when the fast path returns no text at all. Pages ``pdftotext`` skipped are
+    extracted with pdfminer for either backend.
+    """
+    if backend == "pdfminer":
+        yield from _timed_pages(iter_page_range(input_path, page_indices), timings, "pdfminer")
+        return
+
+    started = time.perf_counter()
+    pages = run_pdftotext(input_path, page_indices)
+    _record_timing(timings, "pdftotext", len(pages), time.perf_counter() - started)
+    if backend == "auto" and not any(text.strip() for _, text in pages):
+        yield from _timed_pages(iter_page_range(input_path, page_indices), timings, "pdfminer")
+        return
+    returned = {index for index, _ in pages}
+    missing = [index for index in page_indices if index not in returned]
+    if missing:
+        pages = sorted(pages + list(_timed_pages(iter_page_range(input_path, missing), timings, "pdfminer")))
+    yield from pages
+
+
+def extract_shard(input_path: str, page_indices: List[int], backend: str) -> Tuple[List[Tuple[int, str]], Dict]:
+    """Extract one shard in a worker process; returns its pages and timings."""
+    timings: Dict[str, Dict[str, float]] = {}
+    return list(iter_shard(input_path, page_indices, backend, timings)), timings
+
+
+def shard_pages(page_indices: List[int], workers: int) -> List[List[int]]:
+    """Split pages into contiguous ranges of at most ``MAX_PAGES_PER_SHARD`` pages.
+
+    Several shards per worker balance the load; the size cap keeps the text
+    held by finished-but-unwritten shards bounded.
+    """
+    size = -(-len(page_indices) // (workers * 2))
+    size = max(MIN_PAGES_PER_WORKER, min(size, MAX_PAGES_PER_SHARD))
+    return [page_indices[start : start + size] for start in range(0, len(page_indices), size)]
 
-from pdfminer.high_level import extract_text
+
+def iter_pages(
+    input_path: Path, page_indices: List[int], workers: int, backend: str, timings: Dict[str, Dict[str, float]]
+) -> Iterator[Tuple[int, str]]:
+    """Yield pages in order, in parallel when the document is large enough.
+
+    At most ``2 * workers`` shards are in flight, so memory stays flat in the
+    page count no matter how far the pool runs ahead of the writer.
+    """
+    workers = max(1, min(workers, len(page_indices) // MIN_PAGES_PER_WORKER))
+    if workers == 1:
+        for shard in shard_pages(page_indices, 1):
+            yield from iter_shard(str(input_path), shard, backend, timings)
+        return
+
+    shards = iter(shard_pages(page_indices, workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(
+            executor.submit(extract_shard, str(input_path), shard, backend) for shard in islice(shards, workers * 2)
+        )
+        while pending:
+            pages, shard_timings = pending.popleft().result()
+            for name, entry in shard_timings.items():
+                _record_timing(timings, name, entry["pages"], entry["seconds"])
+            next_shard = next(shards, None)
+            if next_shard is not None:
+                pending.append(executor.submit(extract_shard, str(input_path), next_shard, backend))
+            yield from pages
+
+
+def resolve_backend(requested: str, layout: bool) -> str:
+    """Pick the extraction backend: ``pdftotext`` fast path unless layout fidelity is requested."""
+    if requested == "pdfminer" or layout:
+        return "pdfminer"
+    if shutil.which(PDFTOTEXT_BINARY):
+        return requested
+    if requested == "pdftotext":
+        raise RuntimeError(f"{PDFTOTEXT_BINARY} is not installed")
+    return "pdfminer"
+
+
+def resolve_ocr(requested: str) -> bool:
+    """Decide whether image-only pages are OCR'd; ``auto`` requires pdftoppm and tesseract."""
+    if requested == "off":
+        return False
+    missing = [binary for binary in (PDFTOPPM_BINARY, TESSERACT_BINARY) if not shutil.which(binary)]
+    if missing and requested == "on":
+        raise RuntimeError(f"OCR requires {', '.join(missing)}")
+    return not missing
+
+
+def ocr_page(input_path: str, index: int, lang: str, dpi: int) -> Tuple[str, float]:
+    """Rasterize one page with pdftoppm and OCR it with tesseract; returns text and seconds."""
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="pdf-ocr-") as tmp:
+        prefix = Path(tmp) / "page"
+        number = str(index + 1)
+        rasterize = [PDFTOPPM_BINARY, "-f", number, "-l", number, "-r", str(dpi), "-gray", "-png", "-singlefile"]
+        completed = subprocess.run([*rasterize, input_path, str(prefix)], capture_output=True, text=True, check=False)
+        if completed.returncode != 0:
+            raise RuntimeError(f"pdftoppm failed on page {number}: {completed.stderr.strip()}")
+
+        command = [TESSERACT_BINARY, str(prefix.with_suffix(".png")), "stdout"]
+        if lang:
+            command.extend(["-l", lang])
+        # One tesseract thread per page; parallelism comes from OCR'ing several pages at once.
+        env = dict(os.environ, OMP_THREAD_LIMIT="1")
+        completed = subprocess.run(command, capture_output=True, text=True, check=False, env=env)
+        if completed.returncode != 0:
+            raise RuntimeError(f"tesseract failed on page {number}: {completed.stderr.strip()}")
+    return completed.stdout.rstrip("\f") + "\f", time.perf_counter() - started
+
+
+def iter_with_ocr(
+    pages: Iterator[Tuple[int, str]],
+    input_path: Path,
+    workers: int,
+    lang: str,
+    dpi: int,
+    timings: Dict[str, Dict[str, float]],
+) -> Iterator[Tuple[int, str, bool]]:
+    """Yield ``(index, text, ocr)`` in page order, OCR'ing pages without a text layer in parallel.
+
+    The pdftoppm and tesseract subprocesses do the work, so threads are enough
+    to keep all cores busy. At most ``2 * workers`` OCR pages are in flight and
+    text pages queued behind them are capped as well, so memory stays bounded.
+    """
+    window: deque = deque()
+    in_flight = 0
+    max_window = max(1, workers) * MAX_PAGES_PER_SHARD
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+
+        def drain(block: bool) -> Iterator[Tuple[int, str, bool]]:
+            nonlocal in_flight
+            while window:
+                index, item = window[0]
+                if isinstance(item, Future):
+                    saturated = in_flight >= workers * 2 or len(window) >= max_window
+                    if not block and not saturated and not item.done():
+                        return
+                    text, seconds = item.result()
+                    _record_timing(timings, "ocr", 1, seconds)
+                    in_flight -= 1
+                    window.popleft()
+                    yield index, text, True
+                else:
+                    window.popleft()
+                    yield index, item, False
+
+        for index, text in pages:
+            if text.strip():
+                window.append((index, text))
+            else:
+                window.append((index, executor.submit(ocr_page, str(input_path), index, lang, dpi)))
+                in_flight += 1
+            yield from drain(block=False)
+        yield from drain(block=True)
+
+
+class PageWriter:
+    """Append per-page records to a JSON array or NDJSON file as pages arrive."""
+
+    def __init__(self, output_path: Path, page_format: str):
+        self.page_format = page_format
+        self._handle = output_path.open("w", encoding="utf-8")
+        self._count = 0
+        if page_format == "json":
+            self._handle.write("[")
+
+    def write(self, record: dict) -> None:
+        encoded = json.dumps(record, ensure_ascii=False)
+        if self.page_format == "json":
+            self._handle.write(("," if self._count else "") + encoded)
+        else:
+            self._handle.write(encoded + "\n")
+        self._count += 1
+
+    def close(self) -> None:
+        if self.page_format == "json":
+            self._handle.write("]")
+        self._handle.close()
+
+
+def emit_event(event_type: str, **payload) -> None:
+    """Write one NDJSON stream event to stdout immediately."""
+    print(json.dumps({"type": event_type, **payload}, ensure_ascii=False), flush=True)
+
+
+def extract_to_files(args: argparse.Namespace, input_path: Path, output_path: Path) -> dict:
+    """Stream pages into the text (and optional per-page) output without buffering the document."""
+    page_count = count_pages(input_path)
+    page_indices = parse_page_selection(args.pages, page_count)
+    pages_path = None
+    page_writer = None
+    if args.page_format != "none":
+        pages_path = output_path.with_name(f"{output_path.stem}.pages.{args.page_format}")
+        page_writer = PageWriter(pages_path, args.page_format)
+
+    backend = resolve_backend(args.backend, args.layout)
+    timings: Dict[str, Dict[str, float]] = {}
+    started = time.perf_counter()
+    ocr_enabled = resolve_ocr(args.ocr)
+    ocr_pages: List[int] = []
+    text_length = 0
+    pages_extracted = 0
+    pages = iter_pages(input_path, page_indices, args.workers, backend, timings)
+    if ocr_enabled:
+        pages = iter_with_ocr(pages, input_path, args.workers, args.ocr_lang, args.ocr_dpi, timings)
+    else:
+        pages = ((index, text, False) for index, text in pages)
+    try:
+        with output_path.open("w", encoding="utf-8") as output:
+            for index, text, ocr in pages:
+                output.write(text)
+                output.flush()
+                text_length += len(text)
+                pages_extracted += 1
+                record = {"page": index + 1, "text": text.rstrip("\f")}
+                if ocr:
+                    ocr_pages.append(index + 1)
+                    record["ocr"] = True
+                if page_writer is not None:
+                    page_writer.write(record)
+                if args.stream:
+                    emit_event("page", total=len(page_indices), **record)
+    finally:
+        if page_writer is not None:
+            page_writer.close()
+
+    result = {
+        "status": "ok",
+        "input_path": str(input_path),
+        "output_file": str(output_path),
+        "text_length": text_length,
+        "page_count": page_count,
+        "pages_extracted": pages_extracted,
+        "backend": backend,
+        "backends": {
+            name: {"pages": entry["pages"], "seconds": round(entry["seconds"], 3)} for name, entry in timings.items()
+        },
+        "seconds": round(time.perf_counter() - started, 3),
+        "ocr": ocr_enabled,
+        "ocr_pages": ocr_pages,
+    }
+    if pages_path is not None:
+        result["pages_file"] = str(pages_path)
+    return result
 
 
 def main() -> int:
@@ -28,7 +444,19 @@ def main() -> int:
     parser.add_argument("--input-path", required=True, help="Path to the source PDF file.")
     parser.add_argument("--output-dir", default="/shared/artifacts", help="Artifact output directory.")
     parser.add_argument("--output-filename", help="Optional output text filename.")
+    parser.add_argument("--pages", help="Optional 1-based page selection, for example 1-5,8,10-.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Extraction processes.")
+    parser.add_argument("--page-format", choices=PAGE_FORMATS, default="none", help="Also write per-page output.")
+    parser.add_argument(
+        "--backend", choices=BACKENDS, default=DEFAULT_BACKEND, help="Extraction backend (auto prefers pdftotext)."
+    )
+    parser.add_argument("--layout", action="store_true", help="Request pdfminer layout analysis instead of the fast path.")
+    parser.add_argument("--ocr", choices=OCR_MODES, default=DEFAULT_OCR, help="OCR pages without a text layer.")
+    parser.add_argument("--ocr-lang", default=DEFAULT_OCR_LANG, help="Optional tesseract language code.")
+    parser.add_argument("--ocr-dpi", type=int, default=DEFAULT_OCR_DPI, help="Rasterization DPI for OCR pages.")
+    parser.add_argument("--stream", action="store_true", help="Emit one NDJSON page event per page on stdout.")
     args = parser.parse_args()
+    args.stream = args.stream or STREAM_ENABLED
 
     input_path = Path(args.input_path)
     if not input_path.is_file():
@@ -43,22 +471,18 @@ def main() -> int:
     output_path = output_dir / output_name
 
     try:
-        text = extract_text(str(input_path))
+        result = extract_to_files(args, input_path, output_path)
     except Exception as exc:  # noqa: BLE001
-        print(json.dumps({"status": "error", "error": str(exc)}))
+        if args.stream:
+            emit_event("error", status="error", error=str(exc))
+        else:
+            print(json.dumps({"status": "error", "error": str(exc)}))
         return 1
 
-    output_path.write_text(text or "", encoding="utf-8")
-    print(
-        json.dumps(
-            {
-                "status": "ok",
-                "input_path": str(input_path),
-                "output_file": str(output_path),
-                "text_length": len(text or ""),
-            }
-        )
-    )
+    if args.stream:
+        emit_event("done", **result)
+    else:
+        print(json.dumps(result))
     return 0
 
 
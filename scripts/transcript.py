@@ -1,41 +1,102 @@
 #!/usr/bin/env python3
 #==MCP==
 # {
-#   "description": "Transcribe an audio file via local Whisper CLI.",
+#   "description": "Transcribe an audio file, or all chunks of a split job, via local Whisper.",
 #   "schema": {
 #     "type": "object",
 #     "properties": {
 #       "input": { "type": "string", "description": "Input audio path (absolute or relative to TRANSCRIPT_INPUT_ROOT)." },
+#       "job_id": { "type": "string", "description": "Split job id under TRANSCRIPT_SPLIT_ROOT; transcribes all chunks and merges them." },
+#       "input_dir": { "type": "string", "description": "Directory of audio chunks to transcribe and merge (alternative to job_id)." },
+#       "workers": { "type": "integer", "minimum": 1, "description": "Parallel chunk transcriptions in batch mode." },
+#       "no_cache": { "type": "boolean", "description": "Bypass the transcript cache and always transcribe." },
+#       "stream": { "type": "boolean", "description": "Emit NDJSON segment events while decoding (also enabled by /run streaming)." },
+#       "vad": { "type": "boolean", "description": "Transcribe only detected speech regions; timestamps stay on the original timeline." },
 #       "output": { "type": "string", "description": "Optional output path (absolute or relative to TRANSCRIPT_OUTPUT_ROOT)." },
 #       "format": { "type": "string", "enum": ["json", "txt"] },
-#       "backend": { "type": "string", "enum": ["auto", "whisper-cli"] },
+#       "backend": { "type": "string", "enum": ["auto", "worker", "whisper-cli"] },
 #       "language": { "type": "string", "description": "Optional language code (for example de, en)." },
 #       "model": { "type": "string", "description": "Optional backend model name." }
-#     },
-#     "required": ["input"]
+#     }
 #   }
 # }
 #==/MCP==
-"""Transcribe audio files using local Whisper CLI.
+"""Transcribe audio files or split jobs via a resident Whisper worker or the Whisper CLI.
 
 This script is designed for Toolhub automation flows and writes structured logs
 under /logs. It accepts an input audio path, chooses an available backend,
-and stores the transcript as JSON or TXT.
+and stores the transcript as JSON or TXT. When the resident transcription
+worker (``tools/transcript_worker.py``) is listening, jobs are sent to it so
+the model stays loaded; otherwise the Whisper CLI is used.
+
+With ``--job-id`` or ``--input-dir`` all chunks of a split job are transcribed
+in parallel and merged into one transcript whose segment timestamps are
+shifted by each chunk's start offset from the split index.
+
+Results are cached by audio content hash, backend, model and language, so
+re-running a flow on an unchanged recording returns instantly. With ``--vad``
+silent stretches are cut before transcription and segment timestamps are
+mapped back onto the original timeline.
+
+With ``--stream`` (or ``TOOLHUB_STREAM=1`` from the webhook's streaming run
+path) stdout carries NDJSON events: one ``segment`` per decoded segment, a
+``chunk`` per finished chunk in batch mode, and a closing ``done`` or ``error``.
 """
 
 import argparse
+import hashlib
 import json
 import logging
 import os
+import re
 import shutil
+import socket
 import subprocess
 import tempfile
+import threading
+import time
+import wave
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 
 LOG_PATH = os.getenv("TRANSCRIPT_LOG_PATH", "/logs/transcript.log")
 LOG_LEVEL = os.getenv("TRANSCRIPT_LOG_LEVEL", "INFO").upper()
 DEFAULT_INPUT_ROOT = Path(os.getenv("TRANSCRIPT_INPUT_ROOT", "/shared/audio/in"))
 DEFAULT_OUTPUT_ROOT = Path(os.getenv("TRANSCRIPT_OUTPUT_ROOT", "/shared/audio/out/transcripts"))
+WORKER_SOCKET = os.getenv("TRANSCRIPT_WORKER_SOCKET", "/tmp/toolhub-transcript-worker.sock")
+WORKER_TIMEOUT_SECONDS = float(os.getenv("TRANSCRIPT_WORKER_TIMEOUT", "3600"))
+SPLIT_OUTPUT_ROOT = Path(os.getenv("TRANSCRIPT_SPLIT_ROOT", "/shared/audio/out"))
+BATCH_WORKERS = int(os.getenv("TRANSCRIPT_BATCH_WORKERS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+CHUNK_INDEX_FILENAME = "chunks.ndjson"
+AUDIO_EXTENSIONS = {".m4a", ".mp3", ".wav", ".aac", ".flac", ".ogg", ".opus", ".webm", ".mp4"}
+SAFE_JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+CACHE_DIR = Path(os.getenv("TRANSCRIPT_CACHE_DIR", "/shared/audio/cache/transcripts"))
+CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE", "1") != "0"
+CACHE_MAX_BYTES = int(float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "512")) * 1024 * 1024)
+CACHE_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024
+VAD_ENABLED = os.getenv("TRANSCRIPT_VAD", "0") == "1"
+VAD_SAMPLE_RATE = 16000
+VAD_FRAME_SECONDS = 0.03
+VAD_THRESHOLD_DB = float(os.getenv("TRANSCRIPT_VAD_THRESHOLD_DB", "-45"))
+VAD_MIN_SILENCE_SECONDS = float(os.getenv("TRANSCRIPT_VAD_MIN_SILENCE", "0.8"))
+VAD_MIN_SPEECH_SECONDS = 0.25
+VAD_PADDING_SECONDS = 0.2
+# Unvoiced (high zero-crossing) frames count as speech only this far above the
+# noise floor and this close to a voiced frame.
+VAD_UNVOICED_MARGIN_DB = 6.0
+VAD_UNVOICED_REACH_SECONDS = 0.3
+# Trimming less than this share of the audio is not worth a second encode pass.
+VAD_MAX_SPEECH_RATIO = 0.9
+# Backend reported (and cached) when VAD finds no speech and no backend runs at all.
+VAD_NO_SPEECH_BACKEND = "vad"
+STREAM_ENABLED = os.getenv("TOOLHUB_STREAM", "0") == "1"
+# Whisper's verbose output: "[00:01.000 --> 00:04.500]  text" (hours are optional).
+SEGMENT_LINE_PATTERN = re.compile(r"^\[((?:\d+:)?\d+:\d+\.\d+) --> ((?:\d+:)?\d+:\d+\.\d+)\]\s*(.*)$")
+
+SegmentCallback = Callable[[dict], None]
 
 LOGGER = logging.getLogger("transcript")
 
@@ -97,7 +158,52 @@ def resolve_output_path(input_path: Path, output_value: str | None, output_forma
     return output_path
 
 
-def run_whisper_cli(input_path: Path, language: str | None, model: str | None) -> dict:
+def parse_timestamp(value: str) -> float:
+    """Convert a Whisper ``[HH:]MM:SS.mmm`` timestamp to seconds."""
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return round(seconds, 3)
+
+
+def parse_segment_line(line: str) -> dict | None:
+    """Parse one verbose Whisper output line into a segment dict."""
+    match = SEGMENT_LINE_PATTERN.match(line.strip())
+    if not match:
+        return None
+    return {"start": parse_timestamp(match.group(1)), "end": parse_timestamp(match.group(2)), "text": match.group(3)}
+
+
+def run_whisper_cli_streaming(args: list[str], on_segment: SegmentCallback) -> None:
+    """Run the Whisper CLI and report segments from its verbose output as they are decoded."""
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            [*args, "--verbose", "True"], stdout=subprocess.PIPE, stderr=stderr_file, text=True, bufsize=1, env=env
+        )
+        timer = threading.Timer(3600, process.kill)
+        timer.start()
+        try:
+            for line in process.stdout:
+                segment = parse_segment_line(line)
+                if segment is not None:
+                    on_segment(segment)
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr_text = stderr_file.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"Whisper CLI failed with exit code {returncode}: {stderr_text}")
+
+
+def run_whisper_cli(
+    input_path: Path, language: str | None, model: str | None, on_segment: SegmentCallback | None = None
+) -> dict:
     """Run local Whisper CLI and return parsed JSON output."""
     whisper_cmd = shutil.which("whisper")
     if not whisper_cmd:
@@ -118,11 +224,14 @@ def run_whisper_cli(input_path: Path, language: str | None, model: str | None) -
             args.extend(["--model", model])
 
         LOGGER.info("Executing Whisper CLI transcription")
-        result = subprocess.run(args, capture_output=True, text=True, check=False, timeout=3600)
-        if result.returncode != 0:
-            raise RuntimeError(
-                f"Whisper CLI failed with exit code {result.returncode}: {result.stderr.strip() or result.stdout.strip()}"
-            )
+        if on_segment is not None:
+            run_whisper_cli_streaming(args, on_segment)
+        else:
+            result = subprocess.run(args, capture_output=True, text=True, check=False, timeout=3600)
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f"Whisper CLI failed with exit code {result.returncode}: {result.stderr.strip() or result.stdout.strip()}"
+                )
 
         transcript_file = Path(tmp_dir) / f"{input_path.stem}.json"
         if not transcript_file.is_file():
@@ -131,6 +240,363 @@ def run_whisper_cli(input_path: Path, language: str | None, model: str | None) -
         return json.loads(transcript_file.read_text(encoding="utf-8"))
 
 
+class WorkerUnavailableError(RuntimeError):
+    """Raised when the resident transcription worker cannot be reached."""
+
+
+def run_worker(
+    input_path: Path, language: str | None, model: str | None, on_segment: SegmentCallback | None = None
+) -> dict:
+    """Send a transcription job to the resident worker and return its result."""
+    request = {"op": "transcribe", "input": str(input_path), "language": language, "model": model}
+    if on_segment is not None:
+        request["stream"] = True
+
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout(WORKER_TIMEOUT_SECONDS)
+        client.connect(WORKER_SOCKET)
+    except OSError as exc:
+        raise WorkerUnavailableError(f"Transcript worker not reachable at {WORKER_SOCKET}: {exc}") from exc
+
+    LOGGER.info("Sending transcription job to worker at %s", WORKER_SOCKET)
+    with client, client.makefile("rwb") as stream:
+        stream.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        stream.flush()
+        # Streaming jobs send segment events before the final status line.
+        while True:
+            raw = stream.readline()
+            if not raw:
+                raise RuntimeError("Transcript worker closed the connection without a response.")
+            response = json.loads(raw.decode("utf-8"))
+            if response.get("type") == "segment" and on_segment is not None:
+                on_segment(response["segment"])
+                continue
+            break
+    if response.get("status") != "ok":
+        raise RuntimeError(f"Transcript worker failed: {response.get('error', 'unknown error')}")
+    return response["result"]
+
+
+def transcribe(
+    input_path: Path,
+    backend: str,
+    language: str | None,
+    model: str | None,
+    on_segment: SegmentCallback | None = None,
+) -> tuple[dict, str]:
+    """Run the selected backend, falling back from the worker to the CLI in auto mode."""
+    if backend in ("auto", "worker"):
+        try:
+            return run_worker(input_path, language, model, on_segment), "worker"
+        except WorkerUnavailableError as exc:
+            if backend == "worker":
+                raise
+            LOGGER.info("%s; falling back to Whisper CLI", exc)
+        backend = choose_backend("auto")
+
+    return run_whisper_cli(input_path, language, model, on_segment), backend
+
+
+def frame_features(samples):
+    """Per-frame energy (dBFS) and zero-crossing rate of float samples in [-1, 1]."""
+    import numpy as np
+
+    frame_samples = int(VAD_SAMPLE_RATE * VAD_FRAME_SECONDS)
+    frames = samples[: samples.size - samples.size % frame_samples].reshape(-1, frame_samples)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    energy_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+    zcr = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+    return energy_db, zcr
+
+
+def decode_pcm_frames(input_path: Path):
+    """Decode audio to 16 kHz mono PCM and compute per-frame energy and zero-crossing rate.
+
+    Returns ``(pcm_bytes, energy_db, zcr)`` where the numpy arrays hold one value
+    per ``VAD_FRAME_SECONDS`` frame.
+    """
+    import numpy as np
+
+    ffmpeg_cmd = shutil.which("ffmpeg")
+    if not ffmpeg_cmd:
+        raise RuntimeError("ffmpeg is required for VAD pre-trimming.")
+
+    frame_samples = int(VAD_SAMPLE_RATE * VAD_FRAME_SECONDS)
+    block_bytes = frame_samples * 2 * 100
+    args = [ffmpeg_cmd, "-nostdin", "-v", "error", "-i", str(input_path), "-f", "s16le", "-ac", "1", "-ar", str(VAD_SAMPLE_RATE), "-"]
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Analyse the stream block by block so features are ready as soon as decoding ends.
+    pcm = bytearray()
+    energy_blocks = []
+    zcr_blocks = []
+    pending = b""
+    while True:
+        block = process.stdout.read(block_bytes)
+        if not block:
+            break
+        pcm.extend(block)
+        pending += block
+        usable = len(pending) - len(pending) % (frame_samples * 2)
+        if not usable:
+            continue
+        samples = np.frombuffer(pending[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        pending = pending[usable:]
+        energy_db, zcr = frame_features(samples)
+        energy_blocks.append(energy_db)
+        zcr_blocks.append(zcr)
+
+    stderr = process.stderr.read().decode("utf-8", errors="replace")
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg decode failed: {stderr.strip()}")
+
+    if not energy_blocks:
+        return bytes(pcm), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    return bytes(pcm), np.concatenate(energy_blocks), np.concatenate(zcr_blocks)
+
+
+def detect_speech_regions(energy_db, zcr) -> list[tuple[float, float]]:
+    """Turn frame features into padded speech regions in seconds."""
+    import numpy as np
+
+    if energy_db.size == 0:
+        return []
+
+    # Track the recording's noise floor so quiet but clean memos are not cut entirely.
+    noise_floor = float(np.percentile(energy_db, 10))
+    threshold = min(max(VAD_THRESHOLD_DB, noise_floor + 10.0), -20.0)
+    voiced = energy_db > threshold
+    # Unvoiced consonants are quieter but have a high zero-crossing rate. Broadband
+    # room noise does too, so they must stand out from the floor and sit next to voiced frames.
+    reach = int(VAD_UNVOICED_REACH_SECONDS / VAD_FRAME_SECONDS)
+    near_voiced = np.convolve(voiced, np.ones(2 * reach + 1), mode="same") > 0
+    loud_enough = energy_db > max(threshold - 10.0, noise_floor + VAD_UNVOICED_MARGIN_DB)
+    unvoiced = loud_enough & (zcr > 0.25) & near_voiced
+    speech = np.concatenate(([False], voiced | unvoiced, [False]))
+
+    edges = np.flatnonzero(np.diff(speech.astype(np.int8)))
+    regions = []
+    for start_frame, end_frame in zip(edges[::2], edges[1::2]):
+        start = int(start_frame) * VAD_FRAME_SECONDS
+        end = int(end_frame) * VAD_FRAME_SECONDS
+        if regions and start - regions[-1][1] < VAD_MIN_SILENCE_SECONDS:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    total = energy_db.size * VAD_FRAME_SECONDS
+    padded = []
+    for start, end in regions:
+        if end - start < VAD_MIN_SPEECH_SECONDS:
+            continue
+        start = max(0.0, start - VAD_PADDING_SECONDS)
+        end = min(total, end + VAD_PADDING_SECONDS)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return padded
+
+
+def map_trimmed_time(value: float, spans: list[tuple[float, float, float]]) -> float:
+    """Map a time on the trimmed timeline back to the original recording."""
+    trimmed_ends = [trimmed_start + length for trimmed_start, _, length in spans]
+    position = min(bisect_left(trimmed_ends, value), len(spans) - 1)
+    trimmed_start, original_start, length = spans[position]
+    return round(original_start + min(max(value - trimmed_start, 0.0), length), 3)
+
+
+def remap_result_timestamps(result: dict, spans: list[tuple[float, float, float]]) -> dict:
+    """Shift segment and word timestamps from the trimmed audio onto the original timeline."""
+    for segment in result.get("segments") or []:
+        for item in [segment, *(segment.get("words") or [])]:
+            for key in ("start", "end"):
+                if isinstance(item.get(key), (int, float)):
+                    item[key] = map_trimmed_time(float(item[key]), spans)
+    return result
+
+
+def transcribe_with_vad(
+    input_path: Path,
+    backend: str,
+    language: str | None,
+    model: str | None,
+    on_segment: SegmentCallback | None = None,
+) -> tuple[dict, str]:
+    """Transcribe only detected speech regions and map timestamps back to the original audio."""
+    started = time.monotonic()
+    pcm, energy_db, zcr = decode_pcm_frames(input_path)
+    regions = detect_speech_regions(energy_db, zcr)
+    total_seconds = len(pcm) / 2 / VAD_SAMPLE_RATE
+    speech_seconds = sum(end - start for start, end in regions)
+    LOGGER.info(
+        "VAD found %s speech regions: %.1fs of %.1fs in %.2fs",
+        len(regions),
+        speech_seconds,
+        total_seconds,
+        time.monotonic() - started,
+    )
+
+    if not regions:
+        return {"text": "", "segments": [], "language": language}, VAD_NO_SPEECH_BACKEND
+    if total_seconds <= 0 or speech_seconds / total_seconds > VAD_MAX_SPEECH_RATIO:
+        return transcribe(input_path, backend, language, model, on_segment)
+
+    spans = []
+    with tempfile.TemporaryDirectory(prefix="toolhub-transcript-vad-") as tmp_dir:
+        trimmed_path = Path(tmp_dir) / f"{input_path.stem}.wav"
+        with wave.open(str(trimmed_path), "wb") as trimmed:
+            trimmed.setnchannels(1)
+            trimmed.setsampwidth(2)
+            trimmed.setframerate(VAD_SAMPLE_RATE)
+            trimmed_start = 0.0
+            for start, end in regions:
+                first_sample = int(start * VAD_SAMPLE_RATE)
+                last_sample = min(int(end * VAD_SAMPLE_RATE), len(pcm) // 2)
+                trimmed.writeframes(pcm[first_sample * 2 : last_sample * 2])
+                length = (last_sample - first_sample) / VAD_SAMPLE_RATE
+                spans.append((trimmed_start, first_sample / VAD_SAMPLE_RATE, length))
+                trimmed_start += length
+        remapped_callback = None
+        if on_segment is not None:
+
+            def remapped_callback(segment: dict) -> None:
+                on_segment(
+                    {**segment, "start": map_trimmed_time(segment["start"], spans), "end": map_trimmed_time(segment["end"], spans)}
+                )
+
+        result, used_backend = transcribe(trimmed_path, backend, language, model, remapped_callback)
+
+    return remap_result_timestamps(result, spans), used_backend
+
+
+def hash_file(path: Path) -> str:
+    """Return the SHA-256 of a file, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_entry_path(audio_sha256: str, backend: str, language: str | None, model: str | None) -> Path:
+    """Map audio hash and transcription settings to a cache file."""
+    key_source = json.dumps([CACHE_VERSION, audio_sha256, backend, language or "", model or ""])
+    return CACHE_DIR / f"{hashlib.sha256(key_source.encode('utf-8')).hexdigest()}.json"
+
+
+def cache_backends(requested_backend: str, vad: bool = False) -> list[str]:
+    """Backends whose cached results satisfy a request, in preference order."""
+    backends = ["worker", "whisper-cli"] if requested_backend == "auto" else [requested_backend]
+    # A VAD run that found no speech reports the "vad" pseudo-backend for any requested backend.
+    return [*backends, VAD_NO_SPEECH_BACKEND] if vad else backends
+
+
+def cache_key_backend(backend: str, vad: bool) -> str:
+    """Backend component of a cache key; used for both lookups and stores so they always agree.
+
+    VAD-trimmed results differ slightly from full-file runs, so they get their own keys.
+    """
+    if backend == VAD_NO_SPEECH_BACKEND:
+        return backend
+    return f"{backend}+vad" if vad else backend
+
+
+def load_cached_transcript(audio_sha256: str, backend: str, language: str | None, model: str | None) -> dict | None:
+    """Return a cached transcript result, refreshing its recency on a hit."""
+    entry_path = cache_entry_path(audio_sha256, backend, language, model)
+    try:
+        entry = json.loads(entry_path.read_text(encoding="utf-8"))
+        os.utime(entry_path)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as exc:
+        LOGGER.warning("Ignoring unreadable transcript cache entry %s: %s", entry_path, exc)
+        return None
+    if entry.get("audio_sha256") != audio_sha256 or not isinstance(entry.get("result"), dict):
+        return None
+    return entry["result"]
+
+
+def store_cached_transcript(
+    audio_sha256: str, backend: str, language: str | None, model: str | None, result: dict
+) -> None:
+    """Atomically store a transcript result and evict old entries beyond the size limit."""
+    entry = {
+        "version": CACHE_VERSION,
+        "audio_sha256": audio_sha256,
+        "backend": backend,
+        "language": language,
+        "model": model,
+        "created_at": time.time(),
+        "result": result,
+    }
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        entry_path = cache_entry_path(audio_sha256, backend, language, model)
+        fd, tmp_name = tempfile.mkstemp(dir=CACHE_DIR, prefix=".entry-", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh, ensure_ascii=False)
+        os.replace(tmp_name, entry_path)
+        evict_transcript_cache(CACHE_MAX_BYTES)
+    except OSError as exc:
+        LOGGER.warning("Could not store transcript cache entry: %s", exc)
+
+
+def evict_transcript_cache(max_bytes: int) -> None:
+    """Delete least recently used cache entries until the cache fits max_bytes."""
+    entries = []
+    for entry_path in CACHE_DIR.glob("*.json"):
+        try:
+            stat = entry_path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            entry_path.unlink()
+            LOGGER.info("Evicted transcript cache entry %s", entry_path.name)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def transcribe_cached(
+    input_path: Path,
+    backend: str,
+    language: str | None,
+    model: str | None,
+    use_cache: bool,
+    vad: bool = False,
+    on_segment: SegmentCallback | None = None,
+) -> tuple[dict, str, bool]:
+    """Return a cached transcript when available, otherwise transcribe and cache it."""
+    run = transcribe_with_vad if vad else transcribe
+    if not use_cache:
+        result, used_backend = run(input_path, backend, language, model, on_segment)
+        return result, used_backend, False
+
+    audio_sha256 = hash_file(input_path)
+    for candidate in cache_backends(backend, vad):
+        key_backend = cache_key_backend(candidate, vad)
+        cached = load_cached_transcript(audio_sha256, key_backend, language, model)
+        if cached is not None:
+            LOGGER.info("Transcript cache hit for %s (%s)", input_path, key_backend)
+            if on_segment is not None:
+                for segment in cached.get("segments") or []:
+                    on_segment({key: segment.get(key) for key in ("start", "end", "text")})
+            return cached, candidate, True
+
+    result, used_backend = run(input_path, backend, language, model, on_segment)
+    store_cached_transcript(audio_sha256, cache_key_backend(used_backend, vad), language, model, result)
+    return result, used_backend, False
+
+
 def extract_text(result: dict) -> str:
     """Extract normalized text from backend results."""
     text = result.get("text")
@@ -147,33 +613,266 @@ def choose_backend(requested_backend: str) -> str:
     if shutil.which("whisper"):
         return "whisper-cli"
 
-    raise RuntimeError("No transcription backend available. Install Whisper CLI.")
+    raise RuntimeError("No transcription backend available. Start the transcript worker or install Whisper CLI.")
+
+
+def write_transcript(output_path: Path, result: dict, output_format: str) -> None:
+    """Write a transcript result as JSON or plain text."""
+    if output_format == "json":
+        output_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    else:
+        output_path.write_text(extract_text(result), encoding="utf-8")
+
+
+def resolve_batch_dir(job_id: str | None, input_dir: str | None) -> Path:
+    """Resolve the chunk directory of a split job or an explicit directory."""
+    if job_id:
+        if not SAFE_JOB_ID_PATTERN.match(job_id) or job_id in (".", ".."):
+            raise ValueError(f"Invalid job_id: {job_id}")
+        batch_dir = SPLIT_OUTPUT_ROOT / job_id
+    else:
+        candidate = Path(input_dir)
+        batch_dir = candidate if candidate.is_absolute() else DEFAULT_INPUT_ROOT / candidate
+
+    if not batch_dir.is_dir():
+        raise FileNotFoundError(f"Chunk directory not found: {batch_dir}")
+    return batch_dir
+
+
+def list_chunk_files(batch_dir: Path) -> list[Path]:
+    """List audio chunks sorted by part index and file name."""
+
+    def sort_key(path: Path) -> tuple[int, str]:
+        match = re.search(r"part_(\d+)", path.name, flags=re.IGNORECASE)
+        return (int(match.group(1)) if match else 10**9, path.name)
+
+    files = [path for path in batch_dir.iterdir() if path.is_file() and path.suffix.lower() in AUDIO_EXTENSIONS]
+    return sorted(files, key=sort_key)
+
+
+def load_chunk_index(batch_dir: Path) -> dict[str, dict]:
+    """Load chunk offsets written by audio-split.sh, keyed by file name."""
+    index_path = batch_dir / CHUNK_INDEX_FILENAME
+    records: dict[str, dict] = {}
+    if not index_path.is_file():
+        return records
+
+    for line in index_path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and isinstance(record.get("filename"), str):
+            records[record["filename"]] = record
+    return records
+
+
+def probe_duration(path: Path) -> float | None:
+    """Return the media duration via ffprobe, or None when unavailable."""
+    ffprobe_cmd = shutil.which("ffprobe")
+    if not ffprobe_cmd:
+        return None
+    result = subprocess.run(
+        [ffprobe_cmd, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def emit_event(event_type: str, **payload) -> None:
+    """Write one NDJSON stream event to stdout immediately."""
+    print(json.dumps({"type": event_type, **payload}, ensure_ascii=False), flush=True)
+
+
+def shift_chunk_segments(chunk: dict) -> list[dict]:
+    """Copy a chunk's segments with timestamps shifted by the chunk start offset."""
+    offset = chunk["start"]
+    shifted_segments = []
+    for segment in chunk["result"].get("segments") or []:
+        shifted = dict(segment)
+        shifted["chunk_index"] = chunk["index"]
+        for key in ("start", "end"):
+            if isinstance(shifted.get(key), (int, float)):
+                shifted[key] = round(shifted[key] + offset, 3)
+        if shifted.get("words"):
+            shifted["words"] = [dict(word) for word in shifted["words"]]
+            for word in shifted["words"]:
+                for key in ("start", "end"):
+                    if isinstance(word.get(key), (int, float)):
+                        word[key] = round(word[key] + offset, 3)
+        shifted_segments.append(shifted)
+    return shifted_segments
+
+
+def merge_chunk_results(chunks: list[dict]) -> dict:
+    """Merge per-chunk transcripts into one result with absolute segment timestamps."""
+    segments = []
+    texts = []
+    for chunk in chunks:
+        for shifted in shift_chunk_segments(chunk):
+            shifted["id"] = len(segments)
+            segments.append(shifted)
+        text = extract_text(chunk["result"]).strip()
+        if text:
+            texts.append(text)
+
+    language = next((chunk["result"].get("language") for chunk in chunks if chunk["result"].get("language")), None)
+    return {
+        "text": " ".join(texts),
+        "language": language,
+        "segments": segments,
+        "chunks": [
+            {key: chunk[key] for key in ("index", "filename", "start", "output", "backend")} for chunk in chunks
+        ],
+    }
+
+
+def transcribe_batch(args: argparse.Namespace) -> dict:
+    """Transcribe all chunks of a split job in parallel and write a merged transcript."""
+    batch_dir = resolve_batch_dir(args.job_id, args.input_dir)
+    chunk_files = list_chunk_files(batch_dir)
+    if not chunk_files:
+        raise FileNotFoundError(f"No audio chunks found in {batch_dir}")
+
+    suffix = ".json" if args.format == "json" else ".txt"
+    chunk_output_dir = DEFAULT_OUTPUT_ROOT / batch_dir.name
+    chunk_output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = resolve_output_path(batch_dir, args.output, args.format)
+    workers = max(1, min(args.workers or BATCH_WORKERS, len(chunk_files)))
+    LOGGER.info("Transcribing %s chunks from %s with %s workers", len(chunk_files), batch_dir, workers)
+
+    def transcribe_chunk(chunk_path: Path) -> tuple[dict, str, bool]:
+        result, backend, cached = transcribe_cached(
+            chunk_path, args.backend, args.language, args.model, use_cache=not args.no_cache, vad=args.vad
+        )
+        write_transcript(chunk_output_dir / f"{chunk_path.stem}{suffix}", result, args.format)
+        return result, backend, cached
+
+    # Prefer split-index offsets; otherwise accumulate probed or transcribed chunk durations.
+    index = load_chunk_index(batch_dir)
+    chunks = []
+    next_start = 0.0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() yields in chunk order, so streamed chunk events keep timeline order.
+        outcomes = executor.map(transcribe_chunk, chunk_files)
+        for position, (chunk_path, outcome) in enumerate(zip(chunk_files, outcomes), start=1):
+            chunk, next_start = build_batch_chunk(chunk_path, position, index, next_start, outcome)
+            chunk["output"] = str(chunk_output_dir / f"{chunk_path.stem}{suffix}")
+            chunks.append(chunk)
+            if args.stream:
+                emit_event(
+                    "chunk",
+                    index=chunk["index"],
+                    filename=chunk["filename"],
+                    start=chunk["start"],
+                    cached=chunk["cached"],
+                    segments=shift_chunk_segments(chunk),
+                )
+
+    merged = merge_chunk_results(chunks)
+    write_transcript(output_path, merged, args.format)
+    return {
+        "status": "ok",
+        "backend": ",".join(sorted({chunk["backend"] for chunk in chunks})),
+        "input_dir": str(batch_dir),
+        "job_id": args.job_id,
+        "output": str(output_path),
+        "format": args.format,
+        "chunk_count": len(chunks),
+        "cached_chunks": sum(1 for chunk in chunks if chunk["cached"]),
+        "chunk_outputs": [chunk["output"] for chunk in chunks],
+        "text_length": len(merged["text"]),
+    }
+
+
+def build_batch_chunk(
+    chunk_path: Path, position: int, index: dict[str, dict], next_start: float, outcome: tuple[dict, str, bool]
+) -> tuple[dict, float]:
+    """Describe one transcribed chunk and return it with the start offset of the next chunk."""
+    result, backend, cached = outcome
+    record = index.get(chunk_path.name, {})
+    start = float(record["start"]) if isinstance(record.get("start"), (int, float)) else next_start
+    duration = record.get("duration")
+    if not isinstance(duration, (int, float)):
+        duration = probe_duration(chunk_path)
+    if duration is None:
+        segments = result.get("segments") or []
+        duration = float(segments[-1].get("end", 0.0)) if segments else 0.0
+    chunk = {
+        "index": record.get("index", position),
+        "filename": chunk_path.name,
+        "start": start,
+        "backend": backend,
+        "cached": cached,
+        "result": result,
+    }
+    return chunk, start + float(duration)
 
 
 def main() -> int:
     """CLI entrypoint for transcription automation."""
     parser = argparse.ArgumentParser(description="Transcribe audio with local Whisper CLI.")
-    parser.add_argument("--input", required=True, help="Input audio path (absolute or relative to /shared/audio/in).")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Input audio path (absolute or relative to /shared/audio/in).")
+    source.add_argument("--job-id", help="Split job id under /shared/audio/out; transcribes and merges all chunks.")
+    source.add_argument("--input-dir", help="Chunk directory to transcribe and merge (absolute or relative to /shared/audio/in).")
     parser.add_argument("--output", help="Output path (absolute or relative to /shared/audio/out/transcripts).")
     parser.add_argument("--format", choices=["json", "txt"], default="json", help="Output format.")
-    parser.add_argument("--backend", choices=["auto", "whisper-cli"], default="auto", help="Transcription backend.")
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "worker", "whisper-cli"],
+        default="auto",
+        help="Transcription backend (auto prefers the resident worker).",
+    )
     parser.add_argument("--language", help="Optional language code (for example de, en).")
     parser.add_argument("--model", help="Optional backend model name.")
+    parser.add_argument("--workers", type=int, help="Parallel chunk transcriptions in batch mode.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the transcript cache.")
+    parser.add_argument("--vad", action="store_true", help="Transcribe only detected speech regions.")
+    parser.add_argument("--stream", action="store_true", help="Emit NDJSON segment events while decoding.")
     args = parser.parse_args()
+    args.no_cache = args.no_cache or not CACHE_ENABLED
+    args.vad = args.vad or VAD_ENABLED
+    args.stream = args.stream or STREAM_ENABLED
 
     configure_logging()
 
     try:
+        if args.job_id or args.input_dir:
+            response = transcribe_batch(args)
+            if args.stream:
+                emit_event("done", **response)
+            else:
+                print(json.dumps(response, ensure_ascii=False))
+            return 0
+
         input_path = resolve_input_path(args.input)
-        backend = choose_backend(args.backend)
         output_path = resolve_output_path(input_path, args.output, args.format)
 
-        result = run_whisper_cli(input_path, args.language, args.model)
-
-        if args.format == "json":
-            output_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
-        else:
-            output_path.write_text(extract_text(result), encoding="utf-8")
+        on_segment = None
+        if args.stream:
+            segment_count = 0
+
+            def on_segment(segment: dict) -> None:
+                nonlocal segment_count
+                emit_event("segment", index=segment_count, **segment)
+                segment_count += 1
+
+        result, backend, cached = transcribe_cached(
+            input_path,
+            args.backend,
+            args.language,
+            args.model,
+            use_cache=not args.no_cache,
+            vad=args.vad,
+            on_segment=on_segment,
+        )
+        write_transcript(output_path, result, args.format)
 
         response = {
             "status": "ok",
@@ -181,13 +880,20 @@ def main() -> int:
             "input": str(input_path),
             "output": str(output_path),
             "format": args.format,
+            "cached": cached,
             "text_length": len(extract_text(result)),
         }
-        print(json.dumps(response, ensure_ascii=False))
+        if args.stream:
+            emit_event("done", **response)
+        else:
+            print(json.dumps(response, ensure_ascii=False))
         return 0
     except Exception as exc:  # noqa: BLE001
         LOGGER.exception("Transcription failed: %s", exc)
-        print(json.dumps({"status": "error", "error": str(exc)}))
+        if args.stream:
+            emit_event("error", status="error", error=str(exc))
+        else:
+            print(json.dumps({"status": "error", "error": str(exc)}))
         return 1
 
 
@@ -10,13 +10,13 @@ Exposes REST endpoints:
   POST /audio-ingest-split  Upload + split audio in one request
   GET  /audio-chunk/<job_id>/<filename>  Download generated chunk binary
   POST /audio-split  Split audio files from /shared/audio/in
-  POST /run          Dispatch registered Toolhub tools (JSON-first)
+  POST /run          Dispatch registered Toolhub tools (JSON-first, optional NDJSON/SSE stream)
   POST /run-file     Dispatch file-first Toolhub tools
   GET  /artifacts/<job_id>/<filename>  Download run-file artifacts
 
 Logs all activity to /logs/webhook.log.
 """
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 import subprocess
 import logging
 import os
@@ -25,6 +25,10 @@ import json
 from pathlib import Path
 from werkzeug.utils import secure_filename
 import uuid
+import base64
+import hashlib
+import tempfile
+import threading
 from werkzeug.exceptions import HTTPException
 import time
 import re
@@ -39,7 +43,7 @@ GB = 1024 * MB
 MAX_PAYLOAD_SIZE = 1 * GB  # 1 GB
 
 # Ensure log directory exists and configure logging
-LOG_DIR = '/logs'
+LOG_DIR = os.getenv('TOOLHUB_LOG_DIR', '/logs')
 os.makedirs(LOG_DIR, exist_ok=True)
 
 # Configure logger
@@ -230,7 +234,15 @@ SCRIPT_TOOLS = load_script_tools()
 
 SHARED_AUDIO_IN_DIR = "/shared/audio/in"
 SHARED_AUDIO_OUT_DIR = "/shared/audio/out"
+INGEST_INDEX_DIR = os.getenv("TOOLHUB_INGEST_INDEX_DIR", "/shared/audio/cache/ingest")
+UPLOAD_BLOCK_SIZE = 1 * MB
 SAFE_JOB_ID_PATTERN = re.compile(r"^[a-f0-9-]{36}$")
+AUDIO_SPLIT_TIMEOUT_SECONDS = 600
+CHUNK_INDEX_FILENAME = "chunks.ndjson"
+STREAM_POLL_INTERVAL_SECONDS = 0.25
+STREAM_FORMATS = {"ndjson", "sse"}
+# Streaming-capable scripts switch to NDJSON event output when this is set.
+STREAM_ENV_FLAG = "TOOLHUB_STREAM"
 ALLOWED_AUDIO_EXTENSIONS = {".mp3", ".m4a", ".wav"}
 DEFAULT_INGEST_SOURCE = "ios-webhook"
 DEFAULT_INGEST_LANGUAGE = "de"
@@ -288,7 +300,7 @@ def parse_float(value, field_name, default=None):
         raise ValueError(f"Invalid {field_name}") from exc
 
 
-def build_split_command(input_path, output_dir, mode, chunk_length, split_options):
+def build_split_command(input_path, output_dir, mode, chunk_length, split_options, input_sha256=None):
     """Build audio split command arguments from validated options."""
     cmd = [
         "/scripts/audio-split.sh",
@@ -319,6 +331,10 @@ def build_split_command(input_path, output_dir, mode, chunk_length, split_option
     elif split_options["enhance"]:
         cmd.append("--enhance")
 
+    # A known content hash lets the split script reuse its analysis cache without rehashing.
+    if input_sha256:
+        cmd += ["--input-sha256", input_sha256]
+
     return cmd
 
 
@@ -378,38 +394,202 @@ def resolve_ingest_meta(form_data, recording_id):
     }
 
 
+# Chunk index fields recorded by audio-split.sh at export time, mapped to manifest keys.
+CHUNK_METADATA_FIELDS = {
+    "start": "startSeconds",
+    "duration": "durationSeconds",
+    "end": "endSeconds",
+    "size": "sizeBytes",
+    "codec": "codec",
+    "bitrate": "bitrate",
+    "cut_reason": "cutReason",
+}
+
+
+def store_upload_hashed(uploaded_file, target_dir):
+    """Stream an upload into a temporary file inside target_dir while hashing it."""
+    os.makedirs(target_dir, exist_ok=True)
+    tmp_path = os.path.join(target_dir, f".upload-{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as fh:
+            for block in iter(lambda: uploaded_file.stream.read(UPLOAD_BLOCK_SIZE), b""):
+                digest.update(block)
+                fh.write(block)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+
+def split_options_key(mode, chunk_length, split_options):
+    """Serialize split settings into a stable key for deduplication lookups."""
+    return json.dumps({"mode": mode, "chunk_length": chunk_length, **split_options}, sort_keys=True)
+
+
+def _ingest_record_path(sha256):
+    return os.path.join(INGEST_INDEX_DIR, f"{sha256}.json")
+
+
+def load_ingest_record(sha256):
+    """Load the ingest record for a content hash, or None when unknown."""
+    try:
+        with open(_ingest_record_path(sha256), "r", encoding="utf-8") as fh:
+            record = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(f"Ignoring unreadable ingest record for {sha256}: {exc}")
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def save_ingest_record(sha256, record):
+    """Atomically persist the ingest record for a content hash."""
+    os.makedirs(INGEST_INDEX_DIR, exist_ok=True)
+    record_path = _ingest_record_path(sha256)
+    tmp_path = f"{record_path}.{uuid.uuid4()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(record, fh, ensure_ascii=False)
+    os.replace(tmp_path, record_path)
+
+
+def commit_ingest_file(tmp_path, ingest_path, record):
+    """Move an upload into place, hard-linking to a prior ingest with identical content.
+
+    Returns ``"hardlink"`` when the prior ingest file was linked and the
+    upload discarded, otherwise ``"stored"``.
+    """
+    existing_path = record.get("path") if isinstance(record, dict) else None
+    if existing_path and os.path.isfile(existing_path):
+        try:
+            if os.path.exists(ingest_path):
+                if os.path.samefile(existing_path, ingest_path):
+                    os.remove(tmp_path)
+                    return "hardlink"
+                os.remove(ingest_path)
+            os.link(existing_path, ingest_path)
+            os.remove(tmp_path)
+            return "hardlink"
+        except OSError as exc:
+            logger.warning(f"Hard-linking {existing_path} -> {ingest_path} failed, storing a copy: {exc}")
+
+    os.replace(tmp_path, ingest_path)
+    return "stored"
+
+
+def register_ingest_job(sha256, ingest_path, options_key, job_id):
+    """Remember which split job belongs to a content hash and split option set."""
+    record = load_ingest_record(sha256) or {"sha256": sha256, "jobs": {}}
+    if not record.get("path") or not os.path.isfile(record["path"]):
+        record["path"] = ingest_path
+    record.setdefault("jobs", {})[options_key] = job_id
+    save_ingest_record(sha256, record)
+
+
+def find_deduplicated_job(record, options_key):
+    """Return (job_id, output_dir, chunk_files) of a prior split with identical options."""
+    jobs = record.get("jobs") if isinstance(record, dict) else None
+    job_id = jobs.get(options_key) if isinstance(jobs, dict) else None
+    if not isinstance(job_id, str) or not SAFE_JOB_ID_PATTERN.match(job_id):
+        return None
+    output_dir = f"{SHARED_AUDIO_OUT_DIR}/{job_id}"
+    if not os.path.isdir(output_dir):
+        return None
+    chunk_files = extract_sorted_chunk_files(output_dir)
+    if not chunk_files:
+        return None
+    return job_id, output_dir, chunk_files
+
+
+def build_chunk_entry(host_base, job_id, output_dir, index, chunk_filename, chunk_record=None):
+    """Build one chunk manifest entry, enriched with split-time metadata when available."""
+    entry = {
+        "index": index,
+        "filename": chunk_filename,
+        "path": os.path.join(output_dir, chunk_filename),
+        "downloadUrl": f"{host_base}/audio-chunk/{job_id}/{chunk_filename}",
+        "mimeType": audio_mime_type(chunk_filename),
+    }
+    if isinstance(chunk_record, dict):
+        for source_key, manifest_key in CHUNK_METADATA_FIELDS.items():
+            if source_key in chunk_record:
+                entry[manifest_key] = chunk_record[source_key]
+    return entry
+
+
 def build_chunk_manifest(host_base, job_id, output_dir, chunk_files):
     """Build a stable chunk manifest sorted by numeric part index."""
-    chunks = []
-    for index, chunk_filename in enumerate(chunk_files, start=1):
-        chunk_path = os.path.join(output_dir, chunk_filename)
-        chunks.append(
-            {
-                "index": index,
-                "filename": chunk_filename,
-                "path": chunk_path,
-                "downloadUrl": f"{host_base}/audio-chunk/{job_id}/{chunk_filename}",
-                "mimeType": audio_mime_type(chunk_filename),
-            }
+    records, _offset = read_chunk_index(output_dir)
+    records_by_filename = {record.get("filename"): record for record in records}
+    return [
+        build_chunk_entry(
+            host_base,
+            job_id,
+            output_dir,
+            index,
+            chunk_filename,
+            records_by_filename.get(chunk_filename),
         )
-    return chunks
+        for index, chunk_filename in enumerate(chunk_files, start=1)
+    ]
 
 
-def execute_audio_split(input_path, mode, chunk_length, split_options):
-    """Execute the split script and return job metadata and sorted chunk files."""
+def read_chunk_index(output_dir, offset=0):
+    """Read complete chunk index lines written by the split script from a byte offset.
+
+    Returns the parsed records and the offset of the first unread byte, so
+    callers can poll the index while the split is still running.
+    """
+    index_path = os.path.join(output_dir, CHUNK_INDEX_FILENAME)
+    if not os.path.isfile(index_path):
+        return [], offset
+
+    with open(index_path, "rb") as fh:
+        fh.seek(offset)
+        data = fh.read()
+
+    # Only consume newline-terminated records; a partial tail is picked up next poll.
+    complete, sep, _tail = data.rpartition(b"\n")
+    if not sep:
+        return [], offset
+
+    records = []
+    for line in complete.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except Exception:  # noqa: BLE001
+            logger.warning(f"Skipping invalid chunk index line in {index_path}: {line!r}")
+    return records, offset + len(complete) + 1
+
+
+def prepare_split_job():
+    """Create a fresh split job id and output directory."""
     job_id = str(uuid.uuid4())
     output_dir = f"{SHARED_AUDIO_OUT_DIR}/{job_id}"
     os.makedirs(output_dir, exist_ok=True)
     logger.info(f"Created output directory: {output_dir}")
+    return job_id, output_dir
 
-    cmd = build_split_command(input_path, output_dir, mode, chunk_length, split_options)
 
+def _log_split_command(cmd):
     logger.debug("Executing split script with command arguments:")
     for index, arg in enumerate(cmd):
         logger.debug(f"  cmd[{index}] = {arg}")
 
+
+def execute_audio_split(input_path, mode, chunk_length, split_options, input_sha256=None):
+    """Execute the split script and return job metadata and sorted chunk files."""
+    job_id, output_dir = prepare_split_job()
+
+    cmd = build_split_command(input_path, output_dir, mode, chunk_length, split_options, input_sha256)
+    _log_split_command(cmd)
+
     start = time.time()
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=600)
+    result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=AUDIO_SPLIT_TIMEOUT_SECONDS)
     duration = time.time() - start
 
     logger.debug(f"Split script stdout: {result.stdout}")
@@ -423,6 +603,89 @@ def execute_audio_split(input_path, mode, chunk_length, split_options):
     return job_id, output_dir, chunk_files
 
 
+def _read_spooled_output(*files):
+    """Return the contents of temp files that captured a child process's output."""
+    contents = []
+    for fh in files:
+        fh.seek(0)
+        contents.append(fh.read())
+    return tuple(contents)
+
+
+def iter_audio_split_chunks(input_path, output_dir, mode, chunk_length, split_options, input_sha256=None):
+    """Run the split script and yield chunk index records as soon as each chunk is finalized.
+
+    The split script fsyncs every chunk before appending it to the chunk index,
+    so a yielded record always points at a complete file. Raises the same
+    exceptions as ``execute_audio_split`` once the script fails or times out.
+    """
+    cmd = build_split_command(input_path, output_dir, mode, chunk_length, split_options, input_sha256)
+    _log_split_command(cmd)
+
+    start = time.time()
+    # Spool output to temp files: nobody reads pipes while chunks are polled.
+    # audio-split.sh logs to its own logfile, but output written before that
+    # redirect, or by another split command, must not block on a full pipe.
+    with tempfile.TemporaryFile(mode="w+") as stdout_file, tempfile.TemporaryFile(mode="w+") as stderr_file:
+        process = subprocess.Popen(cmd, stdout=stdout_file, stderr=stderr_file, text=True)
+        offset = 0
+        produced = 0
+        try:
+            while True:
+                finished = process.poll() is not None
+                records, offset = read_chunk_index(output_dir, offset)
+                for record in records:
+                    produced += 1
+                    yield record
+                if finished:
+                    break
+                if time.time() - start > AUDIO_SPLIT_TIMEOUT_SECONDS:
+                    process.kill()
+                    process.wait()
+                    stdout, stderr = _read_spooled_output(stdout_file, stderr_file)
+                    raise subprocess.TimeoutExpired(cmd, AUDIO_SPLIT_TIMEOUT_SECONDS, output=stdout, stderr=stderr)
+                time.sleep(STREAM_POLL_INTERVAL_SECONDS)
+        finally:
+            # Never leave an orphaned split process behind when the client disconnects.
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        stdout, stderr = _read_spooled_output(stdout_file, stderr_file)
+
+    duration = time.time() - start
+    logger.debug(f"Split script stdout: {stdout}")
+    logger.debug(f"Split script stderr: {stderr}")
+    logger.info(f"Split script returned with exit code {process.returncode} in {duration:.3f}s (streamed {produced} chunk(s))")
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, output=stdout, stderr=stderr)
+    if not produced:
+        raise RuntimeError("No audio chunks were generated")
+
+
+def resolve_stream_format(form_data):
+    """Resolve the requested streaming format from form data or the Accept header."""
+    requested = str(form_data.get("stream") or "").strip().lower()
+    if requested in {"", "0", "false", "no", "off"}:
+        accept = request.headers.get("Accept", "")
+        if "application/x-ndjson" in accept:
+            return "ndjson"
+        if "text/event-stream" in accept:
+            return "sse"
+        return None
+    if requested in {"1", "true", "yes", "on"}:
+        return "ndjson"
+    if requested not in STREAM_FORMATS:
+        raise ValueError("stream must be 'ndjson' or 'sse'")
+    return requested
+
+
+def format_stream_event(stream_format, event_type, payload):
+    """Serialize one streaming event as an NDJSON line or an SSE frame."""
+    if stream_format == "sse":
+        return f"event: {event_type}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    return json.dumps({"type": event_type, **payload}, ensure_ascii=False) + "\n"
+
+
 def build_manifest_args(request_data, manifest):
     """Build positional args for a manifest tool from args[] or payload fields."""
     # Accept legacy 'args' for direct positional forwarding.
@@ -532,11 +795,66 @@ def _run_external_tool(tool_name, cmd, timeout_seconds):
     return {"status": "ok", "tool": tool_name, "stdout": stdout_text, "stderr": stderr_text}, 200
 
 
+def iter_external_tool_events(tool_name, cmd, timeout_seconds):
+    """Run a subprocess tool and yield ``(event_type, payload)`` per stdout line.
+
+    JSON lines with a ``type`` field are forwarded as that event, other JSON
+    objects as ``result`` and plain text as ``log``. A closing ``end`` event
+    carries the exit code; failures and timeouts add an ``error`` event first.
+    """
+    logger.info(f"Streaming tool '{tool_name}': {' '.join(cmd)}")
+    env = dict(os.environ, **{STREAM_ENV_FLAG: "1", "PYTHONUNBUFFERED": "1"})
+    timed_out = threading.Event()
+
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True, bufsize=1, env=env)
+
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout_seconds, kill_on_timeout)
+        timer.start()
+        try:
+            for line in process.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                parsed = _parse_stdout_payload(line)
+                if parsed is None:
+                    yield "log", {"line": line}
+                elif isinstance(parsed.get("type"), str):
+                    event_type = parsed.pop("type")
+                    yield event_type, parsed
+                else:
+                    yield "result", parsed
+            exit_code = process.wait()
+        finally:
+            # Also reached when the client disconnects and the generator is closed.
+            timer.cancel()
+            if process.poll() is None:
+                logger.warning(f"Terminating streaming tool '{tool_name}' (pid={process.pid})")
+                process.kill()
+                process.wait()
+
+        if timed_out.is_set():
+            yield "error", {"tool": tool_name, "error": {"type": "TimeoutExpired", "message": f"Timed out after {timeout_seconds}s"}}
+        elif exit_code != 0:
+            stderr_file.seek(0)
+            stderr_text = stderr_file.read().decode("utf-8", errors="replace").strip()
+            yield "error", {"tool": tool_name, "exit_code": exit_code, "stderr": stderr_text[-4000:]}
+    yield "end", {"tool": tool_name, "exit_code": exit_code}
+
+
+def build_manifest_command(manifest, request_data):
+    """Return the command and timeout for a manifest CLI tool request."""
+    args = build_manifest_args(request_data, manifest)
+    return _build_manifest_command(manifest, args), int(manifest.get("timeout_seconds", 120))
+
+
 def execute_manifest_tool(tool_name, manifest, request_data):
     """Execute a manifest CLI tool and return normalized payload tuple."""
-    args = build_manifest_args(request_data, manifest)
-    cmd = _build_manifest_command(manifest, args)
-    timeout_seconds = int(manifest.get("timeout_seconds", 120))
+    cmd, timeout_seconds = build_manifest_command(manifest, request_data)
     return _run_external_tool(tool_name, cmd, timeout_seconds)
 
 
@@ -554,7 +872,7 @@ def build_script_args(request_data):
         payload = {
             key: value
             for key, value in request_data.items()
-            if key not in {"tool", "payload", "args"}
+            if key not in {"tool", "payload", "args", "stream"}
         }
     elif not isinstance(payload, dict):
         raise ValueError("'payload' must be an object when provided.")
@@ -589,8 +907,8 @@ def build_script_args(request_data):
     return args
 
 
-def execute_script_tool(tool_name, tool, request_data):
-    """Execute discovered scripts with webhook-provided args or payload."""
+def build_script_command(tool, request_data):
+    """Return the command and timeout for a discovered script tool request."""
     args = build_script_args(request_data)
     script_path = tool["path"]
 
@@ -598,8 +916,13 @@ def execute_script_tool(tool_name, tool, request_data):
         cmd = ["python3", script_path, *args]
     else:
         cmd = ["bash", script_path, *args]
+    return cmd, 600
 
-    return _run_external_tool(tool_name, cmd, 600)
+
+def execute_script_tool(tool_name, tool, request_data):
+    """Execute discovered scripts with webhook-provided args or payload."""
+    cmd, timeout_seconds = build_script_command(tool, request_data)
+    return _run_external_tool(tool_name, cmd, timeout_seconds)
 
 
 def execute_python_tool(tool_name, tool_payload):
@@ -627,6 +950,24 @@ def execute_python_tool(tool_name, tool_payload):
     return {"status": "ok", "result": result}, status_code
 
 
+def encode_content_stream(result_payload):
+    """Replace an in-memory ``content_stream`` result with base64 for JSON transports."""
+    if isinstance(result_payload, dict) and result_payload.get("content_stream") is not None:
+        result_payload = dict(result_payload)
+        result_payload["content_base64"] = base64.b64encode(result_payload.pop("content_stream").getvalue()).decode("ascii")
+    return result_payload
+
+
+def send_content_stream(result_payload):
+    """Send a tool's ``content_stream`` buffer (``return=stream``) as the HTTP response body."""
+    return send_file(
+        result_payload["content_stream"],
+        mimetype=result_payload.get("mime_type") or "application/octet-stream",
+        as_attachment=True,
+        download_name=result_payload.get("filename") or "output.bin",
+    )
+
+
 def dispatch_tool_payload(request_payload, requested_tool_name):
     """Dispatch payload to python, manifest, or script tools."""
     tool_payload = request_payload.get("payload") if isinstance(request_payload, dict) else {}
@@ -652,6 +993,33 @@ def dispatch_tool_payload(request_payload, requested_tool_name):
     }, 404
 
 
+def stream_tool_payload(request_payload, requested_tool_name, stream_format):
+    """Dispatch a tool request and stream its output events as NDJSON or SSE."""
+    tool_payload = request_payload.get("payload") if isinstance(request_payload, dict) else {}
+    tool_name = resolve_requested_tool_name(requested_tool_name)
+    normalised_tool_name = _normalise_tool_token(tool_name)
+
+    if tool_name in TOOLS:
+        # In-process tools have no incremental output; emit their result as a single event.
+        result_payload, _ = execute_python_tool(tool_name, tool_payload if isinstance(tool_payload, dict) else {})
+        events = iter([("result", encode_content_stream(result_payload)), ("end", {"tool": tool_name})])
+    elif tool_name in MANIFEST_TOOLS:
+        cmd, timeout_seconds = build_manifest_command(MANIFEST_TOOLS[tool_name], request_payload)
+        events = iter_external_tool_events(tool_name, cmd, timeout_seconds)
+    elif normalised_tool_name in SCRIPT_TOOLS:
+        cmd, timeout_seconds = build_script_command(SCRIPT_TOOLS[normalised_tool_name], request_payload)
+        events = iter_external_tool_events(normalised_tool_name, cmd, timeout_seconds)
+    else:
+        return None
+
+    def generate():
+        for event_type, payload in events:
+            yield format_stream_event(stream_format, event_type, payload)
+
+    mimetype = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return Response(generate(), mimetype=mimetype, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 app = Flask(__name__)
 
 # Detailed request/response logging with timing
@@ -845,6 +1213,11 @@ def run_tool():
         return jsonify({"error": "tool is required"}), 400
 
     try:
+        stream_format = resolve_stream_format(payload)
+        if stream_format:
+            streamed = stream_tool_payload(payload, requested_tool_name, stream_format)
+            if streamed is not None:
+                return streamed
         result_payload, status_code = dispatch_tool_payload(payload, requested_tool_name)
     except ValueError as exc:
         logger.warning("Validation error while dispatching tool", exc_info=exc)
@@ -853,6 +1226,8 @@ def run_tool():
         logger.exception("Unexpected dispatch error", exc_info=exc)
         return jsonify({"status": "error", "error": {"type": exc.__class__.__name__, "message": str(exc)}}), 500
 
+    if isinstance(result_payload, dict) and result_payload.get("content_stream") is not None:
+        return send_content_stream(result_payload)
     return jsonify(result_payload), status_code
 
 
@@ -922,7 +1297,7 @@ def run_file_tool():
         "resolved_tool": resolve_requested_tool_name(requested_tool_name),
         "job_id": job_id,
         "input": {"filename": safe_name, "path": input_path},
-        "result": tool_result,
+        "result": encode_content_stream(tool_result),
         "artifacts": artifacts,
     }
     return jsonify(response_payload), status_code
@@ -998,26 +1373,73 @@ def handle_multipart_audio_split(endpoint_label):
     except ValueError as exc:
         return jsonify({"error": "ValidationError", "message": str(exc)}), 400
 
+    try:
+        stream_format = resolve_stream_format(request.form)
+    except ValueError as exc:
+        return jsonify({"error": "ValidationError", "message": str(exc)}), 400
+
     # Log split parameters so n8n execution traces remain auditable.
     logger.info(
-        "Split request accepted: endpoint=%s, recording_id=%s, mode=%s, chunk_length=%s, enhance=%s, enhance_speech=%s",
+        "Split request accepted: endpoint=%s, recording_id=%s, mode=%s, chunk_length=%s, enhance=%s, enhance_speech=%s, stream=%s",
         endpoint_label,
         recording_id,
         mode,
         chunk_length,
         split_options["enhance"],
         split_options["enhance_speech"],
+        stream_format,
     )
 
-    # Persist uploaded file into shared ingest directory.
-    os.makedirs(SHARED_AUDIO_IN_DIR, exist_ok=True)
+    # Persist uploaded file into shared ingest directory, hashing it on the way.
     ingest_filename = f"{recording_id}-{original_filename}"
     ingest_path = os.path.join(SHARED_AUDIO_IN_DIR, ingest_filename)
-    audio_file.save(ingest_path)
-    logger.info(f"Stored multipart upload at: {ingest_path}")
+    tmp_upload_path, upload_sha256 = store_upload_hashed(audio_file, SHARED_AUDIO_IN_DIR)
+    ingest_record = load_ingest_record(upload_sha256)
+    ingest_storage = commit_ingest_file(tmp_upload_path, ingest_path, ingest_record)
+    logger.info(f"Stored multipart upload at: {ingest_path} (sha256={upload_sha256}, storage={ingest_storage})")
+
+    # Re-uploads with identical content and split options reuse the prior job.
+    options_key = split_options_key(mode, chunk_length, split_options)
+    existing_job = find_deduplicated_job(ingest_record, options_key)
+    if existing_job:
+        logger.info(f"Deduplicated upload {upload_sha256}: reusing split job {existing_job[0]}")
+    ingest_info = {
+        "filename": ingest_filename,
+        "path": ingest_path,
+        "sha256": upload_sha256,
+        "storage": ingest_storage,
+    }
+
+    if stream_format:
+        return stream_multipart_audio_split(
+            endpoint_label,
+            stream_format,
+            recording_id=recording_id,
+            ingest_meta=ingest_meta,
+            ingest_info=ingest_info,
+            mode=mode,
+            chunk_length=chunk_length,
+            split_options=split_options,
+            options_key=options_key,
+            existing_job=existing_job,
+        )
+
+    host_base = request.host_url.rstrip("/")
+    if existing_job:
+        job_id, output_dir, chunk_files = existing_job
+        return jsonify(
+            {
+                "recordingId": recording_id,
+                "jobId": job_id,
+                "deduplicated": True,
+                "ingest": ingest_info,
+                "meta": ingest_meta,
+                "chunks": build_chunk_manifest(host_base, job_id, output_dir, chunk_files),
+            }
+        ), 200
 
     try:
-        job_id, output_dir, chunk_files = execute_audio_split(ingest_path, mode, chunk_length, split_options)
+        job_id, output_dir, chunk_files = execute_audio_split(ingest_path, mode, chunk_length, split_options, upload_sha256)
     except subprocess.TimeoutExpired as exc:
         return jsonify({"error": "TimeoutError", "message": "Audio split timed out", "detail": str(exc)}), 504
     except subprocess.CalledProcessError as exc:
@@ -1035,23 +1457,107 @@ def handle_multipart_audio_split(endpoint_label):
     except RuntimeError as exc:
         return jsonify({"error": "SplitFailed", "message": str(exc)}), 500
 
-    host_base = request.host_url.rstrip("/")
+    register_ingest_job(upload_sha256, ingest_path, options_key, job_id)
     chunks = build_chunk_manifest(host_base, job_id, output_dir, chunk_files)
 
     return jsonify(
         {
             "recordingId": recording_id,
             "jobId": job_id,
-            "ingest": {
-                "filename": ingest_filename,
-                "path": ingest_path,
-            },
+            "deduplicated": False,
+            "ingest": ingest_info,
             "meta": ingest_meta,
             "chunks": chunks,
         }
     ), 200
 
 
+def stream_multipart_audio_split(
+    endpoint_label,
+    stream_format,
+    *,
+    recording_id,
+    ingest_meta,
+    ingest_info,
+    mode,
+    chunk_length,
+    split_options,
+    options_key,
+    existing_job=None,
+):
+    """Stream the chunk manifest while the split script is still encoding.
+
+    Emits a ``job`` event first, one ``chunk`` event per finalized chunk, and a
+    closing ``done`` or ``error`` event. HTTP status is always 200 once the
+    stream has started, so clients must inspect the final event. Deduplicated
+    uploads replay the existing job's chunks immediately.
+    """
+    host_base = request.host_url.rstrip("/")
+    if existing_job:
+        job_id, output_dir, chunk_files = existing_job
+    else:
+        job_id, output_dir = prepare_split_job()
+
+    def generate():
+        yield format_stream_event(
+            stream_format,
+            "job",
+            {
+                "recordingId": recording_id,
+                "jobId": job_id,
+                "deduplicated": bool(existing_job),
+                "ingest": ingest_info,
+                "meta": ingest_meta,
+            },
+        )
+        if existing_job:
+            chunks = build_chunk_manifest(host_base, job_id, output_dir, chunk_files)
+            for entry in chunks:
+                yield format_stream_event(stream_format, "chunk", {"jobId": job_id, "chunk": entry})
+            yield format_stream_event(stream_format, "done", {"jobId": job_id, "chunkCount": len(chunks)})
+            return
+
+        chunk_count = 0
+        try:
+            for record in iter_audio_split_chunks(
+                ingest_info["path"], output_dir, mode, chunk_length, split_options, ingest_info["sha256"]
+            ):
+                chunk_count += 1
+                entry = build_chunk_entry(host_base, job_id, output_dir, record["index"], record["filename"], record)
+                yield format_stream_event(stream_format, "chunk", {"jobId": job_id, "chunk": entry})
+        except subprocess.TimeoutExpired as exc:
+            logger.exception(f"Streaming split timed out for {endpoint_label}")
+            yield format_stream_event(
+                stream_format,
+                "error",
+                {"jobId": job_id, "error": "TimeoutError", "message": "Audio split timed out", "detail": str(exc)},
+            )
+            return
+        except subprocess.CalledProcessError as exc:
+            logger.exception(f"Error running streaming split script for {endpoint_label}")
+            yield format_stream_event(
+                stream_format,
+                "error",
+                {
+                    "jobId": job_id,
+                    "error": "SplitFailed",
+                    "message": "Audio split failed",
+                    "detail": {"stdout": exc.stdout, "stderr": exc.stderr},
+                },
+            )
+            return
+        except RuntimeError as exc:
+            yield format_stream_event(stream_format, "error", {"jobId": job_id, "error": "SplitFailed", "message": str(exc)})
+            return
+
+        register_ingest_job(ingest_info["sha256"], ingest_info["path"], options_key, job_id)
+        yield format_stream_event(stream_format, "done", {"jobId": job_id, "chunkCount": chunk_count})
+
+    mimetype = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    # Disable proxy buffering so each event reaches the client immediately.
+    return Response(generate(), mimetype=mimetype, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # --- N8N AUDIO SPLIT ENDPOINT ---
 @app.route("/n8n_audio_split", methods=["POST"])
 def n8n_audio_split():
@@ -1,65 +1,501 @@
 #!/usr/bin/env python3
 #==MCP==
 # {
-#   "description": "Read XLSX data into JSON via openpyxl.",
+#   "description": "Read XLSX data via openpyxl in streaming read-only mode (JSON, NDJSON, CSV or columnar JSON).",
 #   "schema": {
 #     "type": "object",
 #     "properties": {
 #       "input_path": { "type": "string" },
 #       "output_dir": { "type": "string" },
 #       "output_filename": { "type": "string" },
-#       "max_rows": { "type": "number" }
+#       "max_rows": { "type": "number", "description": "Rows per sheet for format=sheets." },
+#       "format": { "type": "string", "enum": ["sheets", "ndjson", "csv", "columns"] },
+#       "sheet": { "type": "string", "description": "Sheet name or 1-based index (default: first sheet)." },
+#       "offset": { "type": "integer", "description": "Data rows to skip after the header." },
+#       "limit": { "type": "integer", "description": "Maximum data rows to return." },
+#       "header_row": { "type": "string", "description": "auto, none or the 1-based header row number." },
+#       "no_cache": { "type": "boolean", "description": "Bypass the columnar sheet cache." }
 #     },
 #     "required": ["input_path"]
 #   }
 # }
 #==/MCP==
-"""Read XLSX workbook content and emit JSON summary."""
+"""Read XLSX workbook content and emit JSON, NDJSON, CSV or columnar JSON.
+
+The workbook is opened in openpyxl's read-only mode, so rows are streamed from
+the sheet XML instead of building the whole object model. ``ndjson``, ``csv``
+and ``columns`` read one sheet within an ``--offset``/``--limit`` window and
+write rows as they are read; the result carries ``next_offset`` for paging.
+
+Windowed reads go through a columnar on-disk cache keyed by the workbook's
+SHA-256, the sheet and the header mode: the first request parses the sheet
+once, later pages only read their own rows from memory-mapped offsets.
+"""
 
 import argparse
+import csv
+import datetime
+import hashlib
 import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from array import array
+from itertools import islice
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 
+import numpy as np
 from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+FORMATS = ("sheets", "ndjson", "csv", "columns")
+OUTPUT_SUFFIXES = {"sheets": ".json", "ndjson": ".ndjson", "csv": ".csv", "columns": ".columns.json"}
+# Header detection looks at most this far down for the first non-empty row.
+HEADER_SCAN_ROWS = 20
+# Column buffers of the columnar format stay in memory up to this size, then spill to disk.
+COLUMN_SPOOL_BYTES = 64 * 1024
+CACHE_DIR = Path(os.getenv("XLSX_CACHE_DIR", "/shared/cache/xlsx"))
+CACHE_ENABLED = os.getenv("XLSX_CACHE", "1") != "0"
+CACHE_MAX_BYTES = int(float(os.getenv("XLSX_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+CACHE_VERSION = 1
+# Path/size/mtime -> content hash records, kept next to the sheet entries.
+STAT_INDEX_DIRNAME = "stat-index"
+HASH_BLOCK_SIZE = 1024 * 1024
+# Cached windows are decoded this many rows at a time, so memory stays flat without --limit.
+CACHE_READ_ROWS = 4096
+
+
+def json_value(value):
+    """Convert a cell value into something JSON/CSV can represent."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return value
+
+
+def select_sheet(workbook, sheet: Optional[str]):
+    """Return the worksheet named ``sheet`` or at its 1-based index (default: first sheet)."""
+    if not sheet:
+        return workbook.worksheets[0]
+    if sheet in workbook.sheetnames:
+        return workbook[sheet]
+    if sheet.isdigit() and 1 <= int(sheet) <= len(workbook.worksheets):
+        return workbook.worksheets[int(sheet) - 1]
+    raise ValueError(f"Sheet not found: {sheet} (available: {', '.join(workbook.sheetnames)})")
+
+
+def _is_empty(row: tuple) -> bool:
+    return all(cell is None or cell == "" for cell in row)
+
+
+def _looks_like_header(row: tuple) -> bool:
+    labels = [cell for cell in row if cell is not None and cell != ""]
+    return bool(labels) and all(isinstance(cell, str) for cell in labels) and len(set(labels)) == len(labels)
+
+
+def _column_names(header: Optional[tuple], width: int) -> List[str]:
+    names = []
+    for index in range(width):
+        label = header[index] if header is not None and index < len(header) else None
+        name = str(label).strip() if label not in (None, "") else get_column_letter(index + 1)
+        # Keep names unique so rows stay valid objects.
+        while name in names:
+            name = f"{name}_{index + 1}"
+        names.append(name)
+    return names
+
+
+def iter_sheet_rows(worksheet, header_row: str = "auto") -> Tuple[List[str], Iterator[tuple]]:
+    """Return column names and a lazy iterator over the sheet's non-empty data rows.
+
+    ``header_row`` is ``auto`` (first non-empty row when it only holds distinct
+    text labels), ``none`` (columns named A, B, ...) or a 1-based row number.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = None
+    buffered: List[tuple] = []
+    if header_row == "auto":
+        for row in islice(rows, HEADER_SCAN_ROWS):
+            if _is_empty(row):
+                continue
+            if _looks_like_header(row):
+                header = row
+            else:
+                buffered.append(row)
+            break
+    elif header_row != "none":
+        if not header_row.isdigit() or int(header_row) < 1:
+            raise ValueError("header_row must be auto, none or a 1-based row number.")
+        header = next(islice(rows, int(header_row) - 1, None), None)
+
+    first = next((row for row in rows if not _is_empty(row)), None) if not buffered else None
+    if first is not None:
+        buffered.append(first)
+    # Read-only sheets report their used range; rows may still be shorter than it.
+    width = max([len(header or ()), worksheet.max_column or 0] + [len(row) for row in buffered])
+    columns = _column_names(header, width)
+
+    def data_rows() -> Iterator[tuple]:
+        for row in buffered:
+            yield row
+        for row in rows:
+            if not _is_empty(row):
+                yield row
+
+    return columns, data_rows()
+
+
+def _padded(row: tuple, width: int) -> list:
+    values = [json_value(cell) for cell in row[:width]]
+    return values + [None] * (width - len(values))
+
+
+def write_window(fmt: str, columns: List[str], rows: Iterator[tuple], output_path: Path) -> int:
+    """Write the row window in ``fmt`` while reading; returns the number of rows written."""
+    width = len(columns)
+    written = 0
+    with output_path.open("w", encoding="utf-8", newline="") as handle:
+        if fmt == "ndjson":
+            for row in rows:
+                handle.write(json.dumps(dict(zip(columns, _padded(row, width))), ensure_ascii=False, default=str))
+                handle.write("\n")
+                written += 1
+        elif fmt == "csv":
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(["" if value is None else value for value in _padded(row, width)])
+                written += 1
+        else:
+            # One spooled buffer per column keeps memory flat however long the window is.
+            buffers = [tempfile.SpooledTemporaryFile(COLUMN_SPOOL_BYTES, mode="w+", encoding="utf-8") for _ in columns]
+            try:
+                for row in rows:
+                    for buffer, value in zip(buffers, _padded(row, width)):
+                        buffer.write(("," if written else "") + json.dumps(value, ensure_ascii=False, default=str))
+                    written += 1
+                handle.write('{"columns": ' + json.dumps(columns, ensure_ascii=False) + ', "data": {')
+                for index, (name, buffer) in enumerate(zip(columns, buffers)):
+                    handle.write(("," if index else "") + json.dumps(name, ensure_ascii=False) + ": [")
+                    buffer.seek(0)
+                    shutil.copyfileobj(buffer, handle)
+                    handle.write("]")
+                handle.write("}}")
+            finally:
+                for buffer in buffers:
+                    buffer.close()
+    return written
+
+
+def open_workbook(input_path: Path):
+    """Open a workbook for streaming reads."""
+    return load_workbook(str(input_path), read_only=True, data_only=True)
+
+
+def _window_summary(sheet: str, columns: List[str], offset: int, written: int, has_more: bool) -> dict:
+    return {
+        "sheet": sheet,
+        "columns": columns,
+        "offset": offset,
+        "row_count": written,
+        "has_more": has_more,
+        "next_offset": offset + written if has_more else None,
+    }
+
+
+def read_window(input_path: Path, args: argparse.Namespace, output_path: Path) -> dict:
+    """Stream one sheet's ``offset``/``limit`` window straight from the workbook into ``output_path``."""
+    workbook = open_workbook(input_path)
+    try:
+        worksheet = select_sheet(workbook, args.sheet)
+        columns, rows = iter_sheet_rows(worksheet, args.header_row)
+        offset = max(args.offset, 0)
+        rows = islice(rows, offset, None)
+        if args.limit is not None:
+            written = write_window(args.format, columns, islice(rows, max(args.limit, 0)), output_path)
+            has_more = next(rows, None) is not None
+        else:
+            written = write_window(args.format, columns, rows, output_path)
+            has_more = False
+        return _window_summary(worksheet.title, columns, offset, written, has_more)
+    finally:
+        workbook.close()
+
+
+def hash_file(path: Path) -> str:
+    """Return the SHA-256 of a file, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def workbook_digest(path: Path) -> str:
+    """Return the workbook SHA-256, reusing the hash recorded for an unchanged file.
+
+    A small index keyed by resolved path, size and mtime maps to the content
+    hash, so paging through a cached workbook does not re-read the whole file;
+    it is only hashed again when that key misses.
+    """
+    stat = path.stat()
+    stat_key = json.dumps([str(path.resolve()), stat.st_size, stat.st_mtime_ns])
+    index_path = CACHE_DIR / STAT_INDEX_DIRNAME / f"{hashlib.sha256(stat_key.encode('utf-8')).hexdigest()}.json"
+    try:
+        return json.loads(index_path.read_text(encoding="utf-8"))["sha256"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    workbook_sha256 = hash_file(path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps({"path": str(path.resolve()), "sha256": workbook_sha256}), encoding="utf-8")
+    os.replace(temp_path, index_path)
+    return workbook_sha256
+
+
+def cache_entry_dir(workbook_sha256: str, sheet: Optional[str], header_row: str) -> Path:
+    """Map workbook hash, requested sheet and header mode to a cache directory."""
+    key_source = json.dumps([CACHE_VERSION, workbook_sha256, sheet or "", header_row])
+    return CACHE_DIR / hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def build_sheet_cache(input_path: Path, workbook_sha256: str, args: argparse.Namespace, entry_dir: Path) -> dict:
+    """Parse the sheet once and store it column by column.
+
+    Every column gets ``c<i>.data`` (JSON-encoded cells back to back) and
+    ``c<i>.offsets.npy`` (int64 byte offsets, one more than rows), so any row
+    window can be read with one slice per column. Purely numeric columns also
+    get ``c<i>.values.npy`` (float64, NaN for empty cells) for direct analysis.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    build_dir = Path(tempfile.mkdtemp(dir=CACHE_DIR, prefix=".build-"))
+    workbook = open_workbook(input_path)
+    try:
+        worksheet = select_sheet(workbook, args.sheet)
+        columns, rows = iter_sheet_rows(worksheet, args.header_row)
+        width = len(columns)
+        blobs = [(build_dir / f"c{index}.data").open("wb") for index in range(width)]
+        offsets = [array("q", [0]) for _ in range(width)]
+        numbers: List[Optional[array]] = [array("d") for _ in range(width)]
+        row_count = 0
+        try:
+            for row in rows:
+                for index, value in enumerate(_padded(row, width)):
+                    encoded = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+                    blobs[index].write(encoded)
+                    offsets[index].append(offsets[index][-1] + len(encoded))
+                    column_numbers = numbers[index]
+                    if column_numbers is None:
+                        continue
+                    if value is None:
+                        column_numbers.append(math.nan)
+                    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                        column_numbers.append(value)
+                    else:
+                        numbers[index] = None
+                row_count += 1
+        finally:
+            for blob in blobs:
+                blob.close()
+        sheet_title = worksheet.title
+    finally:
+        workbook.close()
+
+    numeric = []
+    for index in range(width):
+        np.save(build_dir / f"c{index}.offsets.npy", np.frombuffer(offsets[index], dtype=np.int64))
+        if numbers[index] is not None and row_count:
+            np.save(build_dir / f"c{index}.values.npy", np.frombuffer(numbers[index], dtype=np.float64))
+            numeric.append(columns[index])
+    meta = {
+        "version": CACHE_VERSION,
+        "workbook_sha256": workbook_sha256,
+        "sheet": sheet_title,
+        "columns": columns,
+        "numeric_columns": numeric,
+        "row_count": row_count,
+        "created_at": time.time(),
+    }
+    (build_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    try:
+        os.replace(build_dir, entry_dir)
+    except OSError:
+        # A concurrent request stored the same sheet first; keep that entry.
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return meta
+
+
+def discard_cache_entry(entry_dir: Path) -> None:
+    """Remove a cache entry by renaming it out of the way first.
+
+    The rename is atomic, so other requests either find the whole entry or
+    none; readers that already opened its files keep reading them.
+    """
+    trash_dir = entry_dir.with_name(f".discard-{entry_dir.name}-{os.getpid()}")
+    try:
+        os.replace(entry_dir, trash_dir)
+    except OSError:
+        return
+    shutil.rmtree(trash_dir, ignore_errors=True)
+
+
+def open_cache_entry(entry_dir: Path, width: int) -> Tuple[list, list]:
+    """Open every column of an entry up front, so a later eviction cannot pull files away mid-read."""
+    offsets = [np.load(entry_dir / f"c{index}.offsets.npy", mmap_mode="r") for index in range(width)]
+    blobs = []
+    try:
+        for index in range(width):
+            blobs.append((entry_dir / f"c{index}.data").open("rb"))
+    except OSError:
+        for blob in blobs:
+            blob.close()
+        raise
+    return offsets, blobs
+
+
+def iter_cached_rows(offsets: list, blobs: list, start: int, stop: int) -> Iterator[list]:
+    """Yield rows ``start``..``stop`` from opened cache columns, reading only those byte ranges.
+
+    Rows are decoded in blocks of ``CACHE_READ_ROWS``, so an unbounded window
+    holds one block per column in memory rather than the whole sheet.
+    """
+    for block_start in range(start, stop, CACHE_READ_ROWS):
+        block_stop = min(block_start + CACHE_READ_ROWS, stop)
+        column_values = []
+        for column_offsets, blob in zip(offsets, blobs):
+            bounds = column_offsets[block_start : block_stop + 1]
+            first, last = int(bounds[0]), int(bounds[-1])
+            blob.seek(first)
+            chunk = blob.read(last - first)
+            bounds = (bounds - first).tolist()
+            column_values.append([json.loads(chunk[bounds[row] : bounds[row + 1]]) for row in range(block_stop - block_start)])
+        yield from (list(row) for row in zip(*column_values))
+
+
+def evict_xlsx_cache(max_bytes: int, keep: Optional[Path] = None) -> None:
+    """Delete least recently used sheet entries until the cache fits max_bytes.
+
+    ``keep`` (the entry the current request is about to read) is never evicted,
+    even when it alone exceeds the limit.
+    """
+    entries = []
+    for meta_path in CACHE_DIR.glob("*/meta.json"):
+        if meta_path.parent.name.startswith(".") or meta_path.parent == keep:
+            continue  # in-progress builds, discarded entries and the entry in use
+        try:
+            used = meta_path.stat().st_mtime
+            size = sum(path.stat().st_size for path in meta_path.parent.iterdir())
+        except FileNotFoundError:
+            continue
+        entries.append((used, size, meta_path.parent))
+
+    total = sum(size for _, size, _ in entries)
+    if keep is not None:
+        try:
+            total += sum(path.stat().st_size for path in keep.iterdir())
+        except FileNotFoundError:
+            pass
+    for _, size, entry_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        discard_cache_entry(entry_dir)
+        total -= size
+
+
+def read_window_cached(input_path: Path, args: argparse.Namespace, output_path: Path) -> dict:
+    """Serve the window from the columnar sheet cache, parsing the workbook only on a miss."""
+    workbook_sha256 = workbook_digest(input_path)
+    entry_dir = cache_entry_dir(workbook_sha256, args.sheet, args.header_row)
+    meta_path = entry_dir / "meta.json"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        os.utime(meta_path)
+        cached = meta.get("workbook_sha256") == workbook_sha256 and meta.get("version") == CACHE_VERSION
+    except (OSError, json.JSONDecodeError):
+        cached = False
+    if not cached:
+        # Entries only appear complete via rename, so an existing one without valid meta is a broken leftover.
+        if entry_dir.exists():
+            discard_cache_entry(entry_dir)
+        meta = build_sheet_cache(input_path, workbook_sha256, args, entry_dir)
+        evict_xlsx_cache(CACHE_MAX_BYTES, keep=entry_dir)
+
+    offset = max(args.offset, 0)
+    stop = meta["row_count"] if args.limit is None else min(meta["row_count"], offset + max(args.limit, 0))
+    try:
+        offsets, blobs = open_cache_entry(entry_dir, len(meta["columns"]))
+    except FileNotFoundError:
+        # Evicted by a concurrent request between lookup and read: serve it from the workbook.
+        return read_window(input_path, args, output_path)
+    try:
+        rows = iter_cached_rows(offsets, blobs, offset, stop)
+        written = write_window(args.format, meta["columns"], rows, output_path)
+    finally:
+        for blob in blobs:
+            blob.close()
+    summary = _window_summary(meta["sheet"], meta["columns"], offset, written, offset + written < meta["row_count"])
+    summary.update(cached=cached, total_rows=meta["row_count"])
+    return summary
+
+
+def read_sheets(workbook, max_rows: int, output_path: Path) -> dict:
+    """Export the first ``max_rows`` rows of every sheet as one ``{sheet: rows}`` JSON object."""
+    data = {}
+    # Keep sheet extraction bounded to avoid runaway payload size.
+    for sheet in workbook.worksheets:
+        rows = sheet.iter_rows(values_only=True)
+        data[sheet.title] = [[json_value(cell) for cell in row] for row in islice(rows, max(max_rows, 1))]
+    output_path.write_text(json.dumps(data, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    return {"sheet_count": len(data)}
 
 
 def main() -> int:
-    """Read workbook sheets and export a bounded JSON snapshot."""
+    """Read workbook sheets and export them in the requested format."""
     parser = argparse.ArgumentParser(description="Read XLSX workbook.")
     parser.add_argument("--input-path", required=True, help="Path to .xlsx file.")
     parser.add_argument("--output-dir", default="/shared/artifacts", help="Artifact output directory.")
-    parser.add_argument("--output-filename", help="Optional output JSON filename.")
-    parser.add_argument("--max-rows", type=int, default=200, help="Maximum rows per sheet.")
+    parser.add_argument("--output-filename", help="Optional output filename.")
+    parser.add_argument("--max-rows", type=int, default=200, help="Maximum rows per sheet (format=sheets).")
+    parser.add_argument("--format", choices=FORMATS, default="sheets", help="Output format.")
+    parser.add_argument("--sheet", help="Sheet name or 1-based index (default: first sheet).")
+    parser.add_argument("--offset", type=int, default=0, help="Data rows to skip after the header.")
+    parser.add_argument("--limit", type=int, help="Maximum data rows to return.")
+    parser.add_argument("--header-row", default="auto", help="auto, none or the 1-based header row number.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the columnar sheet cache.")
     args = parser.parse_args()
+    args.no_cache = args.no_cache or not CACHE_ENABLED
 
     input_path = Path(args.input_path)
     if not input_path.is_file():
         print(json.dumps({"status": "error", "error": f"Input XLSX not found: {input_path}"}))
         return 1
 
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_name = args.output_filename or f"{input_path.stem}{OUTPUT_SUFFIXES[args.format]}"
+    output_path = output_dir / output_name
+
     try:
-        workbook = load_workbook(str(input_path), data_only=True)
+        if args.format == "sheets":
+            workbook = open_workbook(input_path)
+            try:
+                summary = read_sheets(workbook, args.max_rows, output_path)
+            finally:
+                workbook.close()
+        elif args.no_cache:
+            summary = read_window(input_path, args, output_path)
+        else:
+            summary = read_window_cached(input_path, args, output_path)
     except Exception as exc:  # noqa: BLE001
         print(json.dumps({"status": "error", "error": str(exc)}))
         return 1
 
-    data = {}
-    # Keep sheet extraction bounded to avoid runaway payload size.
-    for sheet in workbook.worksheets:
-        rows = []
-        for index, row in enumerate(sheet.iter_rows(values_only=True), start=1):
-            if index > max(args.max_rows, 1):
-                break
-            rows.append(list(row))
-        data[sheet.title] = rows
-
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_name = args.output_filename or f"{input_path.stem}.json"
-    output_path = output_dir / output_name
-    output_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    print(json.dumps({"status": "ok", "output_file": str(output_path), "sheet_count": len(data)}))
+    print(json.dumps({"status": "ok", "output_file": str(output_path), "format": args.format, **summary}))
     return 0
 
 
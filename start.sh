@@ -109,6 +109,16 @@ if [[ -f "$TOOLHUB_PROJECT_ROOT/conf/.bashrc" ]]; then
   ln -sf "$TOOLHUB_PROJECT_ROOT/conf/.bashrc" "$TOOLHUB_PROJECT_ROOT/.bashrc" || exit 1
 fi
 
+# Launch resident transcription worker when enabled (auto: only if the whisper package is installed).
+: "${TRANSCRIPT_WORKER:=auto}"
+: "${TOOLHUB_PYTHON_ROOT:=/opt/toolhub}"
+if [[ "$TRANSCRIPT_WORKER" == "1" || ( "$TRANSCRIPT_WORKER" == "auto" && -n "$(python3 -c 'import whisper; print(1)' 2>/dev/null)" ) ]]; then
+  echo "[INIT] Starting transcript worker as $TOOLHUB_USER..."
+  su "$TOOLHUB_USER" -c "cd '$TOOLHUB_PYTHON_ROOT' && exec python3 -m tools.transcript_worker" &
+else
+  echo "[INIT] Transcript worker disabled (TRANSCRIPT_WORKER=$TRANSCRIPT_WORKER)"
+fi
+
 # Launch webhook service with Gunicorn as runtime user.
 echo "[INIT] Launching webhook service with Gunicorn as $TOOLHUB_USER..."
 exec su "$TOOLHUB_USER" -c "cd /scripts && exec gunicorn --timeout 600 --bind 0.0.0.0:5656 webhook:app"
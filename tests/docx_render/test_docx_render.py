@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import base64
+import importlib
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from docx import Document
+from docx.oxml import parse_xml
+
+import tools.docx_render as docx_render_module
+
+TEXT_BOX_RUN = (
+    '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:v="urn:schemas-microsoft-com:vml">'
+    "<w:pict><v:shape><v:textbox><w:txbxContent>"
+    "<w:p><w:r><w:t>Box {{CITY}}</w:t></w:r></w:p>"
+    "</w:txbxContent></v:textbox></v:shape></w:pict></w:r>"
+)
+
+
+class DocxRenderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.templates = self.root / "templates"
+        self.output = self.root / "output"
+        self.templates.mkdir()
+
+        os.environ["DOCX_TEMPLATES_DIR"] = str(self.templates)
+        os.environ["DOCX_OUTPUT_DIR"] = str(self.output)
+        os.environ["DOCX_RENDER_LOG"] = str(self.root / "docx-render.log")
+
+        # Reload to pick up environment-based directories.
+        self.module = importlib.reload(docx_render_module)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _render(self, doc: Document, data: dict) -> Document:
+        doc.save(self.templates / "template.docx")
+        result = self.module.handler({"template": "template.docx", "output_name": "out.docx", "data": data})
+        self.assertEqual(result["status"], "ok", msg=result)
+        return Document(result["output_path"])
+
+    def test_replaces_body_tables_nested_tables_headers_and_footers(self) -> None:
+        doc = Document()
+        doc.add_paragraph("Hello {{NAME}}, {{NAME}} again; {{UNKNOWN}} stays")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "City: {{CITY}}"
+        nested = table.cell(0, 1).add_table(rows=1, cols=1)
+        nested.cell(0, 0).text = "Nested {{CITY}}"
+        doc.sections[0].header.paragraphs[0].text = "Header {{NAME}}"
+        doc.sections[0].footer.paragraphs[0].text = "Footer {{CITY}}"
+
+        rendered = self._render(doc, {"NAME": "Alice", "CITY": "Berlin"})
+
+        self.assertEqual(rendered.paragraphs[0].text, "Hello Alice, Alice again; {{UNKNOWN}} stays")
+        outer = rendered.tables[0].rows[0].cells
+        self.assertEqual(outer[0].text, "City: Berlin")
+        self.assertEqual(outer[1].tables[0].cell(0, 0).text, "Nested Berlin")
+        self.assertEqual(rendered.sections[0].header.paragraphs[0].text, "Header Alice")
+        self.assertEqual(rendered.sections[0].footer.paragraphs[0].text, "Footer Berlin")
+
+    def test_counts_replacements_per_key(self) -> None:
+        doc = Document()
+        doc.add_paragraph("{{A}} {{A}} {{B}}")
+        counts = self.module.replace_placeholders(doc, {"A": "1", "B": "2", "C": "3"})
+        self.assertEqual(counts, {"A": 2, "B": 1, "C": 0})
+        self.assertEqual(doc.paragraphs[0].text, "1 1 2")
+
+    def test_placeholder_split_across_runs_is_replaced(self) -> None:
+        doc = Document()
+        paragraph = doc.add_paragraph("Dear ")
+        paragraph.add_run("{{NA")
+        paragraph.add_run("ME}}!")
+        rendered = self._render(doc, {"NAME": "Bob"})
+        self.assertEqual(rendered.paragraphs[0].text, "Dear Bob!")
+
+    def test_values_with_placeholder_syntax_are_not_substituted_again(self) -> None:
+        doc = Document()
+        paragraph = doc.add_paragraph("Hi ")
+        paragraph.add_run("{{A}}")
+        paragraph.add_run(" and more")
+        doc.add_paragraph("Hi {{A}} and more")
+
+        counts = self.module.replace_placeholders(doc, {"A": "{{B}}", "B": "secret"})
+
+        self.assertEqual([p.text for p in doc.paragraphs], ["Hi {{B}} and more", "Hi {{B}} and more"])
+        self.assertEqual(counts, {"A": 2, "B": 0})
+
+    def test_split_placeholders_keep_run_formatting(self) -> None:
+        doc = Document()
+        paragraph = doc.add_paragraph("Dear ")
+        paragraph.add_run("{{NA").bold = True
+        paragraph.add_run("ME}}, from {{CI").italic = True
+        paragraph.add_run("TY}}.")
+        paragraph._p.append(parse_xml(TEXT_BOX_RUN))
+
+        rendered = self._render(doc, {"NAME": "Bob", "CITY": "Köln"})
+
+        runs = rendered.paragraphs[0].runs
+        self.assertEqual([run.text for run in runs[:4]], ["Dear ", "Bob", ", from Köln", "."])
+        self.assertTrue(runs[1].bold)
+        self.assertTrue(runs[2].italic)
+        self.assertFalse(runs[3].italic)
+        box_texts = [node.text for node in rendered.paragraphs[0]._p.iter(self.module.W_T)]
+        self.assertIn("Box Köln", box_texts)
+
+    def test_inline_and_stream_return_skip_output_directory(self) -> None:
+        doc = Document()
+        doc.add_paragraph("Hi {{NAME}}")
+        doc.save(self.templates / "template.docx")
+
+        inline = self.module.handler({"template": "template.docx", "output_name": "hi.docx", "data": {"NAME": "Eve"}, "return": "inline"})
+        streamed = self.module.handler({"template": "template.docx", "data": {"NAME": "Eve"}, "return": "stream"})
+
+        self.assertEqual(inline["status"], "ok", msg=inline)
+        self.assertEqual(inline["filename"], "hi.docx")
+        self.assertNotIn("output_path", inline)
+        inline_doc = Document(io.BytesIO(base64.b64decode(inline["content_base64"])))
+        self.assertEqual(inline_doc.paragraphs[0].text, "Hi Eve")
+        self.assertEqual(streamed["size_bytes"], len(streamed["content_stream"].getvalue()))
+        self.assertFalse(self.output.exists())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
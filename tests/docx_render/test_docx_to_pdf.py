@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import importlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from docx import Document
+
+import tools.docx_render as docx_render_module
+import tools.docx_to_pdf as docx_to_pdf_module
+
+# Stand-in for soffice that records each invocation and writes <stem>.pdf per input.
+FAKE_SOFFICE = """#!/bin/bash
+set -euo pipefail
+echo "$*" >> "$CALLS_FILE"
+OUTDIR=""
+INPUTS=()
+while [[ $# -gt 0 ]]; do
+  case "$1" in
+    --outdir) OUTDIR="$2"; shift 2;;
+    --convert-to) shift 2;;
+    -*) shift;;
+    *) INPUTS+=("$1"); shift;;
+  esac
+done
+for input in "${INPUTS[@]}"; do
+  name="$(basename "$input")"
+  [[ "$name" == broken* ]] && continue
+  printf '%%PDF-1.4 fake' > "$OUTDIR/${name%.*}.pdf"
+done
+"""
+
+
+class DocxToPdfTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.templates_tempdir = tempfile.TemporaryDirectory()
+        self.templates = Path(self.templates_tempdir.name)
+        self.calls_file = self.root / "calls.txt"
+        fake = self.root / "soffice"
+        fake.write_text(FAKE_SOFFICE, encoding="utf-8")
+        fake.chmod(0o755)
+
+        os.environ.update(
+            DOCX_PDF_BACKEND="soffice",
+            DOCX_PDF_POOL_SIZE="2",
+            DOCX_PDF_SOFFICE=str(fake),
+            DOCX_PDF_PROFILE_ROOT=str(self.root / "profiles"),
+            CALLS_FILE=str(self.calls_file),
+            DOCX_OUTPUT_DIR=str(self.root),
+            DOCX_TEMPLATES_DIR=str(self.templates),
+        )
+        # Reload to pick up environment-based converter settings and reset the shared pool.
+        self.module = importlib.reload(docx_to_pdf_module)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        self.templates_tempdir.cleanup()
+
+    def _calls(self) -> list[str]:
+        return self.calls_file.read_text(encoding="utf-8").splitlines() if self.calls_file.exists() else []
+
+    def test_batch_is_split_across_pool_slots_in_input_order(self) -> None:
+        inputs = []
+        for name in ("a", "b", "broken", "c"):
+            path = self.root / "docs" / f"{name}.docx"
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"docx")
+            inputs.append(str(path))
+
+        result = self.module.handler({"inputs": inputs, "output_dir": str(self.root / "pdf")})
+
+        self.assertEqual(result["backend"], "soffice")
+        self.assertEqual((result["converted"], result["failed"]), (3, 1))
+        self.assertEqual([item["input"] for item in result["results"]], inputs)
+        self.assertEqual(result["results"][2]["status"], "error")
+        self.assertTrue((self.root / "pdf" / "c.pdf").is_file())
+        # Two slots: each converts its share of the batch in one soffice run with its own profile.
+        calls = self._calls()
+        self.assertEqual(len(calls), 2)
+        self.assertIn("slot-0", calls[0] + calls[1])
+        self.assertIn("slot-1", calls[0] + calls[1])
+
+    def test_results_follow_input_order_across_output_directories(self) -> None:
+        inputs = []
+        for folder, name in (("x", "a"), ("y", "b"), ("x", "c")):
+            path = self.root / folder / f"{name}.docx"
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(b"docx")
+            inputs.append(str(path))
+        pool = self.module.ConverterPool(size=1, backend="soffice")
+        self.addCleanup(pool.close)
+
+        results = pool.convert(inputs)
+
+        self.assertEqual([item["input"] for item in results], inputs)
+        self.assertEqual([Path(item["output_file"]).name for item in results], ["a.pdf", "b.pdf", "c.pdf"])
+
+    def test_inputs_with_the_same_target_pdf_are_rejected(self) -> None:
+        for folder in ("x", "y"):
+            (self.root / folder).mkdir()
+            (self.root / folder / "letter.docx").write_bytes(b"docx")
+
+        for payload in (
+            {"inputs": ["x/letter.docx", "x/letter.docx"]},
+            {"inputs": ["x/letter.docx", "y/letter.docx"], "output_dir": "pdf"},
+        ):
+            with self.subTest(payload=payload):
+                result = self.module.handler(payload)
+                self.assertEqual(result["status"], "error")
+                self.assertIn("would both be converted to", result["error"]["message"])
+        self.assertEqual(self._calls(), [])
+
+    def test_pools_in_parallel_claim_distinct_slots(self) -> None:
+        first = self.module.ConverterPool(size=2, backend="soffice")
+        self.addCleanup(first.close)
+        second = self.module.ConverterPool(size=2, backend="soffice")
+        self.addCleanup(second.close)
+
+        self.assertEqual([slot.index for slot in first.slots], [0, 1])
+        self.assertEqual([slot.index for slot in second.slots], [2, 3])
+        self.assertEqual(len({slot.port for slot in first.slots + second.slots}), 4)
+
+        first.close()
+        third = self.module.ConverterPool(size=1, backend="soffice")
+        self.addCleanup(third.close)
+        self.assertEqual(third.slots[0].profile_dir.name, "slot-0")
+
+    def test_paths_outside_docx_roots_are_rejected(self) -> None:
+        (self.root / "a.docx").write_bytes(b"docx")
+        outside = tempfile.TemporaryDirectory()
+        self.addCleanup(outside.cleanup)
+        foreign = Path(outside.name) / "foreign.docx"
+        foreign.write_bytes(b"docx")
+
+        for payload in (
+            {"input": str(foreign)},
+            {"input": "../../etc/hosts"},
+            {"input": str(self.root / "a.docx"), "output_dir": outside.name},
+        ):
+            with self.subTest(payload=payload):
+                result = self.module.handler(payload)
+                self.assertEqual(result["status"], "error")
+                self.assertIn("must be located inside", result["error"]["message"])
+        self.assertEqual(self._calls(), [])
+
+    def test_template_inputs_are_converted_into_output_root(self) -> None:
+        template = self.templates / "letter.docx"
+        template.write_bytes(b"docx")
+
+        result = self.module.handler({"input": str(template)})
+
+        self.assertEqual(result["status"], "ok", msg=result)
+        self.assertEqual(result["results"][0]["output_file"], str(self.root / "letter.pdf"))
+        self.assertFalse((template.parent / "letter.pdf").exists())
+
+    def test_docx_render_also_pdf(self) -> None:
+        templates = self.root / "templates"
+        templates.mkdir()
+        doc = Document()
+        doc.add_paragraph("Hi {{NAME}}")
+        doc.save(templates / "letter.docx")
+        os.environ.update(
+            DOCX_TEMPLATES_DIR=str(templates),
+            DOCX_OUTPUT_DIR=str(self.root / "output"),
+            DOCX_RENDER_LOG=str(self.root / "docx-render.log"),
+        )
+        render = importlib.reload(docx_render_module)
+
+        result = render.handler({"template": "letter.docx", "output_name": "letter.docx", "data": {"NAME": "Kim"}, "also_pdf": True})
+
+        self.assertEqual(result["status"], "ok", msg=result)
+        self.assertEqual(result["pdf_path"], str(self.root / "output" / "letter.pdf"))
+        self.assertTrue(Path(result["pdf_path"]).is_file())
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import base64
+import contextlib
 import importlib
+import io
+import json
 import os
 import tempfile
 import unittest
+import zipfile
 from pathlib import Path
 
 from docx import Document
 
+import mcp_tools.docx_template_fill.batch as batch_module
 import mcp_tools.docx_template_fill.renderer as renderer_module
 import mcp_tools.docx_template_fill.tool as tool_module
 
@@ -22,9 +28,11 @@ class DocxTemplateFillTests(unittest.TestCase):
 
         os.environ["DOCX_TEMPLATE_ROOT"] = str(self.template_root)
         os.environ["DOCX_OUTPUT_ROOT"] = str(self.output_root)
+        os.environ["DOCX_ROWS_ROOT"] = self.tempdir.name
 
         # Reload modules to pick up new environment-based roots.
         self.renderer = importlib.reload(renderer_module)
+        self.batch = importlib.reload(batch_module)
         self.tool = importlib.reload(tool_module)
 
     def tearDown(self) -> None:
@@ -136,6 +144,134 @@ class DocxTemplateFillTests(unittest.TestCase):
         self.assertIn("ROLE", result["placeholders_missing"])
         self.assertTrue(Path(result["output_file"]).exists())
 
+    def test_template_cache_reused_and_invalidated_on_change(self) -> None:
+        template_path = self._write_template("cached.docx", ["Hello {{NAME}}"])
+        for index in range(2):
+            self.tool.fill_docx_template(
+                {"template": "cached.docx", "data": {"NAME": "Bob"}, "output_filename": f"out{index}.docx"}
+            )
+        self.assertEqual((self.renderer.TEMPLATE_CACHE.misses, self.renderer.TEMPLATE_CACHE.hits), (1, 1))
+
+        self._write_template("cached.docx", ["Hello {{NAME}}", "Team {{TEAM}}"])
+        os.utime(template_path, ns=(1_000_000_000, 1_000_000_000))
+        result = self.tool.fill_docx_template(
+            {"template": "cached.docx", "data": {"NAME": "Bob"}, "output_filename": "out2.docx"}
+        )
+        self.assertEqual(self.renderer.TEMPLATE_CACHE.misses, 2)
+        self.assertEqual(result["placeholders_missing"], ["TEAM"])
+        self.assertEqual(self._read_paragraphs(Path(result["output_file"])), ["Hello Bob", "Team "])
+
+    def test_inline_return_renders_in_memory(self) -> None:
+        self._write_template("example.docx", ["Hello {{NAME}}"])
+        result = self.tool.fill_docx_template({"template": "example.docx", "data": {"NAME": "Ann"}, "return": "inline"})
+
+        self.assertEqual(result["filename"], "example.docx")
+        self.assertNotIn("output_file", result)
+        doc = Document(io.BytesIO(base64.b64decode(result["content_base64"])))
+        self.assertEqual([p.text for p in doc.paragraphs], ["Hello Ann"])
+        self.assertEqual(list(self.output_root.iterdir()), [])
+
+    def test_cli_rejects_stream_return(self) -> None:
+        self._write_template("example.docx", ["Hello {{NAME}}"])
+        payload = json.dumps({"template": "example.docx", "data": {"NAME": "Ann"}, "return": "stream"})
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), self.assertLogs("docx_template_fill", level="ERROR"):
+            code = self.tool.main(["--payload", payload])
+
+        self.assertEqual(code, 2)
+        self.assertIn("return=stream is not supported", json.loads(stdout.getvalue())["error"])
+        self.assertEqual(list(self.output_root.iterdir()), [])
+
+    def test_inline_default_filename_is_derived_from_template_stem(self) -> None:
+        self._write_template("offer.v2.docx", ["Offer for {{NAME}}"])
+        result = self.tool.fill_docx_template({"template": "offer.v2.docx", "data": {"NAME": "Ann"}, "return": "inline"})
+
+        self.assertEqual(result["filename"], "offer_v2.docx")
+        doc = Document(io.BytesIO(base64.b64decode(result["content_base64"])))
+        self.assertEqual([p.text for p in doc.paragraphs], ["Offer for Ann"])
+
+    def test_batch_renders_rows_in_parallel_with_manifest_and_zip(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}}"])
+        rows = [{"NAME": "Alice Smith"}, {"NAME": "Bob"}, {"NAME": None}, {"NAME": "Carol"}]
+        result = self.tool.fill_docx_template(
+            {
+                "template": "letter.docx",
+                "rows": rows,
+                "filename_pattern": "letter_{index:03d}_{NAME}",
+                "output_subdir": "batch",
+                "workers": 2,
+                "zip_filename": "letters.zip",
+            }
+        )
+
+        self.assertEqual((result["rendered"], result["failed"]), (3, 1))
+        self.assertEqual([entry["index"] for entry in result["manifest"]], [1, 2, 3, 4])
+        self.assertEqual(result["manifest"][2]["status"], "error")
+        first = Path(result["manifest"][0]["output_file"])
+        self.assertEqual(first.name, "letter_001_Alice_Smith.docx")
+        self.assertEqual(self._read_paragraphs(first), ["Dear Alice Smith"])
+        with zipfile.ZipFile(result["zip_file"]) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                ["letter_001_Alice_Smith.docx", "letter_002_Bob.docx", "letter_004_Carol.docx"],
+            )
+
+    def test_batch_reads_rows_file(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}} from {{CITY}}"])
+        rows_file = Path(self.tempdir.name) / "rows.csv"
+        rows_file.write_text("NAME,CITY\nAlice,Berlin\nBob,Köln\n", encoding="utf-8")
+        result = self.tool.fill_docx_template(
+            {"template": "letter.docx", "rows_file": str(rows_file), "filename_pattern": "{NAME}.docx", "workers": 1}
+        )
+        self.assertEqual(result["rendered"], 2)
+        self.assertEqual(self._read_paragraphs(self.output_root / "Bob.docx"), ["Dear Bob from Köln"])
+
+    def test_batch_rows_file_must_stay_inside_rows_root(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}}"])
+        for rows_file in ("/etc/passwd", "../outside.csv"):
+            with self.subTest(rows_file=rows_file), self.assertRaisesRegex(
+                self.renderer.TemplateValidationError, "inside"
+            ):
+                self.tool.fill_docx_template(
+                    {"template": "letter.docx", "rows_file": rows_file, "filename_pattern": "{NAME}.docx"}
+                )
+
+    def test_batch_rejects_csv_rows_with_extra_columns(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}}"])
+        (Path(self.tempdir.name) / "rows.csv").write_text("NAME\nAlice\nBob,extra\n", encoding="utf-8")
+        with self.assertRaisesRegex(self.renderer.TemplateValidationError, "row 2 .*extra columns"):
+            self.tool.fill_docx_template(
+                {"template": "letter.docx", "rows_file": "rows.csv", "filename_pattern": "{NAME}.docx", "workers": 1}
+            )
+
+    def test_batch_rejects_csv_rows_with_missing_fields(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}} from {{CITY}}"])
+        (Path(self.tempdir.name) / "rows.csv").write_text("NAME,CITY\nAlice,Berlin\nBob\n", encoding="utf-8")
+        with self.assertRaisesRegex(self.renderer.TemplateValidationError, "row 2 .*fewer fields than the header"):
+            self.tool.fill_docx_template(
+                {"template": "letter.docx", "rows_file": "rows.csv", "filename_pattern": "{NAME}.docx", "workers": 1}
+            )
+
+    def test_batch_rejects_duplicate_filenames_before_rendering(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}}"])
+        rows = [{"NAME": "Ann"}, {"NAME": "Bob"}, {"NAME": "Ann"}]
+        with self.assertRaisesRegex(self.renderer.TemplateValidationError, "Ann.docx for rows 1 and 3"):
+            self.tool.fill_docx_template({"template": "letter.docx", "rows": rows, "filename_pattern": "{NAME}.docx"})
+        self.assertEqual(list(self.output_root.iterdir()), [])
+
+    def test_batch_workers_are_capped(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}}"])
+        self.batch.BATCH_MAX_WORKERS = 1
+        result = self.tool.fill_docx_template(
+            {"template": "letter.docx", "rows": [{"NAME": "A"}, {"NAME": "B"}], "filename_pattern": "{NAME}.docx", "workers": 64}
+        )
+        self.assertEqual((result["workers"], result["rendered"]), (1, 2))
+
+    def test_batch_requires_filename_pattern(self) -> None:
+        self._write_template("letter.docx", ["Dear {{NAME}}"])
+        with self.assertRaises(self.renderer.TemplateValidationError):
+            self.tool.fill_docx_template({"template": "letter.docx", "rows": [{"NAME": "A"}]})
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
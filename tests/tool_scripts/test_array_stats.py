@@ -1,20 +1,46 @@
 from __future__ import annotations
 
+import importlib.util
 import json
+import os
 import subprocess
 import tempfile
 import unittest
 from pathlib import Path
 
+import numpy as np
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "array-stats.py"
+
+
+def load_script_module():
+    spec = importlib.util.spec_from_file_location("array_stats_script", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 
 class ArrayStatsScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        # Tiny chunks so small fixtures still exercise the chunk merging.
+        self.env = dict(os.environ, ARRAY_STATS_CHUNK_SIZE="3")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run(self, *extra: str) -> tuple[int, dict]:
+        command = ["python3", str(SCRIPT), "--output-dir", str(self.root / "out"), *extra]
+        result = subprocess.run(command, capture_output=True, text=True, check=False, env=self.env)
+        return result.returncode, json.loads(result.stdout)
+
     def test_array_stats_from_inline_json(self) -> None:
         with tempfile.TemporaryDirectory() as tempdir:
             output_dir = Path(tempdir)
-            script = Path(__file__).resolve().parents[2] / "scripts" / "array-stats.py"
             command = [
                 "python3",
-                str(script),
+                str(SCRIPT),
                 "--numbers-json",
                 "[1,2,3,4]",
                 "--output-dir",
@@ -37,6 +63,110 @@ class ArrayStatsScriptTests(unittest.TestCase):
             self.assertAlmostEqual(saved["mean"], 2.5)
             self.assertAlmostEqual(saved["sum"], 10.0)
 
+    def test_npy_and_raw_inputs_match_numpy(self) -> None:
+        values = np.random.default_rng(7).normal(10.0, 2.0, 1001)
+        np.save(self.root / "values.npy", values.reshape(7, 143))
+        values.astype(np.float32).tofile(self.root / "values.f32")
+
+        for path, extra in (("values.npy", ()), ("values.f32", ("--dtype", "float32"))):
+            expected = np.load(self.root / "values.npy").ravel() if path.endswith(".npy") else values.astype(np.float32)
+            with self.subTest(path=path):
+                code, payload = self._run("--input-path", str(self.root / path), *extra)
+
+                self.assertEqual(code, 0, msg=payload)
+                stats = payload["stats"]
+                self.assertEqual(stats["count"], 1001)
+                self.assertAlmostEqual(stats["mean"], float(expected.mean()), places=5)
+                self.assertAlmostEqual(stats["std"], float(expected.std()), places=5)
+                self.assertEqual(stats["median"], float(np.median(expected)))
+                self.assertEqual((stats["min"], stats["max"]), (float(expected.min()), float(expected.max())))
+
+    def test_csv_column_by_header_skips_blank_cells(self) -> None:
+        path = self.root / "messwerte.csv"
+        path.write_text("id;wert\n1;1,5\n2;2\n3;\n4;4\n5;7\n", encoding="utf-8")
+
+        code, payload = self._run("--input-path", str(path), "--column", "wert")
+
+        self.assertEqual(code, 0, msg=payload)
+        self.assertEqual(payload["input_format"], "csv")
+        stats = payload["stats"]
+        self.assertEqual((stats["count"], stats["nan_count"]), (4, 1))
+        self.assertEqual((stats["sum"], stats["median"]), (14.5, 3.0))
+
+    def test_single_column_csv_keeps_decimal_commas(self) -> None:
+        path = self.root / "werte.csv"
+        path.write_text("wert\n1,5\n2,5\n3,5\n", encoding="utf-8")
+
+        code, payload = self._run("--input-path", str(path))
+
+        self.assertEqual(code, 0, msg=payload)
+        stats = payload["stats"]
+        self.assertEqual((stats["count"], stats["mean"], stats["min"]), (3, 2.5, 1.5))
+
+    def test_rows_wider_than_first_line_are_rejected(self) -> None:
+        path = self.root / "values.csv"
+        path.write_text("1,2\n3,4\n5,6,7\n", encoding="utf-8")
+
+        code, payload = self._run("--input-path", str(path))
+
+        self.assertEqual(code, 1)
+        self.assertIn("line 3 has 3 fields", payload["error"])
+
+    def test_ndjson_key_and_no_median(self) -> None:
+        path = self.root / "events.ndjson"
+        path.write_text("".join(json.dumps({"ms": value}) + "\n" for value in (5, 1, 3, 9, 2)), encoding="utf-8")
+
+        code, payload = self._run("--input-path", str(path), "--column", "ms", "--no-median")
+
+        self.assertEqual(code, 0, msg=payload)
+        self.assertEqual((payload["stats"]["count"], payload["stats"]["mean"]), (5, 4.0))
+        self.assertIsNone(payload["stats"]["median"])
+
+    def test_non_numeric_csv_value_reports_line(self) -> None:
+        path = self.root / "values.csv"
+        path.write_text("1\n2\nabc\n", encoding="utf-8")
+
+        code, payload = self._run("--input-path", str(path))
+
+        self.assertEqual(code, 1)
+        self.assertIn("line 3", payload["error"])
+
+
+class ArrayStatsMedianTests(unittest.TestCase):
+    def test_histogram_refinement_handles_ties_and_narrow_bins(self) -> None:
+        module = load_script_module()
+        module.MEDIAN_BINS, module.MEDIAN_SELECT_MAX = 8, 16
+        rng = np.random.default_rng(3)
+        samples = (
+            rng.normal(1e9, 1.0, 500),
+            np.repeat([1.0, 2.0, 3.0], 200),
+            np.concatenate([np.full(300, 7.0), rng.random(250)]),
+        )
+        for values in samples:
+            stats = module.RunningStats()
+            for chunk in module.iter_chunks(values, 64):
+                stats.update(chunk)
+            self.assertEqual(module.exact_median(values, stats), float(np.median(values)))
+            self.assertAlmostEqual(stats.m2 / stats.count, float(values.var()), delta=1e-6 * max(1.0, values.var()))
+
+    def test_values_near_float64_limits_do_not_overflow(self) -> None:
+        module = load_script_module()
+        module.MEDIAN_BINS, module.MEDIAN_SELECT_MAX = 8, 2
+        limit = float(np.finfo(np.float64).max)
+        samples = (
+            (np.array([1e308, -1e308, 0.0]), 1e308 * np.sqrt(2 / 3)),
+            (np.array([limit, -limit, limit, 5.0, -limit, 1.0]), limit * np.std([1, -1, 1, 0, -1, 0])),
+        )
+        for values, expected_std in samples:
+            with self.subTest(values=values.tolist()):
+                stats = module.RunningStats()
+                for chunk in module.iter_chunks(values, 2):
+                    stats.update(chunk)
+
+                self.assertEqual(module.exact_median(values, stats), float(np.median(values)))
+                self.assertAlmostEqual(stats.std / expected_std, 1.0, places=12)
+                self.assertTrue(np.isfinite(module.compute_stats(values, with_median=True)["std"]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "audio-batch-split.py"
+
+# Stand-in for audio-split.sh that records each invocation and writes one chunk.
+FAKE_SPLIT_SCRIPT = """#!/bin/bash
+set -euo pipefail
+while [[ $# -gt 0 ]]; do
+  case "$1" in
+    --input) INPUT="$2"; shift 2;;
+    --output) OUTPUT="$2"; shift 2;;
+    --enhance|--enhance-speech) shift;;
+    *) shift 2;;
+  esac
+done
+mkdir -p "$OUTPUT"
+cp "$INPUT" "$OUTPUT/part_01.m4a"
+echo "$INPUT" >> "$CALLS_FILE"
+"""
+
+
+class AudioBatchSplitScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.input_dir = self.root / "in"
+        self.output_root = self.root / "out"
+        self.input_dir.mkdir()
+        self.calls_file = self.root / "calls.txt"
+        self.split_script = self.root / "fake-split.sh"
+        self.split_script.write_text(FAKE_SPLIT_SCRIPT, encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run(self, *extra: str, input_dir: str | None = None, output_root: str | None = None, cwd=None) -> dict:
+        command = [
+            "python3",
+            str(SCRIPT),
+            "--input-dir",
+            input_dir or str(self.input_dir),
+            "--output-root",
+            output_root or str(self.output_root),
+            "--split-script",
+            str(self.split_script),
+            "--workers",
+            "2",
+            *extra,
+        ]
+        env = dict(
+            os.environ,
+            CALLS_FILE=str(self.calls_file),
+            AUDIO_BATCH_SPLIT_LOG_PATH=str(self.root / "batch.log"),
+        )
+        result = subprocess.run(command, capture_output=True, text=True, check=False, env=env, cwd=cwd)
+        self.assertEqual(result.returncode, 0, msg=result.stdout + result.stderr)
+        return json.loads(result.stdout)
+
+    def _calls(self) -> list[str]:
+        if not self.calls_file.exists():
+            return []
+        return self.calls_file.read_text(encoding="utf-8").splitlines()
+
+    def test_only_new_or_changed_inputs_are_split(self) -> None:
+        (self.input_dir / "a.m4a").write_bytes(b"recording-a")
+        (self.input_dir / "b.m4a").write_bytes(b"recording-b")
+
+        first = self._run()
+        self.assertEqual(len(first["split"]), 2)
+        self.assertTrue((self.output_root / "a" / ".complete.json").is_file())
+
+        # Unchanged inputs are skipped without another split.
+        second = self._run()
+        self.assertEqual(second["split"], [])
+        self.assertEqual(second["skipped"], 2)
+
+        # A touched file with identical content is only re-hashed.
+        os.utime(self.input_dir / "a.m4a", ns=(1_000_000_000, 1_000_000_000))
+        third = self._run()
+        self.assertEqual(third["split"], [])
+
+        # Changed content and new files are split again.
+        (self.input_dir / "b.m4a").write_bytes(b"recording-b-v2")
+        (self.input_dir / "c.m4a").write_bytes(b"recording-c")
+        fourth = self._run()
+        self.assertEqual(sorted(Path(item["input"]).name for item in fourth["split"]), ["b.m4a", "c.m4a"])
+        self.assertEqual(len(self._calls()), 4)
+
+    def test_changed_split_options_trigger_resplit(self) -> None:
+        (self.input_dir / "a.m4a").write_bytes(b"recording-a")
+        self._run("--chunk-length", "600")
+        result = self._run("--chunk-length", "300")
+        self.assertEqual(len(result["split"]), 1)
+
+    def test_relative_directories_are_resolved_against_cwd(self) -> None:
+        (self.input_dir / "a.m4a").write_bytes(b"recording-a")
+
+        result = self._run(input_dir="in", output_root="out", cwd=self.root)
+
+        self.assertEqual(len(result["split"]), 1)
+        self.assertEqual(self._calls(), [str((self.input_dir / "a.m4a").resolve())])
+        self.assertTrue((self.output_root / "a" / "part_01.m4a").is_file())
+        self.assertTrue((self.output_root / "a" / ".complete.json").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "audio-split.sh"
+
+
+@unittest.skipUnless(all(shutil.which(cmd) for cmd in ("ffmpeg", "ffprobe", "bc")), "ffmpeg, ffprobe and bc are required")
+class AudioSplitScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.input_file = self.root / "note.m4a"
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=5", "-c:a", "aac", "-b:a", "96k", str(self.input_file)],
+            check=True,
+        )
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _ffprobe_bitrate(self, path: Path) -> int:
+        command = ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=bit_rate", "-of", "csv=p=0", str(path)]
+        return int(subprocess.run(command, capture_output=True, text=True, check=True).stdout.strip())
+
+    def test_chunk_index_records_timing_and_codec_bitrate(self) -> None:
+        output_dir = self.root / "job"
+        env = dict(
+            os.environ,
+            TOOLHUB_LOG_DIR=str(self.root / "logs"),
+            AUDIO_SPLIT_BASE_DIR=str(self.root / "audio"),
+            AUDIO_ANALYSIS_CACHE="0",
+        )
+        command = ["bash", str(SCRIPT), "--mode", "fixed", "--chunk-length", "3", "--input", str(self.input_file), "--output", str(output_dir)]
+        result = subprocess.run(command, capture_output=True, text=True, check=False, env=env)
+        log = (self.root / "logs" / "audio-split.log").read_text(encoding="utf-8")
+        self.assertEqual(result.returncode, 0, msg=log)
+
+        records = [json.loads(line) for line in (output_dir / "chunks.ndjson").read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([record["filename"] for record in records], ["part_01.m4a", "part_02.m4a"])
+        self.assertEqual([record["cut_reason"] for record in records], ["fixed", "end"])
+        self.assertEqual((records[0]["start"], records[0]["duration"], records[0]["end"]), (0.0, 3.0, 3.0))
+        self.assertEqual(records[1]["start"], 3.0)
+        for record in records:
+            chunk = output_dir / record["filename"]
+            self.assertEqual(record["size"], chunk.stat().st_size)
+            self.assertEqual(record["codec"], "aac")
+            # The codec bitrate from the audio stream, not the container rate size * 8 / duration.
+            self.assertEqual(record["bitrate"], self._ffprobe_bitrate(chunk))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "ocr-image.py"
+
+# Fake tesseract CLI: TIFFs have two pages, other images one; writes txt/tsv like the real binary.
+FAKE_TESSERACT = """#!/usr/bin/env python3
+import sys
+from pathlib import Path
+
+image, base, *rest = sys.argv[1:]
+name = Path(image).stem
+if name == "broken":
+    sys.stderr.write("Error in pixReadStream")
+    sys.exit(1)
+pages = 2 if image.endswith(".tif") else 1
+Path(base + ".txt").write_text("".join(f"{name} page {n}\\n\\f" for n in range(1, pages + 1)))
+if "tsv" in rest:
+    rows = ["level\\tpage_num\\tblock_num\\tpar_num\\tline_num\\tword_num\\tleft\\ttop\\twidth\\theight\\tconf\\ttext"]
+    for n in range(1, pages + 1):
+        rows.append(f"1\\t{n}\\t0\\t0\\t0\\t0\\t0\\t0\\t800\\t600\\t-1\\t")
+        rows.append(f"5\\t{n}\\t1\\t1\\t1\\t1\\t10\\t20\\t30\\t12\\t91.5\\t{name}")
+    Path(base + ".tsv").write_text("\\n".join(rows) + "\\n")
+"""
+
+
+def load_script_module():
+    spec = importlib.util.spec_from_file_location("ocr_image_script", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def skewed_page(angle: float) -> np.ndarray:
+    """RGB page with 'word' blocks on text lines, rotated by ``angle`` and shaded left to right."""
+    module = load_script_module()
+    lines = np.zeros((1400, 1000), dtype=bool)
+    for top in range(300, 1100, 40):
+        for left in range(200, 800, 30):
+            lines[top : top + 12, left : left + 20] = True
+    ink = module.rotate_mask(lines, -angle)
+    page = np.full((1400, 1000, 3), 230, dtype=np.float32) * np.linspace(0.6, 1.0, 1000)[None, :, None]
+    page[ink] = 30
+    return page.astype(np.uint8)
+
+
+class OcrImageScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        binary = self.root / "tesseract"
+        binary.write_text(FAKE_TESSERACT, encoding="utf-8")
+        binary.chmod(0o755)
+        self.env = dict(os.environ, TESSERACT_BINARY=str(binary), OCR_ENGINE="cli")
+        self.images = self.root / "scans"
+        self.images.mkdir()
+        for name in ("a.png", "b.tif", "notes.txt"):
+            (self.images / name).write_bytes(b"image")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run(self, *extra: str) -> tuple[int, dict]:
+        command = ["python3", str(SCRIPT), "--output-dir", str(self.root / "out"), *extra]
+        result = subprocess.run(command, capture_output=True, text=True, check=False, env=self.env)
+        return result.returncode, json.loads(result.stdout)
+
+    def test_single_image_writes_plain_text(self) -> None:
+        code, payload = self._run("--input-path", str(self.images / "a.png"))
+
+        self.assertEqual(code, 0, msg=payload)
+        self.assertEqual((payload["engine"], payload["pages"]), ("cli", 1))
+        self.assertEqual(Path(payload["output_file"]).name, "a.ocr.txt")
+        self.assertEqual(Path(payload["output_file"]).read_text(encoding="utf-8"), "a page 1\n\f")
+        self.assertNotIn("json_file", payload)
+
+    def test_batch_directory_with_multipage_tiff_and_json(self) -> None:
+        code, payload = self._run("--input-dir", str(self.images), "--workers", "2", "--json")
+
+        self.assertEqual(code, 0, msg=payload)
+        self.assertEqual((payload["processed"], payload["failed"]), (2, 0))
+        first, second = payload["results"]
+        self.assertEqual(Path(first["input_path"]).name, "a.png")
+        self.assertEqual(second["pages"], 2)
+        self.assertEqual(Path(second["output_file"]).read_text(encoding="utf-8"), "b page 1\n\fb page 2\n\f")
+
+        document = json.loads(Path(second["json_file"]).read_text(encoding="utf-8"))
+        self.assertEqual(Path(second["json_file"]).name, "b.ocr.json")
+        self.assertEqual([page["page"] for page in document["pages"]], [1, 2])
+        self.assertEqual(document["pages"][1]["words"], [{"text": "b", "conf": 91.5, "box": [10, 20, 30, 12]}])
+
+    def test_batch_reports_failed_images_individually(self) -> None:
+        (self.images / "broken.png").write_bytes(b"image")
+        code, payload = self._run("--input-dir", str(self.images))
+
+        self.assertEqual(code, 1)
+        self.assertEqual((payload["processed"], payload["failed"]), (2, 1))
+        failed = [result for result in payload["results"] if result["status"] == "error"]
+        self.assertEqual(failed[0]["error"], "tesseract_failed")
+        self.assertIn("pixReadStream", failed[0]["stderr"])
+
+    def test_preprocess_flag_reports_stage_timings(self) -> None:
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest("Pillow is required to decode images")
+        Image.fromarray(skewed_page(3.0)).save(self.images / "photo.png", dpi=(600, 600))
+
+        code, payload = self._run("--input-path", str(self.images / "photo.png"), "--preprocess", "--json")
+
+        self.assertEqual(code, 0, msg=payload)
+        self.assertEqual(list(payload["preprocess"]), ["decode", "downscale", "grayscale", "binarize", "deskew", "crop"])
+        page = json.loads(Path(payload["json_file"]).read_text(encoding="utf-8"))["pages"][0]
+        self.assertEqual((page["preprocess"]["scale"], page["preprocess"]["angle"]), (0.5, 3.0))
+
+
+class OcrPreprocessTests(unittest.TestCase):
+    def test_pipeline_downscales_deskews_and_crops(self) -> None:
+        module = load_script_module()
+        cleaned, info = module.preprocess_array(skewed_page(3.0), source_dpi=600, target_dpi=300)
+
+        self.assertEqual(cleaned.dtype, np.uint8)
+        self.assertEqual((info["scale"], info["angle"]), (0.5, 3.0))
+        self.assertEqual(list(info["timings"]), ["downscale", "grayscale", "binarize", "deskew", "crop"])
+        # Content spans 600 x 800 source pixels: about 300 x 400 after downscaling, plus the crop margin.
+        self.assertAlmostEqual(cleaned.shape[0], 420, delta=15)
+        self.assertAlmostEqual(cleaned.shape[1], 320, delta=15)
+        # Deskewed lines leave blank gaps between text rows.
+        self.assertLess(np.count_nonzero((cleaned == 0).any(axis=1)), cleaned.shape[0] * 0.5)
+
+    def test_straight_page_is_not_rotated(self) -> None:
+        module = load_script_module()
+        _, info = module.preprocess_array(skewed_page(0.0), source_dpi=300, target_dpi=300)
+
+        self.assertEqual((info["scale"], info["angle"]), (1.0, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
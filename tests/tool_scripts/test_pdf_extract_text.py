@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "pdf-extract-text.py"
+
+
+def build_pdf(page_texts: list[str]) -> bytes:
+    """Build a minimal PDF with one Helvetica text line per page (empty string: no text layer)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET" if text else ""
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    output = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return output
+
+
+class PdfExtractTextScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.input_file = self.root / "contract.pdf"
+        self.input_file.write_bytes(build_pdf([f"Page {number} text" for number in range(1, 21)]))
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run(self, *extra: str, env: dict | None = None) -> dict:
+        command = ["python3", str(SCRIPT), "--input-path", str(self.input_file), "--output-dir", str(self.root / "out"), *extra]
+        result = subprocess.run(command, capture_output=True, text=True, check=False, env=env)
+        self.assertEqual(result.returncode, 0, msg=result.stdout + result.stderr)
+        return json.loads(result.stdout.splitlines()[-1])
+
+    def test_parallel_extraction_matches_page_order(self) -> None:
+        payload = self._run("--workers", "4")
+
+        self.assertEqual((payload["page_count"], payload["pages_extracted"]), (20, 20))
+        pages = Path(payload["output_file"]).read_text(encoding="utf-8").split("\f")
+        self.assertEqual([page.strip() for page in pages[:-1]], [f"Page {number} text" for number in range(1, 21)])
+
+    def test_page_selection_with_per_page_json(self) -> None:
+        payload = self._run("--pages", "2-3,19-", "--page-format", "json", "--workers", "2")
+
+        records = json.loads(Path(payload["pages_file"]).read_text(encoding="utf-8"))
+        self.assertEqual([record["page"] for record in records], [2, 3, 19, 20])
+        self.assertEqual(records[-1]["text"].strip(), "Page 20 text")
+
+    def test_stream_mode_emits_page_events_before_done(self) -> None:
+        command = [
+            "python3",
+            str(SCRIPT),
+            "--input-path",
+            str(self.input_file),
+            "--output-dir",
+            str(self.root / "out"),
+            "--pages",
+            "1-6",
+            "--backend",
+            "pdfminer",
+        ]
+        env = dict(os.environ, TOOLHUB_STREAM="1")
+        result = subprocess.run(command, capture_output=True, text=True, check=False, env=env)
+
+        events = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual([event["type"] for event in events], ["page"] * 6 + ["done"])
+        self.assertEqual(events[0], {"type": "page", "total": 6, "page": 1, "text": "Page 1 text\n\n"})
+        self.assertEqual(events[-1]["pages_extracted"], 6)
+
+    def _fake_pdftotext(self, page_text: str, last_page: int = 20) -> dict:
+        """Install a fake pdftotext that prints ``page_text`` (``{n}``: page number) per requested page.
+
+        Pages after ``last_page`` are dropped like on a truncated file; every call is logged to ``calls.txt``.
+        """
+        binary = self.root / "pdftotext"
+        binary.write_text(
+            "#!/usr/bin/env python3\n"
+            "import sys\n"
+            "args = sys.argv[1:]\n"
+            "first, last = int(args[args.index('-f') + 1]), int(args[args.index('-l') + 1])\n"
+            f"open({str(self.root / 'calls.txt')!r}, 'a').write(f'{{first}}-{{last}}\\n')\n"
+            f"last = min(last, {last_page})\n"
+            f"sys.stdout.write(''.join({page_text!r}.format(n=n) + '\\f' for n in range(first, last + 1)))\n",
+            encoding="utf-8",
+        )
+        binary.chmod(0o755)
+        return dict(os.environ, PDFTOTEXT_BINARY=str(binary))
+
+    def test_auto_backend_prefers_pdftotext(self) -> None:
+        env = self._fake_pdftotext("Fast page {n}")
+        payload = self._run("--pages", "3-12", "--workers", "2", env=env)
+
+        self.assertEqual(payload["backend"], "auto")
+        self.assertEqual(set(payload["backends"]), {"pdftotext"})
+        self.assertEqual(payload["backends"]["pdftotext"]["pages"], 10)
+        pages = Path(payload["output_file"]).read_text(encoding="utf-8").split("\f")
+        self.assertEqual(pages[:-1], [f"Fast page {number}" for number in range(3, 13)])
+
+        layout = self._run("--pages", "3", "--layout", "--output-filename", "layout.txt", env=env)
+        self.assertEqual(layout["backend"], "pdfminer")
+        self.assertEqual(Path(layout["output_file"]).read_text(encoding="utf-8").strip(), "Page 3 text")
+
+    def test_auto_backend_falls_back_to_pdfminer_without_text(self) -> None:
+        env = self._fake_pdftotext("")
+        payload = self._run("--pages", "1-2", env=env)
+
+        self.assertEqual(payload["backends"]["pdftotext"]["pages"], 2)
+        self.assertEqual(payload["backends"]["pdfminer"]["pages"], 2)
+        pages = Path(payload["output_file"]).read_text(encoding="utf-8").split("\f")
+        self.assertEqual([page.strip() for page in pages[:-1]], ["Page 1 text", "Page 2 text"])
+
+        forced = self._run("--pages", "1-2", "--backend", "pdftotext", "--output-filename", "fast.txt", env=env)
+        self.assertEqual(set(forced["backends"]), {"pdftotext"})
+        self.assertEqual(Path(forced["output_file"]).read_text(encoding="utf-8"), "\f\f")
+
+    def test_sparse_selection_runs_pdftotext_per_contiguous_range(self) -> None:
+        env = self._fake_pdftotext("Fast page {n}", last_page=19)
+        payload = self._run("--pages", "1-2,20", "--backend", "pdftotext", env=env)
+
+        self.assertEqual((self.root / "calls.txt").read_text(encoding="utf-8").split(), ["1-2", "20-20"])
+        # Page 20 is missing from pdftotext's output and comes from pdfminer instead.
+        self.assertEqual(payload["backends"]["pdftotext"]["pages"], 2)
+        self.assertEqual(payload["backends"]["pdfminer"]["pages"], 1)
+        pages = Path(payload["output_file"]).read_text(encoding="utf-8").split("\f")
+        self.assertEqual([page.strip() for page in pages[:-1]], ["Fast page 1", "Fast page 2", "Page 20 text"])
+
+    def test_image_only_pages_are_ocrd_in_page_order(self) -> None:
+        self.input_file.write_bytes(build_pdf(["Page 1 text", "", "Page 3 text", "", ""]))
+        pdftoppm = self.root / "pdftoppm"
+        pdftoppm.write_text(
+            "#!/usr/bin/env python3\n"
+            "import sys\n"
+            "args = sys.argv[1:]\n"
+            "open(args[-1] + '.png', 'w').write('scan ' + args[args.index('-f') + 1])\n",
+            encoding="utf-8",
+        )
+        tesseract = self.root / "tesseract"
+        tesseract.write_text(
+            "#!/usr/bin/env python3\n"
+            "import sys\n"
+            "sys.stdout.write('OCR ' + open(sys.argv[1]).read() + '\\n\\f')\n",
+            encoding="utf-8",
+        )
+        for binary in (pdftoppm, tesseract):
+            binary.chmod(0o755)
+        env = dict(os.environ, PDFTOPPM_BINARY=str(pdftoppm), TESSERACT_BINARY=str(tesseract))
+
+        payload = self._run("--backend", "pdfminer", "--page-format", "json", "--workers", "3", env=env)
+
+        self.assertEqual(payload["ocr_pages"], [2, 4, 5])
+        self.assertEqual(payload["backends"]["ocr"]["pages"], 3)
+        pages = Path(payload["output_file"]).read_text(encoding="utf-8").split("\f")
+        self.assertEqual(
+            [page.strip() for page in pages[:-1]], ["Page 1 text", "OCR scan 2", "Page 3 text", "OCR scan 4", "OCR scan 5"]
+        )
+        records = json.loads(Path(payload["pages_file"]).read_text(encoding="utf-8"))
+        self.assertEqual([record.get("ocr", False) for record in records], [False, True, False, True, True])
+
+        skipped = self._run("--backend", "pdfminer", "--ocr", "off", "--output-filename", "plain.txt", env=env)
+        self.assertEqual((skipped["ocr"], skipped["ocr_pages"]), (False, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import math
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import unittest
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from tools.transcript_worker import TranscriptWorkerServer
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "transcript.py"
+
+
+class TranscriptScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.input_file = self.root / "chunk.m4a"
+        self.input_file.write_bytes(b"audio")
+        self.socket_path = str(self.root / "worker.sock")
+        self.output_root = self.root / "transcripts"
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run(self, *extra: str) -> dict:
+        return self._run_script("--input", str(self.input_file), *extra)
+
+    def _run_script(self, *extra: str) -> dict:
+        return json.loads(self._run_process(*extra).stdout)
+
+    def _run_process(self, *extra: str) -> subprocess.CompletedProcess:
+        command = ["python3", str(SCRIPT), *extra]
+        env = dict(
+            os.environ,
+            TRANSCRIPT_WORKER_SOCKET=self.socket_path,
+            TRANSCRIPT_OUTPUT_ROOT=str(self.output_root),
+            TRANSCRIPT_LOG_PATH=str(self.root / "transcript.log"),
+            TRANSCRIPT_CACHE_DIR=str(self.root / "cache"),
+        )
+        return subprocess.run(command, capture_output=True, text=True, check=False, env=env)
+
+    def test_auto_backend_uses_resident_worker(self) -> None:
+        calls = []
+
+        def fake_transcribe(input_path, language, model):
+            calls.append((input_path, language, model))
+            return {"text": "hallo welt", "segments": [], "language": language}
+
+        server = TranscriptWorkerServer(self.socket_path, fake_transcribe)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            first = self._run("--language", "de")
+            second = self._run("--language", "de", "--format", "txt", "--no-cache")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(first["status"], "ok")
+        self.assertEqual(first["backend"], "worker")
+        saved = json.loads(Path(first["output"]).read_text(encoding="utf-8"))
+        self.assertEqual(saved["text"], "hallo welt")
+        self.assertEqual(Path(second["output"]).read_text(encoding="utf-8"), "hallo welt")
+        self.assertEqual(calls, [(str(self.input_file), "de", None)] * 2)
+
+    def test_cached_transcript_skips_backend(self) -> None:
+        calls = []
+
+        def fake_transcribe(input_path, language, model):
+            calls.append(language)
+            return {"text": f"text-{language}", "segments": []}
+
+        server = TranscriptWorkerServer(self.socket_path, fake_transcribe)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            first = self._run("--language", "de")
+            hit = self._run("--language", "de", "--format", "txt", "--output", "hit.txt")
+            other_language = self._run("--language", "en")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # Cache hits also work without any backend once the worker is gone.
+        offline_hit = self._run("--language", "de", "--backend", "worker")
+
+        self.assertFalse(first["cached"])
+        self.assertTrue(hit["cached"])
+        self.assertEqual(Path(hit["output"]).read_text(encoding="utf-8"), "text-de")
+        self.assertFalse(other_language["cached"])
+        self.assertEqual(offline_hit["status"], "ok")
+        self.assertTrue(offline_hit["cached"])
+        self.assertEqual(calls, ["de", "en"])
+
+    def test_batch_mode_merges_chunks_with_split_offsets(self) -> None:
+        chunk_dir = self.root / "job-1"
+        chunk_dir.mkdir()
+        for name in ("part_02.m4a", "part_01.m4a"):
+            (chunk_dir / name).write_bytes(b"audio")
+        index = [
+            {"index": 1, "filename": "part_01.m4a", "start": 0.0, "duration": 600.0},
+            {"index": 2, "filename": "part_02.m4a", "start": 598.5, "duration": 300.0},
+        ]
+        (chunk_dir / "chunks.ndjson").write_text("".join(json.dumps(item) + "\n" for item in index), encoding="utf-8")
+
+        def fake_transcribe(input_path, language, model):
+            name = Path(input_path).stem
+            return {"text": name, "language": "de", "segments": [{"id": 0, "start": 1.0, "end": 2.0, "text": name}]}
+
+        server = TranscriptWorkerServer(self.socket_path, fake_transcribe)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            payload = self._run_script("--input-dir", str(chunk_dir), "--workers", "2")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(payload["status"], "ok", msg=payload)
+        self.assertEqual(payload["chunk_count"], 2)
+        merged = json.loads(Path(payload["output"]).read_text(encoding="utf-8"))
+        self.assertEqual(merged["text"], "part_01 part_02")
+        self.assertEqual([segment["start"] for segment in merged["segments"]], [1.0, 599.5])
+        self.assertEqual([segment["id"] for segment in merged["segments"]], [0, 1])
+        for output in payload["chunk_outputs"]:
+            self.assertTrue(Path(output).is_file())
+        self.assertEqual(Path(payload["chunk_outputs"][0]).parent, self.output_root / "job-1")
+
+    def test_stream_mode_emits_segments_before_done(self) -> None:
+        def fake_transcribe(input_path, language, model, on_segment=None):
+            segments = [{"start": 0.0, "end": 2.5, "text": "eins"}, {"start": 2.5, "end": 4.0, "text": "zwei"}]
+            for segment in segments:
+                if on_segment is not None:
+                    on_segment(segment)
+            return {"text": "eins zwei", "segments": segments}
+
+        server = TranscriptWorkerServer(self.socket_path, fake_transcribe)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            result = self._run_process("--input", str(self.input_file), "--stream", "--no-cache")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        events = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual([event["type"] for event in events], ["segment", "segment", "done"])
+        self.assertEqual(events[1], {"type": "segment", "index": 1, "start": 2.5, "end": 4.0, "text": "zwei"})
+        self.assertEqual(events[-1]["status"], "ok")
+        saved = json.loads(Path(events[-1]["output"]).read_text(encoding="utf-8"))
+        self.assertEqual(saved["text"], "eins zwei")
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is required for VAD decoding")
+    def test_vad_transcribes_speech_only_and_keeps_original_timeline(self) -> None:
+        # 2 s tone, 6 s silence, 3 s tone at 16 kHz mono.
+        samples = []
+        for seconds, amplitude in ((2, 0.5), (6, 0.0), (3, 0.5)):
+            samples.extend(int(amplitude * 32767 * math.sin(2 * math.pi * 300 * n / 16000)) for n in range(seconds * 16000))
+        speech_file = self.root / "memo.wav"
+        with wave.open(str(speech_file), "wb") as handle:
+            handle.setnchannels(1)
+            handle.setsampwidth(2)
+            handle.setframerate(16000)
+            handle.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+        durations = []
+
+        def fake_transcribe(input_path, language, model):
+            with wave.open(input_path) as handle:
+                duration = handle.getnframes() / handle.getframerate()
+            durations.append(duration)
+            return {"text": "a b", "segments": [{"start": 0.0, "end": 1.0}, {"start": duration - 1.0, "end": duration}]}
+
+        server = TranscriptWorkerServer(self.socket_path, fake_transcribe)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            payload = self._run_script("--input", str(speech_file), "--vad", "--no-cache")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(payload["status"], "ok", msg=payload)
+        self.assertLess(durations[0], 7.0)
+        saved = json.loads(Path(payload["output"]).read_text(encoding="utf-8"))
+        self.assertEqual(set(saved), {"text", "segments"})
+        self.assertAlmostEqual(saved["segments"][-1]["end"], 11.0, delta=0.1)
+        self.assertAlmostEqual(saved["segments"][-1]["start"], 10.0, delta=0.1)
+
+    def test_worker_backend_reports_unreachable_socket(self) -> None:
+        payload = self._run("--backend", "worker")
+        self.assertEqual(payload["status"], "error")
+        self.assertIn("not reachable", payload["error"])
+
+
+class TranscriptVadTests(unittest.TestCase):
+    def setUp(self) -> None:
+        spec = importlib.util.spec_from_file_location("transcript_script", SCRIPT)
+        self.module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.module)
+
+    def test_no_speech_result_is_reused_from_cache(self) -> None:
+        calls = []
+
+        def no_speech(input_path, backend, language, model, on_segment=None):
+            calls.append(input_path)
+            return {"text": "", "segments": [], "language": language}, self.module.VAD_NO_SPEECH_BACKEND
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            audio = Path(tempdir) / "silence.m4a"
+            audio.write_bytes(b"silence")
+            self.module.CACHE_DIR = Path(tempdir) / "cache"
+            self.module.transcribe_with_vad = no_speech
+
+            first = self.module.transcribe_cached(audio, "auto", "de", None, use_cache=True, vad=True)
+            second = self.module.transcribe_cached(audio, "auto", "de", None, use_cache=True, vad=True)
+
+        self.assertEqual((first[1], first[2]), ("vad", False))
+        self.assertEqual((second[1], second[2]), ("vad", True))
+        self.assertEqual(len(calls), 1)
+
+    def test_noisy_floor_is_trimmed_around_speech(self) -> None:
+        rate = self.module.VAD_SAMPLE_RATE
+        rng = np.random.default_rng(0)
+        tone = np.sin(2 * np.pi * 180 * np.arange(2 * rate) / rate).astype(np.float32)
+        # Broadband room noise from about -54 to -40 dBFS has a high zero-crossing rate.
+        for noise in (0.002, 0.005, 0.01):
+            with self.subTest(noise=noise):
+                samples = rng.normal(0.0, noise, 11 * rate).astype(np.float32)
+                samples[2 * rate : 4 * rate] += 0.3 * tone
+                # Fricative right after the vowel: quieter, noise-like, still speech.
+                samples[4 * rate : int(4.15 * rate)] += rng.normal(0.0, 0.04, int(0.15 * rate)).astype(np.float32)
+                samples[7 * rate : 8 * rate] += 0.1 * tone[:rate]
+
+                regions = self.module.detect_speech_regions(*self.module.frame_features(samples))
+
+                self.assertEqual(len(regions), 2, msg=regions)
+                (first_start, first_end), (second_start, second_end) = regions
+                self.assertAlmostEqual(first_start, 1.8, delta=0.1)
+                self.assertAlmostEqual(first_end, 4.35, delta=0.1)
+                self.assertAlmostEqual(second_start, 6.8, delta=0.1)
+                self.assertAlmostEqual(second_end, 8.2, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "webhook.py"
+
+
+def load_webhook_module(log_dir: str):
+    with mock.patch.dict(os.environ, {"TOOLHUB_LOG_DIR": log_dir}):
+        spec = importlib.util.spec_from_file_location("webhook_script", SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+class DeduplicatedUploadTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.webhook = load_webhook_module(str(self.root / "logs"))
+        self.in_dir = self.root / "in"
+        self.out_dir = self.root / "out"
+        self.in_dir.mkdir()
+        self.out_dir.mkdir()
+        self.splits: list[str] = []
+        for name, value in (
+            ("SHARED_AUDIO_IN_DIR", str(self.in_dir)),
+            ("SHARED_AUDIO_OUT_DIR", str(self.out_dir)),
+            ("INGEST_INDEX_DIR", str(self.root / "ingest")),
+            ("execute_audio_split", self._fake_split),
+        ):
+            patcher = mock.patch.object(self.webhook, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = self.webhook.app.test_client()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _fake_split(self, input_path, mode, chunk_length, split_options, input_sha256=None):
+        job_id, output_dir = self.webhook.prepare_split_job()
+        Path(output_dir, "part_01.m4a").write_bytes(b"chunk")
+        self.splits.append(input_path)
+        return job_id, output_dir, ["part_01.m4a"]
+
+    def _upload(self, recording_id: str, content: bytes = b"same recording", **form: str) -> dict:
+        data = {"audio": (io.BytesIO(content), "note.m4a"), "recordingId": recording_id, **form}
+        response = self.client.post("/audio-ingest-split", data=data, content_type="multipart/form-data")
+        self.assertEqual(response.status_code, 200, msg=response.get_data(as_text=True))
+        return response.get_json()
+
+    def _ingest_record(self, sha256: str) -> dict:
+        return json.loads((self.root / "ingest" / f"{sha256}.json").read_text(encoding="utf-8"))
+
+    def test_duplicate_upload_reuses_job_and_hardlinks_ingest(self) -> None:
+        first = self._upload("r1")
+        second = self._upload("r2")
+
+        self.assertEqual((first["deduplicated"], second["deduplicated"]), (False, True))
+        self.assertEqual(second["jobId"], first["jobId"])
+        self.assertEqual(len(self.splits), 1)
+        self.assertEqual((first["ingest"]["storage"], second["ingest"]["storage"]), ("stored", "hardlink"))
+        self.assertTrue(os.path.samefile(first["ingest"]["path"], second["ingest"]["path"]))
+        self.assertEqual([chunk["filename"] for chunk in second["chunks"]], ["part_01.m4a"])
+        self.assertEqual(self._ingest_record(first["ingest"]["sha256"])["path"], first["ingest"]["path"])
+        # No temporary upload files are left behind.
+        self.assertEqual(sorted(path.name for path in self.in_dir.iterdir()), ["r1-note.m4a", "r2-note.m4a"])
+
+    def test_different_split_options_create_a_new_job(self) -> None:
+        first = self._upload("r1")
+        second = self._upload("r2", chunk_length="300")
+
+        self.assertFalse(second["deduplicated"])
+        self.assertNotEqual(second["jobId"], first["jobId"])
+        self.assertEqual(len(self.splits), 2)
+        jobs = self._ingest_record(first["ingest"]["sha256"])["jobs"]
+        self.assertEqual(sorted(jobs.values()), sorted([first["jobId"], second["jobId"]]))
+
+    def test_missing_or_emptied_job_falls_through_to_a_fresh_split(self) -> None:
+        first = self._upload("r1")
+        shutil.rmtree(self.out_dir / first["jobId"])
+
+        second = self._upload("r2")
+        self.assertFalse(second["deduplicated"])
+        self.assertNotEqual(second["jobId"], first["jobId"])
+
+        # A job directory whose chunks were cleaned up is not reused either.
+        (self.out_dir / second["jobId"] / "part_01.m4a").unlink()
+        third = self._upload("r3")
+        self.assertFalse(third["deduplicated"])
+        self.assertEqual(len(self.splits), 3)
+        options_key = next(iter(self._ingest_record(first["ingest"]["sha256"])["jobs"]))
+        self.assertEqual(self._ingest_record(first["ingest"]["sha256"])["jobs"][options_key], third["jobId"])
+
+
+if __name__ == "__main__":
+    unittest.main()
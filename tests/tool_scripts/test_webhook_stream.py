@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "webhook.py"
+
+# Fake split script: writes chunk records in the layout audio-split.sh appends
+# to chunks.ndjson. It also writes well past the 64 KB pipe buffer to stdout and
+# stderr. The real script sends its own output to its logfile, but the webhook
+# must not block on a split command that writes to the inherited streams.
+FAKE_SPLIT = """#!/usr/bin/env python3
+import json
+import sys
+from pathlib import Path
+
+output_dir = Path(sys.argv[1])
+for index in range(1, 4):
+    sys.stdout.write("frame=  100 fps=0.0 q=-1.0 size=N/A time=00:00:01.00 bitrate=N/A\\n" * 2000)
+    sys.stderr.write("[silencedetect @ 0x55d0] silence_start: 1.0\\n" * 2000)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    chunk = output_dir / f"part_{index:02d}.m4a"
+    chunk.write_bytes(b"audio")
+    start = (index - 1) * 600.0
+    record = {
+        "index": index,
+        "filename": chunk.name,
+        "start": start,
+        "duration": 600.0,
+        "end": start + 600.0,
+        "size": chunk.stat().st_size,
+        "codec": "aac",
+        "bitrate": 64000,
+        "cut_reason": "fixed" if index < 3 else "end",
+    }
+    with (output_dir / "chunks.ndjson").open("a", encoding="utf-8") as index_file:
+        index_file.write(json.dumps(record) + "\\n")
+"""
+
+
+def load_webhook_module(log_dir: str):
+    with mock.patch.dict(os.environ, {"TOOLHUB_LOG_DIR": log_dir}):
+        spec = importlib.util.spec_from_file_location("webhook_script", SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+class AudioSplitStreamTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.script = self.root / "audio-split.sh"
+        self.script.write_text(FAKE_SPLIT, encoding="utf-8")
+        self.script.chmod(0o755)
+        self.output_dir = self.root / "job"
+        self.output_dir.mkdir()
+        self.webhook = load_webhook_module(str(self.root / "logs"))
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_chunks_stream_while_script_writes_large_logs(self) -> None:
+        command = [str(self.script), str(self.output_dir)]
+        with mock.patch.object(self.webhook, "build_split_command", return_value=command), mock.patch.object(
+            self.webhook, "AUDIO_SPLIT_TIMEOUT_SECONDS", 30
+        ), mock.patch.object(self.webhook, "STREAM_POLL_INTERVAL_SECONDS", 0.05):
+            records = list(
+                self.webhook.iter_audio_split_chunks("in.m4a", str(self.output_dir), "fixed", 600, {})
+            )
+
+        self.assertEqual([record["filename"] for record in records], ["part_01.m4a", "part_02.m4a", "part_03.m4a"])
+        self.assertEqual([record["start"] for record in records], [0.0, 600.0, 1200.0])
+        self.assertEqual(records[-1]["cut_reason"], "end")
+
+
+class ChunkManifestTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.webhook = load_webhook_module(str(self.root / "logs"))
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_manifest_carries_split_time_metadata(self) -> None:
+        output_dir = self.root / "job"
+        output_dir.mkdir()
+        (output_dir / "part_01.m4a").write_bytes(b"audio")
+        (output_dir / "part_02.m4a").write_bytes(b"audio")
+        (output_dir / "chunks.ndjson").write_text(
+            '{"index":1,"filename":"part_01.m4a","start":0.000,"duration":600.000,"end":600.000,'
+            '"size":4812345,"codec":"aac","bitrate":64000,"cut_reason":"silence"}\n',
+            encoding="utf-8",
+        )
+
+        manifest = self.webhook.build_chunk_manifest("http://hub", "job", str(output_dir), ["part_01.m4a", "part_02.m4a"])
+
+        self.assertEqual(
+            {key: manifest[0][key] for key in ("startSeconds", "durationSeconds", "endSeconds", "sizeBytes", "codec", "bitrate", "cutReason")},
+            {
+                "startSeconds": 0.0,
+                "durationSeconds": 600.0,
+                "endSeconds": 600.0,
+                "sizeBytes": 4812345,
+                "codec": "aac",
+                "bitrate": 64000,
+                "cutReason": "silence",
+            },
+        )
+        self.assertEqual(manifest[0]["downloadUrl"], "http://hub/audio-chunk/job/part_01.m4a")
+        # Chunks without an index record (e.g. from an older split) keep the basic fields only.
+        self.assertNotIn("startSeconds", manifest[1])
+        self.assertEqual(manifest[1]["filename"], "part_02.m4a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import csv
+import datetime
+import importlib.util
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from openpyxl import Workbook, load_workbook
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "xlsx-read.py"
+
+
+def load_script_module():
+    spec = importlib.util.spec_from_file_location("xlsx_read_script", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class XlsxReadScriptTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempdir.name)
+        self.input_file = self.root / "orders.xlsx"
+
+        workbook = Workbook()
+        summary = workbook.active
+        summary.title = "Summary"
+        summary.append([42, "not a header"])
+        orders = workbook.create_sheet("Orders")
+        orders.append(["id", "customer", "amount", "date"])
+        for number in range(1, 26):
+            orders.append([number, f"Kunde {number}", number * 1.5, datetime.date(2024, 1, number)])
+            if number == 10:
+                orders.append([None, None, None, None])
+        workbook.save(self.input_file)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _run(self, *extra: str, **env_overrides: str) -> dict:
+        command = ["python3", str(SCRIPT), "--input-path", str(self.input_file), "--output-dir", str(self.root / "out"), *extra]
+        env = dict(os.environ, XLSX_CACHE_DIR=str(self.root / "cache"), **env_overrides)
+        result = subprocess.run(command, capture_output=True, text=True, check=False, env=env)
+        self.assertEqual(result.returncode, 0, msg=result.stdout + result.stderr)
+        return json.loads(result.stdout)
+
+    def test_ndjson_window_pages_through_sheet(self) -> None:
+        first = self._run("--format", "ndjson", "--sheet", "Orders", "--limit", "10")
+        second = self._run(
+            "--format", "ndjson", "--sheet", "2", "--offset", "20", "--limit", "10", "--output-filename", "p2.ndjson"
+        )
+
+        self.assertEqual(first["columns"], ["id", "customer", "amount", "date"])
+        self.assertEqual((first["row_count"], first["has_more"], first["next_offset"]), (10, True, 10))
+        rows = [json.loads(line) for line in Path(first["output_file"]).read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(rows[0], {"id": 1, "customer": "Kunde 1", "amount": 1.5, "date": "2024-01-01T00:00:00"})
+        # The empty row after id 10 is skipped, so offsets count data rows only.
+        self.assertEqual((second["row_count"], second["has_more"], second["next_offset"]), (5, False, None))
+        ids = [json.loads(line)["id"] for line in Path(second["output_file"]).read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(ids, [21, 22, 23, 24, 25])
+
+    def test_csv_and_columnar_output(self) -> None:
+        as_csv = self._run("--format", "csv", "--sheet", "Orders", "--offset", "2", "--limit", "2")
+        with Path(as_csv["output_file"]).open(encoding="utf-8", newline="") as handle:
+            header, first_row = list(csv.reader(handle))[:2]
+        self.assertEqual(header, ["id", "customer", "amount", "date"])
+        self.assertEqual(first_row, ["3", "Kunde 3", "4.5", "2024-01-03T00:00:00"])
+
+        columns = self._run("--format", "columns", "--sheet", "Orders", "--limit", "3")
+        document = json.loads(Path(columns["output_file"]).read_text(encoding="utf-8"))
+        self.assertEqual(document["columns"], ["id", "customer", "amount", "date"])
+        self.assertEqual(document["data"]["amount"], [1.5, 3.0, 4.5])
+
+    def test_header_detection_falls_back_to_column_letters(self) -> None:
+        payload = self._run("--format", "ndjson")
+
+        self.assertEqual((payload["sheet"], payload["columns"]), ("Summary", ["A", "B"]))
+        row = json.loads(Path(payload["output_file"]).read_text(encoding="utf-8"))
+        self.assertEqual(row, {"A": 42, "B": "not a header"})
+
+    def test_later_pages_are_served_from_columnar_cache(self) -> None:
+        first = self._run("--format", "ndjson", "--sheet", "Orders", "--limit", "5")
+        second = self._run("--format", "ndjson", "--sheet", "Orders", "--offset", "22", "--limit", "5")
+        uncached = self._run("--format", "ndjson", "--sheet", "Orders", "--offset", "22", "--limit", "5", "--no-cache")
+
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+        self.assertEqual(second["total_rows"], 25)
+        self.assertEqual((second["row_count"], second["has_more"]), (3, False))
+        self.assertNotIn("cached", uncached)
+        self.assertEqual(
+            Path(second["output_file"]).read_text(encoding="utf-8"), Path(uncached["output_file"]).read_text(encoding="utf-8")
+        )
+        (entry_dir,) = [path.parent for path in (self.root / "cache").glob("*/meta.json")]
+        meta = json.loads((entry_dir / "meta.json").read_text(encoding="utf-8"))
+        self.assertEqual(meta["numeric_columns"], ["id", "amount"])
+        amounts = np.load(entry_dir / f"c{meta['columns'].index('amount')}.values.npy", mmap_mode="r")
+        self.assertEqual(amounts[:3].tolist(), [1.5, 3.0, 4.5])
+
+    def test_entry_larger_than_cache_limit_is_still_served(self) -> None:
+        first = self._run("--format", "ndjson", "--sheet", "Orders", "--limit", "5", XLSX_CACHE_MAX_MB="0.001")
+        second = self._run("--format", "ndjson", "--sheet", "Orders", "--offset", "5", "--limit", "5", XLSX_CACHE_MAX_MB="0.001")
+
+        self.assertEqual((first["cached"], first["row_count"]), (False, 5))
+        self.assertEqual((second["cached"], second["row_count"]), (True, 5))
+        ids = [json.loads(line)["id"] for line in Path(second["output_file"]).read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(ids, [6, 7, 8, 9, 10])
+
+    def test_cached_rows_are_decoded_in_blocks(self) -> None:
+        self._run("--format", "ndjson", "--sheet", "Orders", "--limit", "1")
+        (entry_dir,) = [path.parent for path in (self.root / "cache").glob("*/meta.json")]
+        module = load_script_module()
+        module.CACHE_READ_ROWS = 4
+
+        offsets, blobs = module.open_cache_entry(entry_dir, 4)
+        try:
+            rows = list(module.iter_cached_rows(offsets, blobs, 2, 13))
+        finally:
+            for blob in blobs:
+                blob.close()
+
+        self.assertEqual([row[0] for row in rows], list(range(3, 14)))
+        self.assertEqual(rows[0], [3, "Kunde 3", 4.5, "2024-01-03T00:00:00"])
+
+    def test_unchanged_workbook_is_not_rehashed_per_page(self) -> None:
+        self._run("--format", "ndjson", "--sheet", "Orders", "--limit", "5")
+        # Same path, size and mtime: the recorded hash is trusted and the file is never read again.
+        stat = self.input_file.stat()
+        original = self.input_file.read_bytes()
+        self.input_file.write_bytes(b"\0" * len(original))
+        os.utime(self.input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        second = self._run("--format", "ndjson", "--sheet", "Orders", "--offset", "5", "--limit", "5")
+        self.assertTrue(second["cached"])
+
+        # A real edit changes the mtime, so the workbook is hashed and parsed again.
+        self.input_file.write_bytes(original)
+        workbook = load_workbook(self.input_file)
+        workbook["Orders"].append([26, "Kunde 26", 39.0, datetime.date(2024, 1, 26)])
+        workbook.save(self.input_file)
+
+        third = self._run("--format", "ndjson", "--sheet", "Orders", "--offset", "5", "--limit", "5")
+        self.assertEqual((third["cached"], third["total_rows"]), (False, 26))
+
+    def test_default_sheets_format_is_bounded_per_sheet(self) -> None:
+        payload = self._run("--max-rows", "3")
+
+        data = json.loads(Path(payload["output_file"]).read_text(encoding="utf-8"))
+        self.assertEqual(payload["sheet_count"], 2)
+        self.assertEqual(len(data["Orders"]), 3)
+        self.assertEqual(data["Orders"][1], [1, "Kunde 1", 1.5, "2024-01-01T00:00:00"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,17 @@ except Exception:  # noqa: BLE001
     # Keep registry importable even when optional runtime dependencies are missing.
     pass
 
+try:
+    from . import docx_to_pdf
+
+    TOOLS["docx-to-pdf"] = {
+        "handler": docx_to_pdf.handler,
+        "description": "Convert DOCX files to PDF with a pool of resident LibreOffice converters",
+    }
+except Exception:  # noqa: BLE001
+    # Keep registry importable even when optional runtime dependencies are missing.
+    pass
+
 try:
     from mcp_tools.docx_template_fill.tool import fill_docx_template
 
@@ -6,12 +6,17 @@ provided in the payload. It is designed for use via the Toolhub /run
 endpoint so other services (e.g. n8n) can trigger document generation.
 """
 
+import base64
+import bisect
+import io
 import os
+import re
 import time
 from datetime import datetime
-from typing import Dict, Iterable
+from typing import Dict, List
 
 from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
 from loguru import logger
 
 
@@ -19,6 +24,9 @@ TEMPLATES_DIR = os.getenv("DOCX_TEMPLATES_DIR", "/data/templates")
 OUTPUT_DIR = os.getenv("DOCX_OUTPUT_DIR", "/data/output")
 LOG_PATH = os.getenv("DOCX_RENDER_LOG", "/logs/docx-render.log")
 LOG_LEVEL = os.getenv("DOCX_RENDER_LOG_LEVEL", "DEBUG")
+INLINE_MAX_BYTES = int(os.getenv("DOCX_INLINE_MAX_BYTES", str(8 * 1024 * 1024)))
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+RETURN_MODES = {"file", "inline", "stream"}
 
 _logger_configured = False
 
@@ -53,54 +61,139 @@ def _safe_filename(name: str, field: str) -> str:
     return name
 
 
-def replace_placeholders(doc: Document, data: Dict[str, str]) -> Dict[str, int]:
-    """Replace ``{{KEY}}`` placeholders in all paragraphs and table cells.
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_P = f"{{{W_NS}}}p"
+W_T = f"{{{W_NS}}}t"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
+
+
+def _story_parts(doc: Document) -> List[object]:
+    """Return the main document part plus every header and footer part."""
+    parts = [doc.part]
+    for rel in doc.part.rels.values():
+        if not rel.is_external and rel.reltype in (RT.HEADER, RT.FOOTER):
+            parts.append(rel.target_part)
+    return parts
+
+
+def _paragraph_text_nodes(root) -> Dict[object, List[object]]:
+    """Group all ``w:t`` nodes under ``root`` by their nearest enclosing paragraph.
+
+    Text boxes nest whole paragraphs inside a run, so the nearest ``w:p``
+    ancestor (not the outermost) owns each text node.
+    """
+    paragraphs: Dict[object, List[object]] = {}
+    for text_node in root.iter(W_T):
+        parent = text_node.getparent()
+        while parent is not None and parent.tag != W_P:
+            parent = parent.getparent()
+        if parent is not None:
+            paragraphs.setdefault(parent, []).append(text_node)
+    return paragraphs
+
 
-    Returns a count of replacements performed per key for debug logging.
+def _set_node_text(text_node, value: str) -> None:
+    text_node.text = value
+    text_node.set(XML_SPACE, "preserve")
+
+
+def _replace_paragraph_placeholders(text_nodes: List[object], data: Dict[str, str], counts: Dict[str, int]) -> None:
+    """Replace placeholders in a paragraph made of several runs.
+
+    Matches are found once on the original joined paragraph text, so inserted
+    values are never scanned again, and applied by character offset: the value
+    is written into the run where the placeholder starts and the remaining
+    placeholder characters are cut from the following runs, so every run keeps
+    its own formatting.
+    """
+    texts = [node.text or "" for node in text_nodes]
+    joined = "".join(texts)
+    if "{{" not in joined:
+        return
+    matches = [match for match in PLACEHOLDER_PATTERN.finditer(joined) if match.group(1) in data]
+    if not matches:
+        return
+
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text)
+
+    # Right to left, so earlier offsets stay valid while texts change.
+    for match in reversed(matches):
+        first = bisect.bisect_right(starts, match.start()) - 1
+        last = bisect.bisect_right(starts, match.end() - 1) - 1
+        head = texts[first][: match.start() - starts[first]]
+        tail = texts[last][match.end() - starts[last] :]
+        if first == last:
+            texts[first] = head + data[match.group(1)] + tail
+        else:
+            texts[first] = head + data[match.group(1)]
+            for index in range(first + 1, last):
+                texts[index] = ""
+            texts[last] = tail
+        counts[match.group(1)] += 1
+
+    for text_node, text in zip(text_nodes, texts):
+        if text != (text_node.text or ""):
+            _set_node_text(text_node, text)
+
+
+def replace_placeholders(doc: Document, data: Dict[str, str]) -> Dict[str, int]:
+    """Replace ``{{KEY}}`` placeholders throughout the document XML.
+
+    Covers body paragraphs, tables (including nested tables), text boxes,
+    headers and footers. Each paragraph's original text is scanned once with a
+    single compiled pattern, so values containing ``{{...}}`` are inserted
+    verbatim; placeholders split across several runs are resolved by run
+    offsets. Run formatting is preserved either way. Returns a count of
+    replacements performed per key.
     """
 
     replacement_counts: Dict[str, int] = {key: 0 for key in data}
 
-    def _replace_text(text: str, replacements: Iterable[tuple[str, str]]) -> tuple[str, Dict[str, int]]:
-        local_counts: Dict[str, int] = {}
-        for key, value in replacements:
-            placeholder = f"{{{{{key}}}}}"
-            occurrences = text.count(placeholder)
-            if occurrences:
-                text = text.replace(placeholder, value)
-                replacement_counts[key] = replacement_counts.get(key, 0) + occurrences
-                local_counts[key] = local_counts.get(key, 0) + occurrences
-        return text, local_counts
-
-    replacements = data.items()
-
-    for paragraph in doc.paragraphs:
-        original = paragraph.text
-        updated, local_counts = _replace_text(original, replacements)
-        if updated != original:
-            logger.debug("Updated paragraph with placeholders", extra={"counts": local_counts})
-            paragraph.text = updated
-
-    for table_index, table in enumerate(doc.tables):
-        for row_index, row in enumerate(table.rows):
-            for cell_index, cell in enumerate(row.cells):
-                original = cell.text
-                updated, local_counts = _replace_text(original, replacements)
-                if updated != original:
-                    logger.debug(
-                        "Updated table cell with placeholders",
-                        extra={
-                            "counts": local_counts,
-                            "table": table_index,
-                            "row": row_index,
-                            "cell": cell_index,
-                        },
-                    )
-                    cell.text = updated
+    def _substitute(match: "re.Match[str]") -> str:
+        key = match.group(1)
+        value = data.get(key)
+        if value is None:
+            return match.group(0)
+        replacement_counts[key] += 1
+        return value
+
+    for part in _story_parts(doc):
+        for text_nodes in _paragraph_text_nodes(part.element).values():
+            if len(text_nodes) > 1:
+                _replace_paragraph_placeholders(text_nodes, data, replacement_counts)
+                continue
+            text = text_nodes[0].text
+            if text and "{{" in text:
+                updated = PLACEHOLDER_PATTERN.sub(_substitute, text)
+                if updated != text:
+                    _set_node_text(text_nodes[0], updated)
 
     return replacement_counts
 
 
+def build_return_payload(buffer: io.BytesIO, filename: str, return_mode: str) -> Dict:
+    """Describe an in-memory DOCX for ``return=inline`` (base64) or ``return=stream``.
+
+    ``stream`` hands the buffer itself back under ``content_stream``; the
+    webhook sends it as the HTTP response body.
+    """
+    size = buffer.getbuffer().nbytes
+    result = {"filename": filename, "mime_type": DOCX_MIME_TYPE, "size_bytes": size}
+    if return_mode == "stream":
+        buffer.seek(0)
+        result["content_stream"] = buffer
+        return result
+    if size > INLINE_MAX_BYTES:
+        raise ValueError(f"Rendered document is {size} bytes; use return=stream above {INLINE_MAX_BYTES} bytes")
+    result["content_base64"] = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return result
+
+
 def handler(payload: Dict) -> Dict:
     """Entry point for the Toolhub docx-render tool."""
     _configure_logger()
@@ -115,6 +208,12 @@ def handler(payload: Dict) -> Dict:
             raise ValueError("'template' is required and must be a filename")
         if not isinstance(data, dict):
             raise ValueError("'data' must be a dictionary of placeholder values")
+        return_mode = str(payload.get("return") or "file").strip().lower()
+        if return_mode not in RETURN_MODES:
+            raise ValueError(f"'return' must be one of: {', '.join(sorted(RETURN_MODES))}")
+        also_pdf = bool(payload.get("also_pdf"))
+        if also_pdf and return_mode != "file":
+            raise ValueError("'also_pdf' requires return=file")
 
         safe_template = _safe_filename(str(template_name), "template")
         safe_output = _safe_filename(str(output_name), "output_name") if output_name else None
@@ -143,13 +242,13 @@ def handler(payload: Dict) -> Dict:
             stem, _ = os.path.splitext(safe_template)
             timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
             safe_output = f"{stem}_out_{timestamp}.docx"
-        output_path = os.path.join(OUTPUT_DIR, safe_output)
-
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        output_path = os.path.join(OUTPUT_DIR, safe_output) if return_mode == "file" else None
 
         logger.info("Rendering DOCX template")
         logger.info(f"Template path: {template_path}")
-        logger.info(f"Output path: {output_path}")
+        if output_path:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            logger.info(f"Output path: {output_path}")
 
         document = Document(template_path)
         replacement_counts = replace_placeholders(document, {k: str(v) for k, v in data.items()})
@@ -157,16 +256,34 @@ def handler(payload: Dict) -> Dict:
             "Placeholder replacement summary",
             extra={"replacements": {k: v for k, v in replacement_counts.items() if v}},
         )
-        document.save(output_path)
-
-        logger.info(f"Rendered DOCX written to {output_path}")
-        return {
+        result = {
             "status": "ok",
             "template": safe_template,
-            "output_path": output_path,
             "placeholders_filled": sorted([str(key) for key in data.keys()]),
             "timestamp": int(time.time()),
         }
+        if output_path is None:
+            buffer = io.BytesIO()
+            document.save(buffer)
+            logger.info(f"Rendered DOCX returned {return_mode} as {safe_output}")
+            result.update(build_return_payload(buffer, safe_output, return_mode))
+            return result
+
+        document.save(output_path)
+
+        logger.info(f"Rendered DOCX written to {output_path}")
+        result["output_path"] = output_path
+        if also_pdf:
+            from .docx_to_pdf import convert_to_pdf
+
+            pdf = convert_to_pdf([output_path])[0]
+            result["pdf"] = pdf
+            if pdf["status"] == "ok":
+                result["pdf_path"] = pdf["output_file"]
+            else:
+                result["status"] = "error"
+                result["error"] = {"type": "ConversionError", "message": pdf["error"]}
+        return result
     except Exception as exc:  # noqa: BLE001
         logger.error(f"docx-render error: {exc.__class__.__name__}: {exc}")
         return {
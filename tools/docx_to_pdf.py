@@ -0,0 +1,356 @@
+"""DOCX to PDF conversion for Toolhub backed by resident LibreOffice converters.
+
+The module keeps a small pool of headless LibreOffice converters alive for
+the lifetime of the process (the webhook registers it in-process), so only the
+first request pays the office start-up. Two backends are supported:
+
+* ``unoserver``: one ``unoserver`` process per pool slot; documents are sent
+  over its XML-RPC interface without spawning anything per file.
+* ``soffice``: one dedicated LibreOffice profile per slot; each slot converts
+  its share of a batch in a single ``soffice --convert-to pdf`` invocation.
+  This fallback is not resident: every batch starts a new office process per
+  slot (the warm profile only shortens its start-up).
+
+Each slot claims its number with a lock file under the profile root, so
+converter pools in different processes (the webhook workers, the CLI) never
+share a port or a profile.
+
+The ``handler`` entry point only reads documents below the DOCX output or
+template root and only writes PDFs below the output root.
+
+``auto`` picks ``unoserver`` when its package and binary are installed.
+"""
+
+import atexit
+import fcntl
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+BACKEND = os.getenv("DOCX_PDF_BACKEND", "auto").strip().lower()
+POOL_SIZE = int(os.getenv("DOCX_PDF_POOL_SIZE", "2"))
+BASE_PORT = int(os.getenv("DOCX_PDF_BASE_PORT", "2003"))
+TIMEOUT_SECONDS = int(os.getenv("DOCX_PDF_TIMEOUT", "180"))
+PROFILE_ROOT = os.getenv("DOCX_PDF_PROFILE_ROOT", "/tmp/toolhub-docx-pdf")
+SOFFICE_BINARY = os.getenv("DOCX_PDF_SOFFICE", "soffice")
+UNOSERVER_BINARY = os.getenv("DOCX_PDF_UNOSERVER", "unoserver")
+SERVER_START_TIMEOUT = 60
+# Slot numbers tried per pool slot before giving up; each number maps to a port pair and profile.
+MAX_SLOT_NUMBERS = 64
+BACKENDS = {"auto", "unoserver", "soffice"}
+# Same roots as docx-render: inputs may come from either, PDFs go to the output root.
+OUTPUT_ROOT = Path(os.getenv("DOCX_OUTPUT_DIR", "/data/output"))
+TEMPLATES_ROOT = Path(os.getenv("DOCX_TEMPLATES_DIR", "/data/templates"))
+
+
+class ConversionError(RuntimeError):
+    """Raised when a converter cannot produce the requested PDF."""
+
+
+def resolve_backend(requested: str = BACKEND) -> str:
+    """Resolve ``auto`` to the best installed converter backend."""
+    if requested not in BACKENDS:
+        raise ValueError(f"backend must be one of: {', '.join(sorted(BACKENDS))}")
+    if requested != "auto":
+        return requested
+    try:
+        import unoserver.client  # noqa: F401  # Imported lazily; optional dependency.
+    except ImportError:
+        return "soffice"
+    return "unoserver" if shutil.which(UNOSERVER_BINARY) else "soffice"
+
+
+def _claim_slot_number(first: int) -> tuple:
+    """Lock the first free slot number from ``first`` on; returns it with the open lock file.
+
+    The lock is held for the lifetime of the slot, so the slot's ports and
+    profile directory belong to one process at a time.
+    """
+    Path(PROFILE_ROOT).mkdir(parents=True, exist_ok=True)
+    for number in range(first, first + MAX_SLOT_NUMBERS):
+        handle = open(Path(PROFILE_ROOT) / f"slot-{number}.lock", "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        return number, handle
+    raise ConversionError(f"No free converter slot in {PROFILE_ROOT} (tried {MAX_SLOT_NUMBERS} from slot {first})")
+
+
+class ConverterSlot:
+    """One resident converter: a unoserver process or a dedicated soffice profile."""
+
+    def __init__(self, index: int, backend: str):
+        self.index, self._lock = _claim_slot_number(index)
+        self.backend = backend
+        self.port = BASE_PORT + self.index * 2
+        self.profile_dir = Path(PROFILE_ROOT) / f"slot-{self.index}"
+        self.process: Optional[subprocess.Popen] = None
+        self.conversions = 0
+
+    def release(self) -> None:
+        """Stop the converter and give the slot number back to other processes."""
+        self.stop()
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def _ensure_server(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            return
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        command = [
+            UNOSERVER_BINARY,
+            "--interface",
+            "127.0.0.1",
+            "--port",
+            str(self.port),
+            "--uno-port",
+            str(self.port + 1),
+            "--user-installation",
+            str(self.profile_dir),
+        ]
+        logger.info(f"Starting converter slot {self.index}: {' '.join(command)}")
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise ConversionError(f"unoserver exited with code {self.process.returncode} during start-up")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.25)
+        self.stop()
+        raise ConversionError(f"unoserver did not start on port {self.port} within {SERVER_START_TIMEOUT}s")
+
+    def convert(self, jobs: List[tuple]) -> List[Dict]:
+        """Convert ``(input_path, output_path)`` pairs and return one result per job."""
+        if self.backend == "unoserver":
+            return [self._convert_unoserver(source, target) for source, target in jobs]
+        return self._convert_soffice(jobs)
+
+    def _convert_unoserver(self, source: Path, target: Path) -> Dict:
+        from unoserver.client import UnoClient
+
+        started = time.monotonic()
+        try:
+            self._ensure_server()
+            UnoClient(port=str(self.port)).convert(inpath=str(source), outpath=str(target), convert_to="pdf")
+        except Exception as exc:  # noqa: BLE001
+            # A crashed office instance is restarted on the next job.
+            if self.process is not None and self.process.poll() is not None:
+                self.process = None
+            return _job_result(source, target, started, error=str(exc))
+        self.conversions += 1
+        return _job_result(source, target, started)
+
+    def _convert_soffice(self, jobs: List[tuple]) -> List[Dict]:
+        started = time.monotonic()
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        # soffice names outputs after the input stem; convert per output directory.
+        by_directory: Dict[Path, List[tuple]] = {}
+        for position, (source, target) in enumerate(jobs):
+            by_directory.setdefault(target.parent, []).append((position, source, target))
+
+        results: List[Optional[Dict]] = [None] * len(jobs)
+        for output_dir, group in by_directory.items():
+            output_dir.mkdir(parents=True, exist_ok=True)
+            command = [
+                SOFFICE_BINARY,
+                "--headless",
+                "--norestore",
+                "--nolockcheck",
+                f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+                "--convert-to",
+                "pdf",
+                "--outdir",
+                str(output_dir),
+                *[str(source) for _, source, _ in group],
+            ]
+            logger.debug(f"Converter slot {self.index}: {' '.join(command)}")
+            error = None
+            try:
+                completed = subprocess.run(command, capture_output=True, text=True, timeout=TIMEOUT_SECONDS, check=False)
+                if completed.returncode != 0:
+                    error = (completed.stderr or completed.stdout or "").strip() or f"soffice exited with {completed.returncode}"
+            except (OSError, subprocess.TimeoutExpired) as exc:
+                error = str(exc)
+
+            for position, source, target in group:
+                produced = output_dir / f"{source.stem}.pdf"
+                if produced.is_file() and produced != target:
+                    os.replace(produced, target)
+                if target.is_file():
+                    self.conversions += 1
+                    results[position] = _job_result(source, target, started)
+                else:
+                    results[position] = _job_result(source, target, started, error=error or "soffice produced no PDF")
+        return results
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+
+def _job_result(source: Path, target: Path, started: float, error: Optional[str] = None) -> Dict:
+    result = {"input": str(source), "seconds": round(time.monotonic() - started, 3)}
+    if error:
+        result.update(status="error", error=error)
+    else:
+        result.update(status="ok", output_file=str(target))
+    return result
+
+
+class ConverterPool:
+    """Fixed set of converter slots shared by concurrent requests."""
+
+    def __init__(self, size: int = POOL_SIZE, backend: str = BACKEND):
+        self.backend = resolve_backend(backend)
+        self.slots = [ConverterSlot(index, self.backend) for index in range(max(1, size))]
+        self._idle: "queue.Queue[ConverterSlot]" = queue.Queue()
+        for slot in self.slots:
+            self._idle.put(slot)
+
+    def _run_on_slot(self, jobs: List[tuple]) -> List[Dict]:
+        slot = self._idle.get()
+        try:
+            return slot.convert(jobs)
+        finally:
+            self._idle.put(slot)
+
+    def convert(self, inputs: List[str], output_dir: Optional[str] = None) -> List[Dict]:
+        """Convert DOCX files to PDF, spreading the batch across all slots.
+
+        PDFs are written next to each input unless ``output_dir`` is given.
+        Results are returned in input order, one per input. Inputs that would
+        write the same PDF (duplicates, or equal stems in one output directory)
+        are rejected before anything is converted.
+        """
+        jobs = []
+        targets: Dict[Path, Path] = {}
+        for item in inputs:
+            source = Path(item)
+            if not source.is_file():
+                raise FileNotFoundError(f"Input document not found: {source}")
+            target_dir = Path(output_dir) if output_dir else source.parent
+            target = target_dir / f"{source.stem}.pdf"
+            if target.resolve() in targets:
+                raise ValueError(f"Inputs {targets[target.resolve()]} and {source} would both be converted to {target}")
+            targets[target.resolve()] = source
+            jobs.append((source, target))
+
+        positions = [list(range(index, len(jobs), len(self.slots))) for index in range(min(len(self.slots), len(jobs)))]
+        shares = [[jobs[position] for position in share] for share in positions]
+        results: List[Optional[Dict]] = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=len(shares) or 1) as executor:
+            for share, converted in zip(positions, executor.map(self._run_on_slot, shares)):
+                for position, result in zip(share, converted):
+                    results[position] = result
+        return results
+
+    def close(self) -> None:
+        for slot in self.slots:
+            slot.release()
+
+
+_pool: Optional[ConverterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConverterPool:
+    """Return the process-wide converter pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConverterPool()
+            atexit.register(_pool.close)
+            logger.info(f"DOCX to PDF pool ready: backend={_pool.backend}, slots={len(_pool.slots)}")
+        return _pool
+
+
+def convert_to_pdf(inputs: List[str], output_dir: Optional[str] = None) -> List[Dict]:
+    """Convert DOCX files with the shared pool; see :meth:`ConverterPool.convert`."""
+    return get_pool().convert(inputs, output_dir)
+
+
+def _within(path: Path, root: Path) -> bool:
+    try:
+        path.relative_to(root.resolve())
+    except ValueError:
+        return False
+    return True
+
+
+def confine_paths(inputs: List[str], output_dir: Optional[str]) -> tuple:
+    """Resolve request paths against the DOCX roots and reject anything outside them.
+
+    Relative paths are taken relative to the output root. Without ``output_dir``
+    PDFs are written next to their inputs when those lie in the output root,
+    otherwise (e.g. converting a template) into the output root itself.
+    """
+    resolved_inputs = []
+    for item in inputs:
+        source = (OUTPUT_ROOT / item).resolve()
+        if not (_within(source, OUTPUT_ROOT) or _within(source, TEMPLATES_ROOT)):
+            raise ValueError(f"Input must be located inside {OUTPUT_ROOT} or {TEMPLATES_ROOT}: {item}")
+        resolved_inputs.append(str(source))
+
+    if output_dir:
+        target = (OUTPUT_ROOT / output_dir).resolve()
+        if not _within(target, OUTPUT_ROOT):
+            raise ValueError(f"output_dir must be located inside {OUTPUT_ROOT}: {output_dir}")
+        return resolved_inputs, str(target)
+    if all(_within(Path(item), OUTPUT_ROOT) for item in resolved_inputs):
+        return resolved_inputs, None
+    return resolved_inputs, str(OUTPUT_ROOT.resolve())
+
+
+def handler(payload: Dict) -> Dict:
+    """Entry point for the Toolhub docx-to-pdf tool."""
+    try:
+        inputs = payload.get("inputs") or payload.get("input") if isinstance(payload, dict) else None
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if not isinstance(inputs, list) or not inputs or not all(isinstance(item, str) for item in inputs):
+            raise ValueError("'input' (path) or 'inputs' (list of paths) is required")
+        output_dir = payload.get("output_dir")
+        if output_dir is not None and not isinstance(output_dir, str):
+            raise ValueError("'output_dir' must be a string")
+        inputs, output_dir = confine_paths(inputs, output_dir)
+
+        started = time.monotonic()
+        results = convert_to_pdf(inputs, output_dir)
+        converted = sum(1 for result in results if result["status"] == "ok")
+        return {
+            "status": "ok" if converted == len(results) else "error",
+            "backend": get_pool().backend,
+            "converted": converted,
+            "failed": len(results) - converted,
+            "seconds": round(time.monotonic() - started, 3),
+            "results": results,
+        }
+    except Exception as exc:  # noqa: BLE001
+        logger.error(f"docx-to-pdf error: {exc.__class__.__name__}: {exc}")
+        return {
+            "status": "error",
+            "error": {
+                "type": exc.__class__.__name__,
+                "message": str(exc),
+            },
+        }
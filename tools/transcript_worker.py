@@ -0,0 +1,233 @@
+"""Resident Whisper transcription worker for Toolhub.
+
+The worker keeps Whisper models loaded in memory and serves transcription
+jobs over a Unix socket, so ``scripts/transcript.py`` no longer pays the
+model load for every chunk. Each connection carries exactly one request and
+one response, both encoded as a single JSON line:
+
+    {"op": "transcribe", "input": "/shared/audio/in/a.m4a", "language": "de", "model": "turbo"}
+    {"status": "ok", "result": {"text": "...", "segments": [...], "language": "de"}}
+
+Requests with ``"stream": true`` additionally receive one
+``{"type": "segment", "segment": {...}}`` line per decoded segment before the
+final status line.
+
+Start it with ``python3 -m tools.transcript_worker`` (``start.sh`` does this
+when ``TRANSCRIPT_WORKER`` is enabled).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import re
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+SOCKET_PATH = os.getenv("TRANSCRIPT_WORKER_SOCKET", "/tmp/toolhub-transcript-worker.sock")
+DEFAULT_MODEL = os.getenv("TRANSCRIPT_WORKER_MODEL", "turbo")
+MAX_MODELS = int(os.getenv("TRANSCRIPT_WORKER_MAX_MODELS", "1"))
+LOG_PATH = os.getenv("TRANSCRIPT_WORKER_LOG_PATH", "/logs/transcript-worker.log")
+LOG_LEVEL = os.getenv("TRANSCRIPT_WORKER_LOG_LEVEL", "INFO").upper()
+MAX_REQUEST_BYTES = 64 * 1024
+# Whisper's verbose output: "[00:01.000 --> 00:04.500]  text" (hours are optional).
+SEGMENT_LINE_PATTERN = re.compile(r"^\[((?:\d+:)?\d+:\d+\.\d+) --> ((?:\d+:)?\d+:\d+\.\d+)\]\s*(.*)$")
+
+LOGGER = logging.getLogger("transcript-worker")
+
+
+def configure_logging() -> None:
+    """Configure file logging with a safe fallback to stderr."""
+    level = getattr(logging, LOG_LEVEL, logging.INFO)
+    LOGGER.setLevel(level)
+
+    if LOGGER.handlers:
+        return
+
+    formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        log_path = Path(LOG_PATH)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(log_path, encoding="utf-8")
+    except Exception:
+        handler = logging.StreamHandler()
+    handler.setFormatter(formatter)
+    handler.setLevel(level)
+    LOGGER.addHandler(handler)
+
+
+def _parse_timestamp(value: str) -> float:
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return round(seconds, 3)
+
+
+class SegmentLineWriter(io.TextIOBase):
+    """Text sink that turns Whisper's verbose segment lines into callbacks."""
+
+    def __init__(self, on_segment: Callable[[dict], None]):
+        super().__init__()
+        self._on_segment = on_segment
+        self._buffer = ""
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            match = SEGMENT_LINE_PATTERN.match(line.strip())
+            if match:
+                self._on_segment(
+                    {
+                        "start": _parse_timestamp(match.group(1)),
+                        "end": _parse_timestamp(match.group(2)),
+                        "text": match.group(3),
+                    }
+                )
+        return len(text)
+
+
+class WhisperModelCache:
+    """Load Whisper models lazily and keep the most recently used ones resident."""
+
+    def __init__(self, max_models: int = MAX_MODELS):
+        self.max_models = max(1, max_models)
+        self._models: "OrderedDict[str, object]" = OrderedDict()
+
+    def get(self, name: str):
+        model = self._models.get(name)
+        if model is not None:
+            self._models.move_to_end(name)
+            return model
+
+        import whisper  # Imported lazily so the module stays importable without the package.
+
+        started = time.monotonic()
+        model = whisper.load_model(name)
+        LOGGER.info("Loaded Whisper model %s in %.1fs", name, time.monotonic() - started)
+        self._models[name] = model
+        while len(self._models) > self.max_models:
+            evicted, _ = self._models.popitem(last=False)
+            LOGGER.info("Evicted Whisper model %s", evicted)
+        return model
+
+    def transcribe(
+        self,
+        input_path: str,
+        language: Optional[str],
+        model: Optional[str],
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ) -> dict:
+        whisper_model = self.get(model or DEFAULT_MODEL)
+        options = {"fp16": getattr(getattr(whisper_model, "device", None), "type", "cpu") != "cpu"}
+        if language:
+            options["language"] = language
+        if on_segment is None:
+            return whisper_model.transcribe(input_path, **options)
+
+        # Whisper only reports segments via verbose printing; model access is serialized, so
+        # redirecting the process-wide stdout for the duration of one job is safe.
+        with contextlib.redirect_stdout(SegmentLineWriter(on_segment)):
+            return whisper_model.transcribe(input_path, verbose=True, **options)
+
+
+class TranscriptRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one JSON-line request per connection."""
+
+    def handle(self) -> None:
+        raw = self.rfile.readline(MAX_REQUEST_BYTES)
+        try:
+            request = json.loads(raw.decode("utf-8"))
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object.")
+            response = self.server.dispatch(request, self.send)
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.exception("Transcription request failed: %s", exc)
+            response = {"status": "error", "error": str(exc)}
+        self.send(response)
+
+    def send(self, payload: dict) -> None:
+        self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class TranscriptWorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that serializes model access behind a single lock."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, transcribe: Callable[..., dict]):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(socket_path, TranscriptRequestHandler)
+        os.chmod(socket_path, 0o660)
+        self.socket_path = socket_path
+        self._transcribe = transcribe
+        self._model_lock = threading.Lock()
+        self.jobs_served = 0
+
+    def dispatch(self, request: dict, send: Callable[[dict], None]) -> dict:
+        op = request.get("op", "transcribe")
+        if op == "ping":
+            return {"status": "ok", "pid": os.getpid(), "jobs_served": self.jobs_served}
+        if op != "transcribe":
+            raise ValueError(f"Unsupported op: {op}")
+
+        input_path = request.get("input")
+        if not isinstance(input_path, str) or not os.path.isfile(input_path):
+            raise FileNotFoundError(f"Input audio file not found: {input_path}")
+
+        with self._model_lock:
+            started = time.monotonic()
+            if request.get("stream"):
+                result = self._transcribe(
+                    input_path,
+                    request.get("language"),
+                    request.get("model"),
+                    lambda segment: send({"type": "segment", "segment": segment}),
+                )
+            else:
+                result = self._transcribe(input_path, request.get("language"), request.get("model"))
+            self.jobs_served += 1
+        LOGGER.info("Transcribed %s in %.1fs", input_path, time.monotonic() - started)
+        return {"status": "ok", "result": result}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def main() -> int:
+    """Run the transcription worker until interrupted."""
+    parser = argparse.ArgumentParser(description="Resident Whisper transcription worker.")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path to listen on.")
+    parser.add_argument("--preload", default=os.getenv("TRANSCRIPT_WORKER_PRELOAD", ""), help="Model to load at startup.")
+    parser.add_argument("--max-models", type=int, default=MAX_MODELS, help="Number of models kept resident.")
+    args = parser.parse_args()
+
+    configure_logging()
+    models = WhisperModelCache(args.max_models)
+    if args.preload:
+        models.get(args.preload)
+
+    server = TranscriptWorkerServer(args.socket, models.transcribe)
+    LOGGER.info("Transcript worker listening on %s", args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())